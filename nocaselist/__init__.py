@@ -5,4 +5,17 @@ nocaselist - A case-insensitive list for Python
 
 
 from ._version import __version__, __version_tuple__  # noqa: F401
+from ._folders import *  # noqa: F403,F401
+from ._bloomfilter import *  # noqa: F403,F401
+from ._rwlock import *  # noqa: F403,F401
 from ._nocaselist import *  # noqa: F403,F401
+from ._nocaseblocklist import *  # noqa: F403,F401
+from ._nocasesnapshot import *  # noqa: F403,F401
+from ._nocasedeque import *  # noqa: F403,F401
+from ._nocasearray import *  # noqa: F403,F401
+from ._compactnocaselist import *  # noqa: F403,F401
+from ._fingerprintnocaselist import *  # noqa: F403,F401
+from ._mmapnocaselist import *  # noqa: F403,F401
+from ._sharednocaselist import *  # noqa: F403,F401
+from ._concurrentnocaselist import *  # noqa: F403,F401
+from ._threadsafenocaselist import *  # noqa: F403,F401
@@ -0,0 +1,217 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+This module provides the Bloom filter that can be attached to a NocaseList
+in order to reject lookups of values that are not in the list quickly.
+"""
+
+import sys
+import math
+import random
+from array import array
+from functools import lru_cache
+from itertools import repeat
+from operator import and_, mod, rshift
+from typing import NamedTuple
+
+__all__ = ['BloomFilterStatistics']
+
+# Minimum number of hash values the filter is sized for
+_MIN_CAPACITY = 1024
+
+# Maximum number of bits set for each value
+_MAX_HASHES = 12
+
+# Factor by which a register-blocked Bloom filter needs more bits than a
+# standard Bloom filter with the same false positive rate (determined
+# empirically)
+_BLOCKING_FACTOR = 1.5
+
+# Number of bits of the hash value used for selecting the mask, and the
+# shift for getting them
+_MASK_BITS = 12
+_MASK_INDEX = (1 << _MASK_BITS) - 1
+_MASK_SHIFT = sys.hash_info.width - _MASK_BITS
+
+
+@lru_cache(maxsize=None)
+def _masks(num_hashes: int) -> array:
+    """
+    Return a table of random 64-bit masks that have the specified number of
+    bits set. The table is the same in all processes.
+    """
+    rand = random.Random(num_hashes)
+    return array('Q', (sum(1 << bit for bit in rand.sample(range(64),
+                                                            num_hashes))
+                       for _ in range(1 << _MASK_BITS)))
+
+
+class BloomFilterStatistics(NamedTuple):
+    """
+    Statistics about the Bloom filter of a :class:`NocaseList`, as returned
+    by :meth:`NocaseList.bloom_filter_statistics`.
+    """
+
+    #: Configured false positive rate for the capacity of the filter.
+    false_positive_rate: float
+
+    #: Number of hash values the filter is sized for. When more values have
+    #: been added, the filter is rebuilt with a larger size.
+    capacity: int
+
+    #: Number of bits of the filter.
+    num_bits: int
+
+    #: Number of bits set for each value.
+    num_hashes: int
+
+    #: Number of values added since the filter was built.
+    added: int
+
+    #: Number of values that were removed from the list since the filter was
+    #: built, and whose bits are therefore still set in the filter.
+    stale: int
+
+    #: Number of lookups that were checked against the filter.
+    lookups: int
+
+    #: Number of lookups that were rejected by the filter, without searching
+    #: the list.
+    rejected: int
+
+    #: Number of lookups that passed the filter, but whose value was not
+    #: found in the list.
+    false_positives: int
+
+    #: Number of times the filter was built.
+    builds: int
+
+
+class _BloomFilter:
+    """
+    A Bloom filter for the hash values of the casefolded items of a list.
+
+    The filter is a register-blocked Bloom filter: Each value sets a number
+    of bits in one 64-bit word of the filter, whereby the word is selected by
+    the hash value of the value, and the bits are selected by a mask that is
+    looked up in a table of random masks using the upper bits of the hash
+    value. A value whose bits are not all set in its word is certainly not in
+    the list. Compared to setting bits across the whole filter, this needs
+    about 50% more bits for the same false positive rate, but adding and
+    checking a value needs a single word operation.
+
+    Since bits cannot be cleared when values are removed, removed values are
+    counted as stale, and the filter is rebuilt when there are too many of
+    them, or when more values have been added than it is sized for.
+    """
+
+    def __init__(self, false_positive_rate: float = 0.01,
+                 rebuild_threshold: float = 0.5) -> None:
+        """
+        Parameters:
+
+          false_positive_rate (float): The approximate rate of lookups of
+            values that are not in the list, that pass the filter when it is
+            filled to its capacity. Must be between 0 and 1 (exclusive).
+
+          rebuild_threshold (float): The number of stale values, relative to
+            the capacity, above which the filter is rebuilt.
+
+        Raises:
+          ValueError: Invalid parameter value.
+        """
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("Bloom filter false positive rate must be "
+                             f"between 0 and 1, not {false_positive_rate!r}")
+        if not rebuild_threshold > 0:
+            raise ValueError("Bloom filter rebuild threshold must be "
+                             f"positive, not {rebuild_threshold!r}")
+        self.false_positive_rate = false_positive_rate
+        self.rebuild_threshold = rebuild_threshold
+        self.num_hashes = min(max(round(-math.log2(false_positive_rate)), 1),
+                              _MAX_HASHES)
+        self.lookups = 0
+        self.rejected = 0
+        self.false_positives = 0
+        self.builds = 0
+        self._allocate(0)
+
+    def _allocate(self, size: int) -> None:
+        """
+        Allocate an empty filter that is sized for the specified number of
+        values plus some growth.
+        """
+        self.capacity = max(2 * size, _MIN_CAPACITY)
+        num_bits = -self.capacity * math.log(self.false_positive_rate) / \
+            math.log(2) ** 2 * _BLOCKING_FACTOR
+        self._num_words = math.ceil(num_bits / 64)
+        self._words = array('Q', bytes(8 * self._num_words))
+        self.added = 0
+        self.stale = 0
+
+    @property
+    def num_bits(self) -> int:
+        """
+        Number of bits of the filter.
+        """
+        return self._num_words * 64
+
+    def build(self, hashes: list) -> None:
+        """
+        Build the filter from scratch for the specified hash values.
+        """
+        self._allocate(len(hashes))
+        self.builds += 1
+        self.add_many(hashes)
+
+    def add(self, h: int) -> None:
+        """
+        Add the specified hash value to the filter.
+        """
+        mask = _masks(self.num_hashes)[(h >> _MASK_SHIFT) & _MASK_INDEX]
+        self._words[h % self._num_words] |= mask
+        self.added += 1
+
+    def add_many(self, hashes: list) -> None:
+        """
+        Add the specified hash values to the filter.
+        """
+        words = self._words
+        # The word positions and masks are calculated at C speed
+        positions = map(mod, hashes, repeat(self._num_words))
+        masks = map(_masks(self.num_hashes).__getitem__,
+                    map(and_, map(rshift, hashes, repeat(_MASK_SHIFT)),
+                        repeat(_MASK_INDEX)))
+        for pos, mask in zip(positions, masks):
+            words[pos] |= mask
+        self.added += len(hashes)
+
+    def needs_rebuild(self) -> bool:
+        """
+        Return a boolean indicating whether the filter should be rebuilt,
+        because more values were added than it is sized for, or there are
+        too many stale values.
+        """
+        return self.added > self.capacity or \
+            self.stale > self.capacity * self.rebuild_threshold
+
+    def might_contain(self, h: int) -> bool:
+        """
+        Return a boolean indicating whether the value with the specified hash
+        value may have been added to the filter. If `False`, the value has
+        certainly not been added, and the lookup is counted as rejected.
+        """
+        self.lookups += 1
+        mask = _masks(self.num_hashes)[(h >> _MASK_SHIFT) & _MASK_INDEX]
+        if self._words[h % self._num_words] & mask != mask:
+            self.rejected += 1
+            return False
+        return True
+
+    def statistics(self) -> BloomFilterStatistics:
+        """
+        Return the statistics of the filter.
+        """
+        return BloomFilterStatistics(
+            self.false_positive_rate, self.capacity, self.num_bits,
+            self.num_hashes, self.added, self.stale, self.lookups,
+            self.rejected, self.false_positives, self.builds)
@@ -0,0 +1,367 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+This module provides class CompactNocaseList.
+"""
+
+import re
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate, islice
+from operator import methodcaller
+from typing import Optional
+from typing import SupportsIndex  # type: ignore
+from collections.abc import MutableSequence
+
+from ._nocaselist import NocaseList, IndexOrSlice
+
+__all__ = ['CompactNocaseList']
+
+# Number of items between two marks of a _FoldedBuffer
+_MARK_STRIDE = 128
+
+# Function that returns the UTF-8 encoding of a unicode string
+_ENCODE_UTF8 = methodcaller('encode', 'utf-8', 'surrogatepass')
+
+
+@lru_cache(maxsize=None)
+def _skip_pattern(number: int) -> 're.Pattern':
+    """
+    Return a compiled regular expression that matches the specified number of
+    consecutive items in a _FoldedBuffer.
+    """
+    return re.compile(rb'(?:\x00[^\x00]*\x00){%d}' % number)
+
+
+def _encode(value: str) -> bytes:
+    """
+    Return the encoded form of a casefolded value for a _FoldedBuffer,
+    i.e. its UTF-8 encoding enclosed in NUL bytes.
+
+    Raises:
+      TypeError: The value is not a unicode string.
+      ValueError: The value contains NUL characters.
+    """
+    if not isinstance(value, str):
+        raise TypeError("CompactNocaseList items must be unicode strings, "
+                        f"not {type(value).__name__}")
+    if '\0' in value:
+        raise ValueError("CompactNocaseList items must not contain NUL "
+                         "characters")
+    return b'\0' + value.encode('utf-8', 'surrogatepass') + b'\0'
+
+
+def _encode_many(values: list) -> bytes:
+    """
+    Return the encoded form of multiple casefolded values for a
+    _FoldedBuffer.
+
+    Raises:
+      TypeError: A value is not a unicode string.
+      ValueError: A value contains NUL characters.
+    """
+    if not values:
+        return b''
+    if not set(map(type, values)) <= {str}:
+        for value in values:
+            _encode(value)  # raises TypeError
+    joined = '\0\0'.join(values)
+    if joined.count('\0') != 2 * (len(values) - 1):
+        raise ValueError("CompactNocaseList items must not contain NUL "
+                         "characters")
+    return b'\0' + joined.encode('utf-8', 'surrogatepass') + b'\0'
+
+
+class _FoldedBuffer(MutableSequence):
+    """
+    List-like storage for casefolded unicode strings in one contiguous UTF-8
+    buffer.
+
+    Each item is stored as its UTF-8 encoding enclosed in NUL bytes, e.g.
+    ``b'\\0dog\\0\\0cat\\0'``. Because the items do not contain NUL
+    characters, a value can be looked up with a single search for its
+    enclosed encoding in the buffer, and the items can be decoded at once.
+
+    In order to access items by index, the indexes and byte positions of
+    about every _MARK_STRIDE-th item are kept in two arrays of marks. When
+    items are changed, inserted or deleted, the subsequent marks are shifted
+    accordingly.
+    """
+
+    def __init__(self, values=()) -> None:
+        self._set_all(list(values))
+
+    def _add_marks(self, values: list, index: int, pos: int) -> None:
+        """
+        Add marks for the specified values, which are stored in the buffer
+        starting at the specified index and byte position, so that the marks
+        are _MARK_STRIDE items apart from the last existing mark.
+        """
+        first = max(self._mark_index[-1] + _MARK_STRIDE - index, 0)
+        if first >= len(values):
+            return
+        if all(map(str.isascii, values)):
+            sizes = map(len, values)
+        else:
+            sizes = map(len, map(_ENCODE_UTF8, values))
+        positions = accumulate(map((2).__add__, sizes), initial=pos)
+        self._mark_index.extend(
+            range(index + first, index + len(values), _MARK_STRIDE))
+        self._mark_pos.extend(
+            islice(positions, first, len(values), _MARK_STRIDE))
+
+    def _shift_marks(self, index: int, delta_index: int, delta_pos: int) \
+            -> None:
+        """
+        Shift the marks for items after the specified index by the specified
+        number of items and bytes.
+        """
+        k = bisect_right(self._mark_index, index)
+        if delta_index:
+            self._mark_index[k:] = array(
+                'q', map(delta_index.__add__, self._mark_index[k:]))
+        if delta_pos:
+            self._mark_pos[k:] = array(
+                'q', map(delta_pos.__add__, self._mark_pos[k:]))
+
+    def _pos(self, index: int) -> int:
+        """
+        Return the byte position of the item at the specified index, which
+        must be in the range 0 to len(self). For len(self), the length of the
+        buffer is returned.
+        """
+        if index >= self._len:
+            return len(self._data)
+        k = bisect_right(self._mark_index, index) - 1
+        pos = self._mark_pos[k]
+        rest = index - self._mark_index[k]
+        while rest:
+            number = min(rest, _MARK_STRIDE)
+            pos = _skip_pattern(number).match(self._data, pos).end()
+            rest -= number
+        return pos
+
+    def _index_at(self, pos: int) -> int:
+        """
+        Return the index of the item that starts at the specified byte
+        position, by counting the items after the nearest mark before it.
+        """
+        k = bisect_right(self._mark_pos, pos) - 1
+        return self._mark_index[k] + \
+            self._data.count(b'\0', self._mark_pos[k], pos) // 2
+
+    def _bounds(self, index: SupportsIndex) -> tuple:
+        """
+        Return the byte positions of the start and end of the item at the
+        specified index, and the normalized index.
+
+        Raises:
+          IndexError: The index is out of range.
+        """
+        index = index.__index__()
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("list index out of range")
+        start = self._pos(index)
+        end = self._data.index(b'\0', start + 1) + 1
+        return start, end, index
+
+    def _set_all(self, values: list) -> None:
+        """
+        Replace all items with the specified values.
+        """
+        self._data = bytearray(_encode_many(values))
+        self._len = len(values)
+        # There is always a mark for index 0
+        self._mark_index = array('q', [0])
+        self._mark_pos = array('q', [0])
+        self._add_marks(values, 0, 0)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self):
+        if not self._len:
+            return iter(())
+        return iter(self._data[1:-1].decode(
+            'utf-8', 'surrogatepass').split('\0\0'))
+
+    def __getitem__(self, index: IndexOrSlice):
+        if isinstance(index, slice):
+            return list(self)[index]
+        start, end, _ = self._bounds(index)
+        return self._data[start + 1:end - 1].decode('utf-8', 'surrogatepass')
+
+    def __setitem__(self, index: IndexOrSlice, value) -> None:
+        if isinstance(index, slice):
+            values = list(self)
+            values[index] = value
+            self._set_all(values)
+            return
+        encoded = _encode(value)
+        start, end, index = self._bounds(index)
+        self._data[start:end] = encoded
+        self._shift_marks(index, 0, len(encoded) - (end - start))
+
+    def __delitem__(self, index: IndexOrSlice) -> None:
+        if isinstance(index, slice):
+            values = list(self)
+            del values[index]
+            self._set_all(values)
+            return
+        start, end, index = self._bounds(index)
+        del self._data[start:end]
+        self._len -= 1
+        # A mark for the deleted item now applies to the next item
+        self._shift_marks(index, -1, start - end)
+
+    def insert(self, index: SupportsIndex, value) -> None:
+        encoded = _encode(value)
+        # Same index handling as list.insert()
+        index = index.__index__()
+        if index < 0:
+            index = max(index + self._len, 0)
+        index = min(index, self._len)
+        pos = self._pos(index)
+        self._data[pos:pos] = encoded
+        self._len += 1
+        # A mark for the item at the index now applies to the new item
+        self._shift_marks(index, 1, len(encoded))
+
+    def append(self, value) -> None:
+        self.extend([value])
+
+    def extend(self, values) -> None:
+        values = list(values)
+        encoded = _encode_many(values)
+        self._add_marks(values, self._len, len(self._data))
+        self._data += encoded
+        self._len += len(values)
+
+    def clear(self) -> None:
+        self._set_all([])
+
+    def reverse(self) -> None:
+        self._set_all(list(reversed(list(self))))
+
+    def copy(self) -> '_FoldedBuffer':
+        """
+        Return a copy of the buffer.
+        """
+        other = self.__class__.__new__(self.__class__)
+        other._data = self._data[:]
+        other._len = self._len
+        other._mark_index = self._mark_index[:]
+        other._mark_pos = self._mark_pos[:]
+        return other
+
+    def __contains__(self, value) -> bool:
+        if not isinstance(value, str):
+            return False
+        if not value:
+            return '' in list(self)
+        try:
+            return _encode(value) in self._data
+        except ValueError:
+            return False
+
+    def count(self, value) -> int:
+        if not isinstance(value, str) or not value:
+            return list(self).count(value)
+        try:
+            return self._data.count(_encode(value))
+        except ValueError:
+            return 0
+
+    def index(self, value, start: SupportsIndex = 0,
+              stop: Optional[SupportsIndex] = None) -> int:
+        start, stop, _ = slice(start, stop).indices(self._len)
+        if isinstance(value, str) and value and start < stop:
+            try:
+                encoded = _encode(value)
+            except ValueError:
+                encoded = None
+            if encoded is not None:
+                pos = self._data.find(encoded, self._pos(start),
+                                      self._pos(stop))
+                if pos >= 0:
+                    return self._index_at(pos)
+        elif start < stop:
+            for i, value_cf in enumerate(list(self)[start:stop], start):
+                if value_cf == value:
+                    return i
+        raise ValueError(f"{value!r} is not in list")
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, _FoldedBuffer):
+            return self._data == other._data
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __lt__(self, other: object) -> bool:
+        if isinstance(other, (_FoldedBuffer, list)):
+            return list(self) < list(other)
+        return NotImplemented
+
+    def __gt__(self, other: object) -> bool:
+        if isinstance(other, (_FoldedBuffer, list)):
+            return list(self) > list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Number of bytes used by the buffer and the marks.
+        """
+        return len(self._data) + \
+            len(self._mark_index) * self._mark_index.itemsize + \
+            len(self._mark_pos) * self._mark_pos.itemsize
+
+
+class CompactNocaseList(NocaseList):
+    """
+    A case-insensitive and case-preserving list of unicode strings that
+    stores its casefolded items in a compact form.
+
+    The list behaves like :class:`NocaseList`, from which it is derived.
+    However, its casefolded items are not stored as a list of separate
+    :class:`py:str` objects, but in one contiguous UTF-8 buffer in which
+    each item is enclosed in NUL bytes. For lists of short ASCII strings,
+    this reduces the memory for the casefolded items from about 60 bytes to
+    about 2 bytes more than the length of the string.
+
+    Looking up a value (``value in ncl``, :meth:`~NocaseList.count` and
+    :meth:`~NocaseList.index`) searches the buffer for the encoded value,
+    which is faster than comparing the items one by one. Changing or
+    accessing items by index needs to locate the item in the buffer, starting
+    from the nearest of the item positions that are remembered for every
+    128th item. Inserting or deleting items, or changing the length of an
+    item, also moves the remainder of the buffer, so this class is best
+    suited for large lists that are mostly looked up.
+
+    The items of the list must be unicode strings that do not contain NUL
+    characters, and so must their casefolded values. Adding other items
+    raises :exc:`py:TypeError` or :exc:`py:ValueError`, and leaves the list
+    unchanged.
+    """
+
+    def _new_casefolded_storage(self, values_cf: list) -> _FoldedBuffer:
+        """
+        Return a _FoldedBuffer with the casefolded items.
+
+        Raises:
+          TypeError: An item is not a unicode string.
+          ValueError: An item contains NUL characters.
+        """
+        return _FoldedBuffer(values_cf)
+
+    def copy(self) -> 'CompactNocaseList':
+        """
+        Return a shallow copy of the list, as a :class:`CompactNocaseList`.
+        """
+        return self.__class__(self)
@@ -0,0 +1,697 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+This module provides class ConcurrentNocaseList.
+"""
+
+import sys
+import threading
+from functools import partial
+from itertools import compress
+from typing import Callable, Optional, Dict
+from typing import SupportsIndex  # type: ignore
+if sys.version_info[0:2] >= (3, 9):
+    from collections.abc import Iterable, MutableSequence  # type: ignore
+else:
+    # Before py39, collections.abc.Iterable did not support generic type
+    from typing import Iterable, MutableSequence
+
+from ._folders import Folder
+from ._nocaselist import NocaseList, CaseVariants, Value, IndexOrSlice, \
+    _hashable, _case_variants, _canonical_spellings
+from ._nocaseblocklist import NocaseBlockList
+from ._nocasesnapshot import NocaseSnapshot
+
+__all__ = ['ConcurrentNocaseList']
+
+
+class ConcurrentNocaseList(MutableSequence):
+    """
+    A case-insensitive and case-preserving list that can be read and changed
+    by multiple threads concurrently, and whose reads scale across
+    processors on free-threaded Python builds.
+
+    The list has the same case-insensitive and case-preserving behavior and
+    the same methods as :class:`NocaseList`, including the use of the
+    ``folder`` parameter and the :meth:`__casefold__` method. However, it is
+    not derived from the built-in :class:`py:list` class.
+
+    The original and casefolded items are stored together in an immutable
+    state (a pair of tuples) that is replaced as a whole when the list is
+    changed (copy-on-write):
+
+    * Reading methods (e.g. ``value in ncl``, :meth:`index`, :meth:`count`,
+      iteration and comparisons) get the current state once and use it
+      without locking. They always see the original and casefolded items in
+      sync, and they do not block each other or writers. An iteration
+      continues on the state from when it started, even if the list is
+      changed in the meantime.
+
+    * Changing methods (e.g. :meth:`append` or :meth:`remove`) casefold new
+      values before locking, and then create and publish the new state while
+      holding a lock, so that concurrent changes are serialized and none of
+      them is lost. Each change copies the items, i.e. it takes O(n) time.
+
+    This makes the list suitable for lists that are read much more often
+    than they are changed, e.g. lookup tables that are shared by many
+    threads. A sequence of operations (e.g. ``if value not in ncl:
+    ncl.append(value)``) is not atomic as a whole, but a sequence of reads
+    can be made consistent by reading a :meth:`snapshot` of the list.
+
+    The list supports serialization via the Python :mod:`py:pickle` module.
+    Only the originally cased items are serialized.
+    """
+
+    # The casefold behavior is the same as for NocaseList, including any
+    # overriding of __casefold__() in subclasses.
+    casefold_nested_as_tuple = NocaseList.casefold_nested_as_tuple
+    __casefold__ = staticmethod(NocaseList.__casefold__)
+    _casefolded_value = NocaseList._casefolded_value
+    _new_casefolded_list = NocaseList._new_casefolded_list
+    _folder: Optional[Folder] = None
+    folder = NocaseList.folder
+
+    def __init__(self, iterable=(), *, folder: Optional[Folder] = None) \
+            -> None:
+        """
+        Initialize the list with the items in the specified iterable.
+
+        The ``folder`` parameter is the casefold strategy object, as for
+        :class:`NocaseList`. If `None` and the iterable is a
+        :class:`NocaseList`, :class:`NocaseBlockList` or
+        :class:`ConcurrentNocaseList`, the folder of that list is used.
+        """
+        if folder is None and isinstance(iterable, _SHARING_TYPES):
+            folder = iterable._folder  # pylint: disable=protected-access
+        if folder is not None:
+            self._folder = folder
+        # The _lock attribute serializes the changes of the list. It is
+        # reentrant, so that callback functions that are invoked while it is
+        # held (e.g. the predicate of retain()) can read the list.
+        self._lock = threading.RLock()
+        # The _state attribute is a tuple of a tuple with the original items
+        # and a tuple with the casefolded items. It is only ever replaced as a
+        # whole.
+        self._state: tuple = self._new_state(iterable)
+
+    def _shares_casefolding(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the other object is a list
+        whose casefolded items can be used by this list.
+        """
+        # pylint: disable=protected-access
+        # Without a folder, the items are casefolded by the __casefold__()
+        # method, which may be overridden in a subclass.
+        return isinstance(other, _SHARING_TYPES) and \
+            other.casefold_nested_as_tuple == \
+            self.casefold_nested_as_tuple and \
+            other._folder == self._folder and \
+            (self._folder is not None or
+             type(other).__casefold__ is type(self).__casefold__)
+
+    def _new_state(self, values: Iterable) -> tuple:
+        """
+        Return a new state from the specified values, casefolding them unless
+        they are a list whose casefolded items can be used.
+        """
+        if self._shares_casefolding(values):
+            return _state_of(values)
+        values = tuple(values)
+        return values, tuple(self._new_casefolded_list(values))
+
+    def _items(self) -> tuple:
+        """
+        Return a tuple of a list of the original items and a list of the
+        casefolded items.
+        """
+        values, values_cf = self._state
+        return list(values), list(values_cf)
+
+    def __len__(self) -> int:
+        """
+        Return the number of items in the list.
+
+        Invoked using ``len(ncl)``.
+        """
+        return len(self._state[0])
+
+    def __iter__(self):
+        """
+        Return an iterator through the list items, in their original lexical
+        case.
+
+        Invoked using ``iter(ncl)``.
+        """
+        return iter(self._state[0])
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the list, in the same format as
+        for :class:`py:list`.
+
+        Invoked using ``repr(ncl)``.
+        """
+        return repr(list(self._state[0]))
+
+    def __reduce__(self):
+        """
+        Called when pickling the object, see :meth:`py:object.__reduce__`.
+
+        In order to save space and time, only the originally cased items are
+        saved, but not the casefolded items.
+        """
+        state = self.__dict__.copy()
+        for name in ('_lock', '_state'):
+            del state[name]
+        folder = state.pop('_folder', None)
+        cls = self.__class__ if folder is None else \
+            partial(self.__class__, folder=folder)
+        return (cls, (list(self._state[0]),), state or None)
+
+    def __getitem__(self, index: IndexOrSlice):
+        """
+        Return the value of the item at an existing index in the list, or a
+        :class:`py:list` with the values of the items of a slice of the list
+        (as for :class:`NocaseList`).
+
+        Invoked using ``ncl[index]``.
+
+        Raises:
+          IndexError: The index is out of range.
+        """
+        if isinstance(index, slice):
+            return list(self._state[0][index])
+        try:
+            return self._state[0][index]
+        except IndexError:
+            raise IndexError("list index out of range") from None
+
+    def __setitem__(self, index: IndexOrSlice, value: Value) -> None:
+        """
+        Update the value of the item at an existing index or slice in the list.
+
+        Invoked using ``ncl[index] = value``.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+          IndexError: The index is out of range.
+        """
+        if isinstance(index, slice):
+            value = list(value)  # type: ignore
+            value_cf = self._new_casefolded_list(value)
+        else:
+            value_cf = self._casefolded_value(value)
+        with self._lock:
+            values, values_cf = self._items()
+            try:
+                values[index] = value  # type: ignore
+            except IndexError:
+                raise IndexError(
+                    "list assignment index out of range") from None
+            values_cf[index] = value_cf  # type: ignore
+            self._state = (tuple(values), tuple(values_cf))
+
+    def __delitem__(self, index: IndexOrSlice) -> None:
+        """
+        Delete an item at an existing index or slice from the list.
+
+        Invoked using ``del ncl[index]``.
+
+        Raises:
+          IndexError: The index is out of range.
+        """
+        with self._lock:
+            values, values_cf = self._items()
+            try:
+                del values[index]
+            except IndexError:
+                raise IndexError(
+                    "list assignment index out of range") from None
+            del values_cf[index]
+            self._state = (tuple(values), tuple(values_cf))
+
+    def __contains__(self, value: Value) -> bool:
+        """
+        Return a boolean indicating whether the list contains at least one
+        item with the value, by looking it up case-insensitively.
+
+        Invoked using ``value in ncl``.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        return self._casefolded_value(value) in self._state[1]
+
+    def __add__(self, other: Iterable) -> 'ConcurrentNocaseList':
+        """
+        Return a new :class:`ConcurrentNocaseList` object that contains the
+        items from the left hand operand (``self``) and the items from the
+        right hand operand (``other``).
+
+        The right hand operand (``other``) must be an instance of
+        :class:`py:list` (including :class:`NocaseList`), :class:`py:tuple`,
+        :class:`NocaseBlockList` or :class:`ConcurrentNocaseList`. The
+        operands are not changed.
+
+        Invoked using e.g. ``ncl + other``
+
+        Raises:
+          TypeError: The other iterable is not a list or tuple
+        """
+        if not isinstance(other, (list, tuple, NocaseBlockList,
+                                  ConcurrentNocaseList)):
+            raise TypeError(
+                f"Can only concatenate list or tuple (not {type(other)}) to "
+                "ConcurrentNocaseList")
+        lst = self.copy()
+        lst.extend(other)
+        return lst
+
+    def __iadd__(self, other: Iterable) -> 'ConcurrentNocaseList':
+        """
+        Extend the left hand operand (``self``) by the items from the right
+        hand operand (``other``).
+
+        Invoked using ``ncl += other``.
+        """
+        self.extend(other)
+        return self
+
+    def __mul__(self, number: int) -> 'ConcurrentNocaseList':
+        """
+        Return a new :class:`ConcurrentNocaseList` object that contains the
+        items from the left hand operand (``self``) as many times as specified
+        by the right hand operand (``number``).
+
+        A number <= 0 causes the returned list to be empty.
+
+        Invoked using ``ncl * number``.
+        """
+        if not isinstance(number, int):
+            raise TypeError(
+                "Cannot multiply ConcurrentNocaseList by non-integer of type "
+                f"{type(number)}")
+        values, values_cf = self._state
+        return self._new_from_state((values * number, values_cf * number))
+
+    def __rmul__(self, number: int) -> 'ConcurrentNocaseList':
+        """
+        Return a new :class:`ConcurrentNocaseList` object that contains the
+        items from the right hand operand (``self``) as many times as
+        specified by the left hand operand (``number``).
+
+        Invoked using ``number * ncl``.
+        """
+        return self * number
+
+    def __imul__(self, number: int) -> 'ConcurrentNocaseList':
+        """
+        Change the left hand operand (``self``) so that it contains the items
+        from the original left hand operand (``self``) as many times as
+        specified by the right hand operand (``number``).
+
+        Invoked using ``ncl *= number``.
+        """
+        if not isinstance(number, int):
+            raise TypeError(
+                "Cannot multiply ConcurrentNocaseList by non-integer of type "
+                f"{type(number)}")
+        with self._lock:
+            values, values_cf = self._state
+            self._state = (values * number, values_cf * number)
+        return self
+
+    def __reversed__(self) -> 'ConcurrentNocaseList':  # type: ignore
+        """
+        Return a shallow copy of the list that has its items reversed in order.
+
+        Invoked using ``reversed(ncl)``.
+        """
+        values, values_cf = self._state
+        return self._new_from_state((values[::-1], values_cf[::-1]))
+
+    def _other_casefolded_list(self, other: object) -> Optional[list]:
+        """
+        Return the casefolded items of the other operand of a comparison as a
+        list, or None if the other operand is not iterable.
+        """
+        if self._shares_casefolding(other):
+            return list(_state_of(other)[1])
+        if isinstance(other, Iterable):
+            return self._new_casefolded_list(other)
+        return None
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list and the other list are
+        equal, by comparing corresponding list items case-insensitively.
+
+        Invoked using e.g. ``ncl == other``.
+        """
+        other_cf = self._other_casefolded_list(other)
+        if other_cf is None:
+            return NotImplemented
+        return list(self._state[1]) == other_cf
+
+    def __ne__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list and the other list are
+        not equal, by comparing corresponding list items case-insensitively.
+
+        Invoked using e.g. ``ncl != other``.
+        """
+        eq = self.__eq__(other)
+        if eq is NotImplemented:
+            return NotImplemented
+        return not eq
+
+    def __gt__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list is greater than the other
+        list, by comparing corresponding list items case-insensitively.
+
+        Invoked using e.g. ``ncl > other``.
+        """
+        other_cf = self._other_casefolded_list(other)
+        if other_cf is None:
+            return NotImplemented
+        return list(self._state[1]) > other_cf
+
+    def __lt__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list is less than the other
+        list, by comparing corresponding list items case-insensitively.
+
+        Invoked using e.g. ``ncl < other``.
+        """
+        other_cf = self._other_casefolded_list(other)
+        if other_cf is None:
+            return NotImplemented
+        return list(self._state[1]) < other_cf
+
+    def __ge__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list is greater than or
+        equal to the other list, by comparing corresponding list items
+        case-insensitively.
+
+        Invoked using e.g. ``ncl >= other``.
+        """
+        lt = self.__lt__(other)
+        if lt is NotImplemented:
+            return NotImplemented
+        return not lt
+
+    def __le__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list is less than or
+        equal to the other list, by comparing corresponding list items
+        case-insensitively.
+
+        Invoked using e.g. ``ncl <= other``.
+        """
+        gt = self.__gt__(other)
+        if gt is NotImplemented:
+            return NotImplemented
+        return not gt
+
+    def _new_from_state(self, state: tuple) -> 'ConcurrentNocaseList':
+        """
+        Return a new list of the same class with the specified state, without
+        casefolding the items again.
+        """
+        lst = self.__class__(folder=self._folder)
+        lst._state = state
+        return lst
+
+    def count(self, value: Value) -> int:
+        """
+        Return the number of times the specified value occurs in the list,
+        comparing the value and the list items case-insensitively.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        return self._state[1].count(self._casefolded_value(value))
+
+    def copy(self) -> 'ConcurrentNocaseList':
+        """
+        Return a shallow copy of the list.
+        """
+        return self._new_from_state(self._state)
+
+    def clear(self) -> None:
+        """
+        Remove all items from the list (and return None).
+        """
+        with self._lock:
+            self._state = ((), ())
+
+    def index(self, value: Value, start: SupportsIndex = 0,
+              stop: SupportsIndex = sys.maxsize) -> int:
+        """
+        Return the index of the first item that is equal to the specified
+        value, comparing the value and the list items case-insensitively.
+
+        The search is limited to the index range defined by the specified
+        ``start`` and ``stop`` parameters, whereby ``stop`` is the index
+        of the first item after the search range.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+          ValueError: No such item is found.
+        """
+        value_cf = self._casefolded_value(value)
+        try:
+            return self._state[1].index(value_cf, start, stop)
+        except ValueError:
+            raise ValueError(
+                f"{value!r} is not in ConcurrentNocaseList") from None
+
+    def append(self, value: Value) -> None:
+        """
+        Append the specified value as a new item to the end of the list
+        (and return None).
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        value_cf = self._casefolded_value(value)
+        with self._lock:
+            values, values_cf = self._state
+            self._state = (values + (value,), values_cf + (value_cf,))
+
+    def extend(self, values: Iterable) -> None:
+        """
+        Extend the list by the items in the specified iterable
+        (and return None).
+
+        Raises:
+          AttributeError: A value in the iterable does not have the casefold
+            method.
+        """
+        new_values, new_values_cf = self._new_state(values)
+        with self._lock:
+            values, values_cf = self._state
+            self._state = (values + new_values, values_cf + new_values_cf)
+
+    def insert(self, index: SupportsIndex, value: Value) -> None:
+        """
+        Insert a new item with specified value before the item at the specified
+        index (and return None).
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        value_cf = self._casefolded_value(value)
+        with self._lock:
+            values, values_cf = self._items()
+            values.insert(index, value)
+            values_cf.insert(index, value_cf)
+            self._state = (tuple(values), tuple(values_cf))
+
+    def pop(self, index: SupportsIndex = -1) -> Value:
+        """
+        Return the value of the item at the specified index and also remove it
+        from the list.
+
+        Raises:
+          IndexError: The list is empty or the index is out of range.
+        """
+        with self._lock:
+            values, values_cf = self._items()
+            value = values.pop(index)
+            del values_cf[index]
+            self._state = (tuple(values), tuple(values_cf))
+        return value
+
+    def remove(self, value: Value) -> None:
+        """
+        Remove the first item from the list whose value is equal to the
+        specified value (and return None), comparing the value and the list
+        items case-insensitively.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+          ValueError: No such item is found.
+        """
+        value_cf = self._casefolded_value(value)
+        with self._lock:
+            values, values_cf = self._items()
+            try:
+                index = values_cf.index(value_cf)
+            except ValueError:
+                raise ValueError(
+                    f"{value!r} is not in ConcurrentNocaseList") from None
+            del values[index]
+            del values_cf[index]
+            self._state = (tuple(values), tuple(values_cf))
+
+    def remove_all(self, values: Iterable) -> int:
+        """
+        Remove all items from the list whose value is equal to any of the
+        specified values (and return the number of removed items), comparing
+        the values and the list items case-insensitively.
+
+        Raises:
+          AttributeError: A value in the iterable does not have the casefold
+            method.
+        """
+        values_cf = {_hashable(v) for v in self._new_casefolded_list(values)}
+        return self._compact(
+            lambda _, value_cf: _hashable(value_cf) not in values_cf)
+
+    def discard(self, value: Value) -> None:
+        """
+        Remove the first item from the list whose value is equal to the
+        specified value, if there is such an item (and return None), comparing
+        the value and the list items case-insensitively.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        try:
+            self.remove(value)
+        except ValueError:
+            pass
+
+    def retain(self, predicate: Callable) -> int:
+        """
+        Remove all items from the list for which the specified predicate
+        function returns false (and return the number of removed items).
+
+        The predicate function is called once for each list item with its
+        original (not casefolded) value, while the changes of the list by
+        other threads are blocked.
+        """
+        return self._compact(lambda value, _: predicate(value))
+
+    def _compact(self, keep_item: Callable) -> int:
+        """
+        Remove the list items for which the specified function returns false
+        when called with their original and casefolded value, and return the
+        number of removed items.
+        """
+        with self._lock:
+            values, values_cf = self._state
+            keep = [bool(keep_item(value, value_cf))
+                    for value, value_cf in zip(values, values_cf)]
+            removed = len(keep) - sum(keep)
+            if removed:
+                self._state = (tuple(compress(values, keep)),
+                               tuple(compress(values_cf, keep)))
+        return removed
+
+    def case_variants(self) -> Dict[Value, CaseVariants]:
+        """
+        Return the items of the list grouped by their casefolded value.
+
+        See :meth:`NocaseList.case_variants` for details.
+        """
+        return _case_variants(*self._state)
+
+    def canonicalize(self, prefer: str = 'first') -> int:
+        """
+        Change all items of the list that are case-insensitively equal, to have
+        the same lexical case (and return the number of changed items).
+
+        See :meth:`NocaseList.canonicalize` for details.
+
+        Raises:
+          ValueError: Invalid value for the ``prefer`` parameter.
+        """
+        with self._lock:
+            values, values_cf = self._state
+            canonical = _canonical_spellings(values, values_cf, prefer)
+            new_values = tuple(canonical[_hashable(value_cf)]
+                               for value_cf in values_cf)
+            changed = sum(value != new_value
+                          for value, new_value in zip(values, new_values))
+            if changed:
+                self._state = (new_values, values_cf)
+        return changed
+
+    def snapshot(self) -> NocaseSnapshot:
+        """
+        Return an immutable snapshot of the current items of the list, as a
+        :class:`NocaseSnapshot` object, in O(1) time.
+
+        The snapshot shares the current state of the list, which is never
+        changed. Taking a snapshot does not lock, and can be done by any
+        thread at any time.
+        """
+        values, values_cf = self._state
+        if not values:
+            return NocaseSnapshot(self, [], [], 0)
+        return NocaseSnapshot(self, [values], [values_cf], len(values))
+
+    def reverse(self) -> None:
+        """
+        Reverse the items in the list in place (and return None).
+        """
+        with self._lock:
+            values, values_cf = self._state
+            self._state = (values[::-1], values_cf[::-1])
+
+    def sort(self, *, key: Optional[Callable] = None,
+             reverse: bool = False) -> None:
+        """
+        Sort the items in the list in place (and return None).
+
+        The sort is stable, in that the order of two (case-insensitively) equal
+        elements is maintained.
+
+        By default, the list is sorted in ascending order of its casefolded
+        item values. If a key function is given, it is applied once to each
+        casefolded list item and the list is sorted in ascending or
+        descending order of their key function values.
+
+        The ``reverse`` flag can be set to sort in descending order.
+        """
+        with self._lock:
+            values, values_cf = self._state
+            if key:
+                keys = [key(value_cf) for value_cf in values_cf]
+            else:
+                keys = values_cf
+            order = sorted(range(len(values)), key=keys.__getitem__,
+                           reverse=reverse)
+            self._state = (tuple(values[i] for i in order),
+                           tuple(values_cf[i] for i in order))
+
+
+# The list classes whose casefolded items can be used by ConcurrentNocaseList
+_SHARING_TYPES = (NocaseList, NocaseBlockList, ConcurrentNocaseList)
+
+
+def _state_of(lst) -> tuple:
+    """
+    Return a tuple of the original and casefolded items of a NocaseList,
+    NocaseBlockList or ConcurrentNocaseList object, as tuples.
+    """
+    # pylint: disable=protected-access
+    if isinstance(lst, ConcurrentNocaseList):
+        return lst._state
+    if isinstance(lst, NocaseList):
+        return tuple(lst), tuple(lst._casefolded_list)
+    values, values_cf = lst._items()
+    return tuple(values), tuple(values_cf)
@@ -0,0 +1,269 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+This module provides class FingerprintNocaseList.
+"""
+
+import sys
+import struct
+from array import array
+from itertools import compress
+from typing import Optional
+from typing import SupportsIndex  # type: ignore
+from collections.abc import MutableSequence
+
+from ._nocaselist import NocaseList, IndexOrSlice, _hashable
+
+__all__ = ['FingerprintNocaseList']
+
+# Size of a fingerprint in bytes
+_SIZE = 8
+
+# Fingerprints are 64-bit signed integers in native byte order
+_FINGERPRINT = struct.Struct('=q')
+
+
+def _fingerprint(value_cf) -> int:
+    """
+    Return the fingerprint of a casefolded value, as a 64-bit signed integer.
+
+    Equal casefolded values have equal fingerprints.
+    """
+    # On 64-bit platforms, hash() returns 64-bit signed integers. The hash
+    # values of strings are cached in the string objects.
+    return hash(_hashable(value_cf))
+
+
+def _fingerprints(values_cf: list) -> bytes:
+    """
+    Return the fingerprints of the casefolded values, packed into bytes.
+    """
+    return struct.pack(f'={len(values_cf)}q', *map(_fingerprint, values_cf))
+
+
+class _FingerprintList(MutableSequence):
+    """
+    List-like storage for the casefolded items of a FingerprintNocaseList,
+    that stores only a 64-bit fingerprint of each casefolded item.
+
+    The fingerprints are packed into a bytearray, so that they can be
+    searched at C speed using :meth:`py:bytearray.find`. Because different
+    casefolded values may have the same fingerprint, a found fingerprint is
+    verified by casefolding the original item of the list at that index.
+
+    The casefolded items are returned by casefolding the original items
+    again. The list operations that change this object do not access the
+    original items, so that they can be called before or after the original
+    items have been changed.
+    """
+
+    def __init__(self, owner: NocaseList, values_cf=()) -> None:
+        # The owner holds a reference to this object, which creates a
+        # reference cycle that is resolved by the garbage collector.
+        self._owner = owner
+        self._data = bytearray(_fingerprints(list(values_cf)))
+
+    def _value(self, index: int):
+        """
+        Return the casefolded value of the original item at the specified
+        (normalized) index.
+        """
+        # pylint: disable=protected-access
+        return self._owner._casefolded_value(
+            list.__getitem__(self._owner, index))
+
+    def _normalized(self, index: SupportsIndex) -> int:
+        """
+        Return the normalized index.
+
+        Raises:
+          IndexError: The index is out of range.
+        """
+        index = index.__index__()
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("list index out of range")
+        return index
+
+    def _update(self, index: slice, values_cf: Optional[list]) -> None:
+        """
+        Set the fingerprints for a slice to those of the casefolded values,
+        or delete them if the values are `None`.
+        """
+        fingerprints = array('q')
+        fingerprints.frombytes(self._data)
+        if values_cf is None:
+            del fingerprints[index]
+        else:
+            fingerprints[index] = array('q', map(_fingerprint, values_cf))
+        self._data = bytearray(fingerprints.tobytes())
+
+    def _matches(self, value_cf, start: int, stop: int):
+        """
+        Generate the indexes of the items in the specified (normalized) index
+        range whose casefolded value is equal to the specified value.
+        """
+        key = _FINGERPRINT.pack(_fingerprint(value_cf))
+        data = self._data
+        end = stop * _SIZE
+        pos = data.find(key, start * _SIZE, end)
+        while pos >= 0:
+            if pos % _SIZE:
+                # The key spans two fingerprints
+                pos = data.find(key, pos + 1, end)
+                continue
+            index = pos // _SIZE
+            if self._value(index) == value_cf:
+                yield index
+            pos = data.find(key, pos + _SIZE, end)
+
+    def compress(self, keep: list) -> None:
+        """
+        Keep only the fingerprints whose corresponding flag in the specified
+        list is true.
+        """
+        data = self._data
+        self._data = bytearray(b''.join(compress(
+            (data[pos:pos + _SIZE] for pos in range(0, len(data), _SIZE)),
+            keep)))
+
+    def __len__(self) -> int:
+        return len(self._data) // _SIZE
+
+    def __iter__(self):
+        # pylint: disable=protected-access
+        return iter(self._owner._new_casefolded_list(self._owner))
+
+    def __getitem__(self, index: IndexOrSlice):
+        if isinstance(index, slice):
+            return [self._value(i) for i in range(*index.indices(len(self)))]
+        return self._value(self._normalized(index))
+
+    def __setitem__(self, index: IndexOrSlice, value_cf) -> None:
+        if isinstance(index, slice):
+            self._update(index, value_cf)
+            return
+        pos = self._normalized(index) * _SIZE
+        self._data[pos:pos + _SIZE] = _FINGERPRINT.pack(
+            _fingerprint(value_cf))
+
+    def __delitem__(self, index: IndexOrSlice) -> None:
+        if isinstance(index, slice):
+            self._update(index, None)
+            return
+        pos = self._normalized(index) * _SIZE
+        del self._data[pos:pos + _SIZE]
+
+    def insert(self, index: SupportsIndex, value_cf) -> None:
+        # Same index handling as list.insert()
+        index = index.__index__()
+        if index < 0:
+            index = max(index + len(self), 0)
+        pos = min(index, len(self)) * _SIZE
+        self._data[pos:pos] = _FINGERPRINT.pack(_fingerprint(value_cf))
+
+    def append(self, value_cf) -> None:
+        self._data += _FINGERPRINT.pack(_fingerprint(value_cf))
+
+    def extend(self, values_cf) -> None:
+        self._data += _fingerprints(list(values_cf))
+
+    def clear(self) -> None:
+        self._data = bytearray()
+
+    def __contains__(self, value_cf) -> bool:
+        return any(True for _ in self._matches(value_cf, 0, len(self)))
+
+    def count(self, value_cf) -> int:
+        return sum(1 for _ in self._matches(value_cf, 0, len(self)))
+
+    def index(self, value_cf, start: SupportsIndex = 0,
+              stop: SupportsIndex = sys.maxsize) -> int:
+        start, stop, _ = slice(start, stop).indices(len(self))
+        for index in self._matches(value_cf, start, stop):
+            return index
+        raise ValueError(f"{value_cf!r} is not in list")
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, _FingerprintList):
+            # Different fingerprints imply different casefolded values
+            if self._data != other._data:
+                return False
+            return list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __lt__(self, other: object) -> bool:
+        if isinstance(other, (_FingerprintList, list)):
+            return list(self) < list(other)
+        return NotImplemented
+
+    def __gt__(self, other: object) -> bool:
+        if isinstance(other, (_FingerprintList, list)):
+            return list(self) > list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Number of bytes used by the fingerprints.
+        """
+        return len(self._data)
+
+
+class FingerprintNocaseList(NocaseList):
+    """
+    A case-insensitive and case-preserving list that stores only a 64-bit
+    fingerprint of each casefolded item.
+
+    The list behaves like :class:`NocaseList`, from which it is derived, and
+    supports the same item types. However, instead of a list with the
+    casefolded items, it keeps an array with a fingerprint (hash value) of
+    each casefolded item. This reduces the memory for the casefolded items
+    to 8 bytes per item, at the expense of casefolding original items again
+    when the casefolded items are needed.
+
+    Looking up a value (``value in ncl``, :meth:`~NocaseList.count` and
+    :meth:`~NocaseList.index`) searches the array for the fingerprint of the
+    casefolded value, and verifies each match by casefolding the original
+    item, because different values may have the same fingerprint. Since
+    matches are rare, this is faster than comparing the casefolded items one
+    by one.
+
+    Operations that use all casefolded items (e.g. comparisons,
+    :meth:`~NocaseList.case_variants` or :meth:`~NocaseList.remove_all`)
+    casefold all original items again.
+    """
+
+    def _new_casefolded_storage(self, values_cf: list) -> _FingerprintList:
+        """
+        Return a _FingerprintList with the fingerprints of the casefolded
+        items.
+        """
+        return _FingerprintList(self, values_cf)
+
+    def _compact(self, keep: list) -> int:
+        """
+        Remove the list items whose corresponding flag in the specified list
+        is false, and return the number of removed items.
+        """
+        self._flush()
+        removed = len(keep) - sum(keep)
+        if removed:
+            self._version += 1
+            list.__setitem__(self, slice(None), list(compress(self, keep)))
+            self._casefolded_list.compress(keep)
+            if self._bloom is not None:
+                self._rebuild_bloom()
+        return removed
+
+    def copy(self) -> 'FingerprintNocaseList':
+        """
+        Return a shallow copy of the list, as a
+        :class:`FingerprintNocaseList`.
+        """
+        return self.__class__(self)
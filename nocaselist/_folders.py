@@ -0,0 +1,255 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+This module provides the casefold strategy classes (folders) that can be
+used to define the case-insensitive behavior of a NocaseList.
+"""
+
+from abc import ABC, abstractmethod
+from unicodedata import normalize
+from typing import AnyStr, List, Dict
+
+__all__ = ['Folder', 'CasefoldFolder', 'LowerFolder', 'AsciiLowerFolder',
+           'NFKDCasefoldFolder']
+
+# Separator used for folding the items of a list as one joined string. It is
+# not changed by any of the casefold, lower or normalization functions, and
+# it does not combine with adjacent characters.
+_SEPARATOR = '\0'
+
+# Translation table for lower-casing only the ASCII letters of a string
+_ASCII_LOWER_TABLE = str.maketrans(
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
+def _joinable(values: list) -> bool:
+    """
+    Return a boolean indicating whether the values can be folded as one
+    joined string, i.e. all of them are unicode strings that do not contain
+    the separator character.
+    """
+    return set(map(type, values)) == {str} and \
+        not any(_SEPARATOR in v for v in values)
+
+
+class Folder(ABC):
+    """
+    Base class for casefold strategies (folders).
+
+    A folder defines the case-insensitive behavior of a
+    :class:`~nocaselist.NocaseList` object that is created with the
+    ``folder`` parameter, instead of its :meth:`NocaseList.__casefold__`
+    method. See :ref:`Casefold strategies` for details.
+
+    Folders declare their capabilities in class attributes (currently
+    :attr:`bulk`), which allow the list to select optimized processing paths.
+    Derived classes must implement :meth:`fold` and may implement
+    :meth:`fold_many`.
+
+    Folders are compared by type and public attributes (parameters), so that
+    lists with equal folders can share casefolded items. Folders must be
+    picklable, in order for the lists that use them to be picklable.
+    """
+
+    #: :meth:`fold_many` is implemented more efficiently than calling
+    #: :meth:`fold` for each value. The list then uses :meth:`fold_many` when
+    #: casefolding many items at once (e.g. when it is initialized or
+    #: extended).
+    bulk: bool = False
+
+    @abstractmethod
+    def fold(self, value: AnyStr) -> AnyStr:
+        """
+        Return the casefolded form of the input value.
+
+        Parameters:
+          value (str or bytes): Input value. Will not be `None`, a list or
+            a tuple.
+
+        Returns:
+          str or bytes: Case-insensitive form of the input value.
+
+        Raises:
+          AttributeError: The value does not have the needed casefold method.
+        """
+
+    def fold_many(self, values: List[AnyStr]) -> List[AnyStr]:
+        """
+        Return a list with the casefolded forms of the input values.
+
+        Parameters:
+          values (list of str or bytes): Input values. None of them will be
+            `None`, a list or a tuple.
+
+        Returns:
+          list of str or bytes: Case-insensitive forms of the input values.
+
+        Raises:
+          AttributeError: A value does not have the needed casefold method.
+        """
+        fold = self.fold
+        return [fold(value) for value in values]
+
+    def __eq__(self, other: object) -> bool:
+        # Private attributes (e.g. caches) do not affect the casefolded values
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._params() == other._params()  # type: ignore
+
+    def _params(self) -> dict:
+        """
+        Return the public attributes of the folder, i.e. its parameters.
+        """
+        return {name: value for name, value in vars(self).items()
+                if not name.startswith('_')}
+
+    def __hash__(self) -> int:
+        return hash(type(self))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
+
+
+class CasefoldFolder(Folder):
+    """
+    Folder that casefolds unicode strings with :meth:`py:str.casefold` and
+    byte strings with :meth:`py:bytes.lower`.
+
+    This is the same behavior as the default :meth:`NocaseList.__casefold__`
+    method, but with bulk folding of unicode strings.
+    """
+
+    bulk = True
+
+    def fold(self, value: AnyStr) -> AnyStr:
+        try:
+            return value.casefold()  # type: ignore
+        except AttributeError:
+            return value.lower()
+
+    def fold_many(self, values: List[AnyStr]) -> List[AnyStr]:
+        if _joinable(values):
+            return _SEPARATOR.join(values).casefold().split(  # type: ignore
+                _SEPARATOR)
+        return super().fold_many(values)
+
+
+class LowerFolder(Folder):
+    """
+    Folder that lower-cases unicode and byte strings with
+    :meth:`py:str.lower` and :meth:`py:bytes.lower`.
+
+    In contrast to :meth:`py:str.casefold`, this does not fold characters
+    such as the German "ß" to "ss".
+    """
+
+    bulk = True
+
+    def fold(self, value: AnyStr) -> AnyStr:
+        return value.lower()
+
+    def fold_many(self, values: List[AnyStr]) -> List[AnyStr]:
+        if _joinable(values):
+            return _SEPARATOR.join(values).lower().split(  # type: ignore
+                _SEPARATOR)
+        return super().fold_many(values)
+
+
+class AsciiLowerFolder(Folder):
+    """
+    Folder that lower-cases only the ASCII letters "A" to "Z" of unicode and
+    byte strings, and leaves all other characters unchanged.
+
+    This is suitable for identifiers that are case-insensitive only in
+    the ASCII range, e.g. CIM element names.
+    """
+
+    bulk = True
+
+    def fold(self, value: AnyStr) -> AnyStr:
+        if isinstance(value, bytes) or value.isascii():
+            return value.lower()
+        return value.translate(_ASCII_LOWER_TABLE)  # type: ignore
+
+    def fold_many(self, values: List[AnyStr]) -> List[AnyStr]:
+        if _joinable(values):
+            joined = _SEPARATOR.join(values)  # type: ignore
+            if joined.isascii():
+                joined = joined.lower()
+            else:
+                joined = joined.translate(_ASCII_LOWER_TABLE)
+            return joined.split(_SEPARATOR)  # type: ignore
+        return super().fold_many(values)
+
+
+class NFKDCasefoldFolder(Folder):
+    """
+    Folder that normalizes unicode strings to the Unicode normalization form
+    NFKD and casefolds them with :meth:`py:str.casefold`. Byte strings are
+    lower-cased with :meth:`py:bytes.lower`.
+
+    With this folder, strings that are compatibility-equivalent in Unicode
+    (e.g. a combined character and its combination sequence) are equal.
+    This is the same behavior as the overriding of the
+    :meth:`NocaseList.__casefold__` method that is shown in
+    :ref:`Overriding the default casefold method`, but considerably faster:
+
+    * Strings that contain only ASCII characters are not normalized, since
+      NFKD does not change them.
+    * The casefolded values of other strings are kept in a bounded cache.
+    * When folding many items at once, they are normalized and casefolded as
+      a single joined string.
+
+    Parameters:
+
+      cache_size (int): Maximum number of cached casefolded values. When the
+        cache is full, it is cleared. 0 disables the cache.
+    """
+
+    bulk = True
+
+    def __init__(self, cache_size: int = 10000) -> None:
+        self._cache_size = cache_size
+        self._cache: Dict[str, str] = {}
+
+    @property
+    def cache_size(self) -> int:
+        """
+        int: Maximum number of cached casefolded values.
+        """
+        return self._cache_size
+
+    def __getstate__(self):
+        # The cache is not pickled
+        state = self.__dict__.copy()
+        state['_cache'] = {}
+        return state
+
+    def fold(self, value: AnyStr) -> AnyStr:
+        # For ASCII strings, str.lower() is the same as str.casefold()
+        if value.isascii():
+            return value.lower()
+        value_cf = self._cache.get(value)  # type: ignore
+        if value_cf is not None:
+            return value_cf  # type: ignore
+        if isinstance(value, bytes):
+            return value.lower()
+        value_cf = normalize('NFKD', value).casefold()  # type: ignore
+        if self._cache_size > 0:
+            cache = self._cache
+            if len(cache) >= self._cache_size:
+                # Removing single entries from the front of a dict gets slow
+                # over time, so the cache is cleared instead.
+                cache.clear()
+            cache[value] = value_cf  # type: ignore
+        return value_cf  # type: ignore
+
+    def fold_many(self, values: List[AnyStr]) -> List[AnyStr]:
+        if _joinable(values):
+            joined = _SEPARATOR.join(values)  # type: ignore
+            if not joined.isascii():
+                joined = normalize('NFKD', joined)
+            return joined.casefold().split(_SEPARATOR)  # type: ignore
+        return super().fold_many(values)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(cache_size={self._cache_size})"
@@ -0,0 +1,675 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+This module provides class MmapNocaseList and its binary format.
+"""
+
+import os
+import sys
+import mmap
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_right
+from functools import partial
+from itertools import accumulate, chain
+from typing import Optional, List, Union, Iterable
+from typing import SupportsIndex  # type: ignore
+
+from . import _folders
+from ._folders import Folder, CasefoldFolder
+from ._nocaselist import NocaseList
+from ._nocasearray import _check_values, _shares_casefolding
+
+__all__ = ['MmapNocaseList']
+
+# Identification of the binary format
+_MAGIC = b'NOCASEL\0'
+_VERSION = 1
+
+# Header of the binary format with these fields (all little-endian):
+# * magic: _MAGIC
+# * version: _VERSION
+# * folder_size: Size of the folder name in bytes
+# * count: Number of items
+# * num_buckets: Number of buckets of the hash index, or 0 for no index
+# * folder_pos: Position of the folder name (UTF-8)
+# * offsets_pos: Position of the byte offsets of the original items
+#   (count + 1 unsigned 64-bit integers)
+# * data_pos: Position of the original items (UTF-8, concatenated)
+# * cf_offsets_pos: Position of the byte offsets of the casefolded items
+# * cf_data_pos: Position of the casefolded items
+# * index_pos: Position of the hash index (num_buckets unsigned integers,
+#   see _index_typecode())
+_HEADER = struct.Struct('<8sIIQQQQQQQQ')
+
+# Alignment of the sections of the binary format
+_ALIGNMENT = 8
+
+
+def _index_typecode(count: int) -> str:
+    """
+    Return the array typecode of the buckets of the hash index for the
+    specified number of items. Each bucket is 0 if it is empty, or the index
+    of an item plus 1.
+    """
+    return 'I' if count < 2 ** 32 - 1 else 'Q'
+
+
+def _key(value_cf: str) -> bytes:
+    """
+    Return the UTF-8 encoding of a casefolded value, as stored in the binary
+    format.
+    """
+    return value_cf.encode('utf-8', 'surrogatepass')
+
+
+def _bucket(key: bytes, num_buckets: int) -> int:
+    """
+    Return the first bucket in the hash index for an encoded casefolded
+    value. The CRC-32 checksum is used as the hash value, because it is the
+    same in all processes (in contrast to :func:`py:hash`).
+    """
+    return zlib.crc32(key) & (num_buckets - 1)
+
+
+def _little_endian(arr: array) -> bytes:
+    """
+    Return the bytes of the array in little-endian byte order.
+    """
+    if sys.byteorder != 'little':
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _hash_index(keys: List[bytes]) -> array:
+    """
+    Return a hash index for the encoded casefolded values.
+
+    The index is a hash table with open addressing and linear probing. The
+    items are added in the order of their index, so that the matches for a
+    value are found in ascending order when probing.
+    """
+    num_buckets = 1 << max(2 * len(keys) - 1, 1).bit_length()
+    index = array(_index_typecode(len(keys)), bytes(
+        array(_index_typecode(len(keys))).itemsize * num_buckets))
+    mask = num_buckets - 1
+    for i, key in enumerate(keys, 1):
+        bucket = _bucket(key, num_buckets)
+        while index[bucket]:
+            bucket = (bucket + 1) & mask
+        index[bucket] = i
+    return index
+
+
+def _chunks(iterable, folder: Optional[Folder], hash_index: bool) \
+        -> List[bytes]:
+    """
+    Return the items in the specified iterable with their casefolded values
+    in the binary format, as a list of byte strings to be concatenated.
+
+    See MmapNocaseList.write() for the parameters.
+    """
+    if folder is None:
+        folder = getattr(iterable, '_folder', None) or CasefoldFolder()
+    values = list(iterable)
+    _check_values(values)
+    if isinstance(iterable, _BufferNocaseList) and \
+            iterable.folder == folder:
+        # pylint: disable=protected-access
+        values_cf = iterable._casefolded_items()
+    elif _shares_casefolding(iterable, folder):
+        # pylint: disable=protected-access
+        values_cf = list(iterable._casefolded_list) \
+            if isinstance(iterable, NocaseList) \
+            else list(iterable._casefolded_items())
+    else:
+        values_cf = folder.fold_many(values)
+
+    keys = list(map(_key, values_cf))
+    sections = [
+        type(folder).__name__.encode(),
+        _little_endian(array('Q', chain(
+            (0,), accumulate(map(len, map(_key, values)))))),
+        ''.join(values).encode('utf-8', 'surrogatepass'),
+        _little_endian(array('Q', chain(
+            (0,), accumulate(map(len, keys))))),
+        b''.join(keys),
+        _little_endian(_hash_index(keys)) if hash_index else b'',
+    ]
+    positions = []
+    pos = _HEADER.size
+    for section in sections:
+        positions.append(pos)
+        pos += -(-len(section) // _ALIGNMENT) * _ALIGNMENT
+    num_buckets = len(sections[-1]) // \
+        array(_index_typecode(len(values))).itemsize
+
+    chunks = [_HEADER.pack(_MAGIC, _VERSION, len(sections[0]), len(values),
+                           num_buckets, *positions)]
+    for section in sections:
+        chunks.append(section)
+        chunks.append(bytes(-len(section) % _ALIGNMENT))
+    return chunks
+
+
+class _BufferNocaseList(ABC):
+    """
+    Base class for the read-only lists of unicode strings in the binary
+    format, that access the binary format in a buffer (e.g. a memory-mapped
+    file or shared memory) without copying it.
+
+    Derived classes set up the buffer and call _attach(), and implement
+    close().
+    """
+
+    # The views of the arrays in the buffer, that must be released before
+    # the buffer can be closed. This class attribute is the default for
+    # objects that were not attached to a buffer.
+    _views: List[memoryview] = []
+
+    def _attach(self, buf, source: str, folder: Optional[Folder]) -> None:
+        """
+        Attach the list to the binary format in a buffer, by reading its
+        header and setting up the views of its sections.
+
+        The buffer must support slicing and the buffer protocol, and is
+        searched with its find() method if it has one and there is no hash
+        index. The source is a description of the buffer for error messages.
+
+        Raises:
+          ValueError: The buffer does not contain the binary format, or the
+            folder does not match it.
+        """
+        self._buf = buf
+        self._views = []
+        if len(buf) < _HEADER.size or buf[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{source} does not contain a list in the "
+                             "nocaselist binary format")
+        _, version, folder_size, count, num_buckets, folder_pos, \
+            offsets_pos, self._data_pos, cf_offsets_pos, self._cf_data_pos, \
+            index_pos = _HEADER.unpack_from(buf)
+        if version != _VERSION:
+            raise ValueError(f"{source} has unsupported version {version} of "
+                             "the nocaselist binary format")
+
+        folder_name = str(buf[folder_pos:folder_pos + folder_size], 'utf-8')
+        if folder is None:
+            if folder_name not in _folders.__all__ or folder_name == 'Folder':
+                raise ValueError(f"{source} was written with folder "
+                                 f"{folder_name}, which must be specified "
+                                 "for opening it")
+            folder = getattr(_folders, folder_name)()
+        elif type(folder).__name__ != folder_name:
+            raise ValueError(f"{source} was written with folder "
+                             f"{folder_name}, and cannot be opened with "
+                             f"folder {folder!r}")
+        self._folder: Folder = folder
+
+        self._len: int = count
+        self._num_buckets: int = num_buckets
+        self._offsets = self._array(offsets_pos, count + 1, 'Q')
+        self._cf_offsets = self._array(cf_offsets_pos, count + 1, 'Q')
+        self._index = self._array(index_pos, num_buckets,
+                                  _index_typecode(count))
+
+    def _array(self, pos: int, size: int, typecode: str):
+        """
+        Return a view of the array of unsigned integers at the specified
+        position in the buffer. On big-endian systems, a byte-swapped copy of
+        the array is returned instead.
+        """
+        itemsize = array(typecode).itemsize
+        if sys.byteorder != 'little':
+            arr = array(typecode)
+            arr.frombytes(bytes(self._buf[pos:pos + size * itemsize]))
+            arr.byteswap()
+            return arr
+        view = memoryview(self._buf)[pos:pos + size * itemsize].cast(
+            typecode)
+        self._views.append(view)
+        return view
+
+    def _release(self) -> None:
+        """
+        Release the views of the buffer, so that the buffer can be closed.
+        """
+        for view in self._views:
+            view.release()
+        self._views = []
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Close the list. The list cannot be used afterwards.
+        """
+
+    def __del__(self):
+        # The views must be released before the buffer is finalized, if the
+        # list has not been closed
+        self._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def folder(self) -> Folder:
+        """
+        :class:`~nocaselist.Folder`: The casefold strategy object of the list.
+        """
+        return self._folder
+
+    @property
+    def has_hash_index(self) -> bool:
+        """
+        bool: Indicates whether the list has a hash index.
+        """
+        return self._num_buckets > 0
+
+    def _item(self, index: int) -> str:
+        """
+        Return the original item at the specified (normalized) index.
+        """
+        pos = self._data_pos
+        return str(self._buf[pos + self._offsets[index]:
+                             pos + self._offsets[index + 1]],
+                   'utf-8', 'surrogatepass')
+
+    def _casefolded_key(self, index: int):
+        """
+        Return the encoded casefolded item at the specified (normalized)
+        index, as a bytes-like object.
+        """
+        pos = self._cf_data_pos
+        return self._buf[pos + self._cf_offsets[index]:
+                         pos + self._cf_offsets[index + 1]]
+
+    def _casefolded_items(self) -> List[str]:
+        """
+        Return the casefolded values in the order of the items.
+        """
+        return [str(key, 'utf-8', 'surrogatepass')
+                for key in map(self._casefolded_key, range(self._len))]
+
+    def _matches(self, value: str, start: int = 0,
+                 stop: Optional[int] = None):
+        """
+        Generate the indexes of the items in the specified (normalized) index
+        range whose casefolded value is equal to the casefolded value, in
+        ascending order.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        key = _key(self._folder.fold(value))
+        if stop is None:
+            stop = self._len
+        if self._num_buckets:
+            index = self._index
+            mask = self._num_buckets - 1
+            bucket = _bucket(key, self._num_buckets)
+            while index[bucket]:
+                i = index[bucket] - 1
+                if start <= i < stop and self._casefolded_key(i) == key:
+                    yield i
+                bucket = (bucket + 1) & mask
+            return
+        offsets = self._cf_offsets
+        if not key or not hasattr(self._buf, 'find'):
+            for i in range(start, stop):
+                if offsets[i + 1] - offsets[i] == len(key) and \
+                        self._casefolded_key(i) == key:
+                    yield i
+            return
+        # Search the casefolded values at once, and determine the item at a
+        # found position from the offsets
+        base = self._cf_data_pos
+        end = base + offsets[stop]
+        pos = self._buf.find(key, base + offsets[start], end)
+        while pos >= 0:
+            # The last item that starts at the position is not empty
+            i = bisect_right(offsets, pos - base, start, stop) - 1
+            if offsets[i] == pos - base and \
+                    offsets[i + 1] == pos - base + len(key):
+                yield i
+            pos = self._buf.find(key, pos + 1, end)
+
+    def __len__(self) -> int:
+        """
+        Return the number of items in the list.
+
+        Invoked using ``len(mncl)``.
+        """
+        return self._len
+
+    def __iter__(self):
+        """
+        Return an iterator through the items of the list, as :class:`py:str`
+        objects.
+
+        Invoked using ``iter(mncl)``.
+        """
+        return map(self._item, range(self._len))
+
+    def __getitem__(self, index: Union[SupportsIndex, slice]):
+        """
+        Return the value of the item at an existing index in the list, or a
+        :class:`py:list` with the values of the items of a slice of the list
+        (as for :class:`NocaseList`).
+
+        Invoked using ``mncl[index]``.
+
+        Raises:
+          IndexError: The index is out of range.
+        """
+        if isinstance(index, slice):
+            return list(map(self._item, range(*index.indices(self._len))))
+        index = index.__index__()
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("list index out of range")
+        return self._item(index)
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the list.
+
+        Invoked using ``repr(mncl)``.
+        """
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+    def _other_casefolded_items(self, other: object) -> Optional[list]:
+        """
+        Return the casefolded items of the other operand of a comparison as a
+        list, or None if the other operand is not iterable.
+
+        Raises:
+          AttributeError: A value in the other list does not have the casefold
+            method.
+        """
+        # pylint: disable=protected-access
+        if isinstance(other, _BufferNocaseList) and \
+                other.folder == self._folder:
+            return other._casefolded_items()
+        if _shares_casefolding(other, self._folder):
+            return list(other._casefolded_list) \
+                if isinstance(other, NocaseList) \
+                else list(other._casefolded_items())  # type: ignore
+        if isinstance(other, Iterable):
+            return self._folder.fold_many(list(other))
+        return None
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list and the other list are
+        equal, by comparing corresponding list items case-insensitively.
+
+        The other list may be any iterable, whose items are casefolded with
+        the folder of the list.
+
+        Invoked using e.g. ``mncl == other``.
+
+        Raises:
+          AttributeError: A value in the other list does not have the casefold
+            method.
+        """
+        other_cf = self._other_casefolded_items(other)
+        if other_cf is None:
+            return NotImplemented
+        return self._casefolded_items() == other_cf
+
+    def __ne__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list and the other list are
+        not equal, by comparing corresponding list items case-insensitively.
+
+        Invoked using e.g. ``mncl != other``.
+
+        Raises:
+          AttributeError: A value in the other list does not have the casefold
+            method.
+        """
+        eq = self.__eq__(other)
+        if eq is NotImplemented:
+            return NotImplemented
+        return not eq
+
+    def __gt__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list is greater than the other
+        list, by comparing corresponding list items case-insensitively.
+
+        Invoked using e.g. ``mncl > other``.
+
+        Raises:
+          AttributeError: A value in the other list does not have the casefold
+            method.
+        """
+        other_cf = self._other_casefolded_items(other)
+        if other_cf is None:
+            return NotImplemented
+        return self._casefolded_items() > other_cf
+
+    def __lt__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list is less than the other
+        list, by comparing corresponding list items case-insensitively.
+
+        Invoked using e.g. ``mncl < other``.
+
+        Raises:
+          AttributeError: A value in the other list does not have the casefold
+            method.
+        """
+        other_cf = self._other_casefolded_items(other)
+        if other_cf is None:
+            return NotImplemented
+        return self._casefolded_items() < other_cf
+
+    def __ge__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list is greater than or
+        equal to the other list, by comparing corresponding list items
+        case-insensitively.
+
+        Invoked using e.g. ``mncl >= other``.
+
+        Raises:
+          AttributeError: A value in the other list does not have the casefold
+            method.
+        """
+        lt = self.__lt__(other)
+        if lt is NotImplemented:
+            return NotImplemented
+        return not lt
+
+    def __le__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list is less than or
+        equal to the other list, by comparing corresponding list items
+        case-insensitively.
+
+        Invoked using e.g. ``mncl <= other``.
+
+        Raises:
+          AttributeError: A value in the other list does not have the casefold
+            method.
+        """
+        gt = self.__gt__(other)
+        if gt is NotImplemented:
+            return NotImplemented
+        return not gt
+
+    def __contains__(self, value: str) -> bool:
+        """
+        Return a boolean indicating whether the list contains at least one
+        item with the value, by looking it up case-insensitively.
+
+        Invoked using ``value in mncl``.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        return any(True for _ in self._matches(value))
+
+    def count(self, value: str) -> int:
+        """
+        Return the number of times the specified value occurs in the list,
+        comparing the value and the list items case-insensitively.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        return sum(1 for _ in self._matches(value))
+
+    def index(self, value: str, start: SupportsIndex = 0,
+              stop: Optional[SupportsIndex] = None) -> int:
+        """
+        Return the index of the first item that is equal to the specified
+        value, comparing the value and the list items case-insensitively.
+
+        The search is limited to the index range defined by the specified
+        ``start`` and ``stop`` parameters, whereby ``stop`` is the index
+        of the first item after the search range.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+          ValueError: No such item is found.
+        """
+        start, stop, _ = slice(start, stop).indices(self._len)
+        for i in self._matches(value, start, stop):
+            return i
+        raise ValueError(f"{value!r} is not in {self.__class__.__name__}")
+
+    def to_list(self) -> NocaseList:
+        """
+        Return a new :class:`NocaseList` object with the items of the list
+        and the same folder, without casefolding the items again.
+        """
+        lst = NocaseList(folder=self._folder)
+        # Both lists are set directly, because NocaseList.extend() would
+        # casefold the items again.
+        list.extend(lst, self)
+        # pylint: disable=protected-access
+        lst._casefolded_list = lst._new_casefolded_storage(
+            self._casefolded_items())
+        return lst
+
+
+class MmapNocaseList(_BufferNocaseList):
+    """
+    A case-insensitive and case-preserving read-only list of unicode
+    strings, that is stored in a binary file and memory-mapped.
+
+    The list is case-insensitive and case-preserving in the same way as
+    :class:`NocaseList` and supports its non-modifying operations, and its
+    case-insensitive behavior is defined by a casefold strategy object (see
+    :ref:`Casefold strategies`). Its items cannot be changed, and they must
+    be unicode strings.
+
+    The file is created with :meth:`write`, and contains the original items,
+    their casefolded values, and optionally a hash index of the casefolded
+    values. Opening the file reads only its header, and items are decoded
+    when they are accessed, so that opening the list takes constant time
+    regardless of its size. Because the file is memory-mapped, processes
+    that open the same file share its pages in the page cache of the
+    operating system.
+
+    With the hash index, ``value in mncl``, :meth:`count` and :meth:`index`
+    take O(1) time on average. Without it, they search the casefolded values
+    in the file.
+
+    The file remains open until :meth:`close` is called or the list is used
+    as a context manager and the context is left.
+    """
+
+    def __init__(self, file: Union[str, os.PathLike], *,
+                 folder: Optional[Folder] = None) -> None:
+        """
+        Open a list from a file that was created with :meth:`write`.
+
+        Parameters:
+
+          file (str or path-like): Path name of the file.
+
+          folder (:class:`~nocaselist.Folder`): The casefold strategy object.
+            It must be of the same type as the folder that was used for
+            writing the file. If `None`, a folder of that type is created,
+            which is possible for the folder classes of this package.
+
+        Raises:
+          OSError: The file cannot be opened.
+          ValueError: The file does not contain a list in the binary format
+            of this class, or the folder does not match the file.
+        """
+        self._path = os.fspath(file)
+        with open(self._path, 'rb') as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._attach(self._mmap, f"File {self._path}", folder)
+        except Exception:
+            self.close()
+            raise
+
+    @staticmethod
+    def write(file: Union[str, os.PathLike], iterable=(), *,
+              folder: Optional[Folder] = None,
+              hash_index: bool = True) -> None:
+        """
+        Write the items in the specified iterable with their casefolded
+        values to a file that can be opened as a :class:`MmapNocaseList`.
+
+        Parameters:
+
+          file (str or path-like): Path name of the file. An existing file
+            is replaced.
+
+          iterable (iterable of str): The items for the list. If it is a
+            :class:`NocaseList`, :class:`NocaseArray`,
+            :class:`MmapNocaseList` or :class:`SharedNocaseList` with the same
+            folder, its casefolded items are used without casefolding them
+            again.
+
+          folder (:class:`~nocaselist.Folder`): The casefold strategy object.
+            If `None`, the folder of the iterable is used if it has one, and
+            otherwise :class:`~nocaselist.CasefoldFolder`, which has the same
+            behavior as the default for :class:`NocaseList`.
+
+          hash_index (bool): Include a hash index of the casefolded values
+            in the file, for fast lookups. It needs 8 to 16 bytes per item.
+
+        Raises:
+          TypeError: An item is not a unicode string.
+          OSError: The file cannot be written.
+        """
+        chunks = _chunks(iterable, folder, hash_index)
+        with open(file, 'wb') as fp:
+            fp.writelines(chunks)
+
+    def close(self) -> None:
+        """
+        Close the file of the list. The list cannot be used afterwards.
+        """
+        self._release()
+        self._mmap.close()
+
+    @property
+    def path(self) -> str:
+        """
+        str: Path name of the file of the list.
+        """
+        return self._path
+
+    def __reduce__(self):
+        """
+        Called when pickling the object, see :meth:`py:object.__reduce__`.
+
+        Only the path name of the file and the folder are saved, so the file
+        must be accessible under the same path name when unpickling.
+        """
+        return (partial(self.__class__, folder=self._folder), (self._path,))
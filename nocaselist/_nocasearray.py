@@ -0,0 +1,343 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+This module provides class NocaseArray.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import partial
+from typing import Optional, List, Union
+from typing import SupportsIndex  # type: ignore
+try:
+    import numpy as _np
+except ImportError:
+    _np = None  # pylint: disable=invalid-name
+
+from ._folders import Folder, CasefoldFolder
+from ._nocaselist import NocaseList
+
+__all__ = ['NocaseArray']
+
+
+def _check_values(values: list) -> None:
+    """
+    Raise TypeError if not all values are unicode strings.
+    """
+    types = set(map(type, values))
+    if not types <= {str}:
+        raise TypeError(
+            "NocaseArray items must be unicode strings, not "
+            f"{', '.join(sorted(t.__name__ for t in types - {str}))}")
+
+
+def _shares_casefolding(other: object, folder: Folder) -> bool:
+    """
+    Return a boolean indicating whether the other object is a NocaseList or
+    NocaseArray whose casefolded items are the result of the folder.
+    """
+    if isinstance(other, NocaseArray):
+        # pylint: disable=protected-access
+        return other._folder == folder
+    if isinstance(other, NocaseList) and not other.casefold_nested_as_tuple:
+        # pylint: disable=protected-access
+        if other._folder is None:
+            # The default __casefold__() method behaves like CasefoldFolder
+            return type(other).__casefold__ is NocaseList.__casefold__ and \
+                folder == CasefoldFolder()
+        return other._folder == folder
+    return False
+
+
+class NocaseArray:
+    """
+    A case-insensitive and case-preserving read-only array of unicode
+    strings, for very large numbers of items.
+
+    The array is case-insensitive and case-preserving in the same way as
+    :class:`NocaseList`, and its case-insensitive behavior is defined by a
+    casefold strategy object (see :ref:`Casefold strategies`). In contrast to
+    :class:`NocaseList`, its items cannot be changed, and they must be
+    unicode strings.
+
+    If the `NumPy <https://numpy.org/>`_ package is installed (e.g. with
+    ``pip install nocaselist[numpy]``), the original and casefolded items are
+    stored in NumPy arrays of fixed-width unicode strings instead of
+    Python lists, which avoids the overhead of one Python object per item.
+    Otherwise, Python lists are used. Note that NumPy does not preserve
+    trailing NUL characters in unicode strings.
+
+    All items are casefolded at once when the array is created. Lookups use
+    an index with the casefolded items in sorted order, so that
+    ``value in nca``, :meth:`index`, :meth:`count` and :meth:`isin` take
+    O(log(n)) time per looked up value instead of O(n) time.
+    """
+
+    def __init__(self, iterable=(), *, folder: Optional[Folder] = None,
+                 use_numpy: Optional[bool] = None) -> None:
+        """
+        Initialize the array with the items in the specified iterable.
+
+        Parameters:
+
+          iterable (iterable of str): The items for the array. If it is a
+            :class:`NocaseList` or :class:`NocaseArray` with the same folder,
+            its casefolded items are used without casefolding them again.
+
+          folder (:class:`~nocaselist.Folder`): The casefold strategy object.
+            If `None`, the folder of the iterable is used if it is a
+            :class:`NocaseList` or :class:`NocaseArray` that has one, and
+            otherwise :class:`~nocaselist.CasefoldFolder`, which has the same
+            behavior as the default for :class:`NocaseList`.
+
+          use_numpy (bool): Controls whether NumPy arrays are used for storing
+            the items. If `None`, they are used if NumPy is installed.
+
+        Raises:
+          TypeError: An item is not a unicode string.
+          ImportError: NumPy was requested but is not installed.
+        """
+        if folder is None:
+            folder = getattr(iterable, '_folder', None) or CasefoldFolder()
+        if use_numpy is None:
+            use_numpy = _np is not None
+        elif use_numpy and _np is None:
+            raise ImportError("NocaseArray with use_numpy=True requires the "
+                              "numpy package to be installed")
+        self._folder: Folder = folder
+        self._use_numpy: bool = use_numpy
+
+        if _shares_casefolding(iterable, folder):
+            values = list(iterable)
+            _check_values(values)
+            if isinstance(iterable, NocaseList):
+                # pylint: disable=protected-access
+                values_cf = iterable._casefolded_list
+            else:
+                values_cf = iterable._casefolded_items()
+        else:
+            values = list(iterable)
+            _check_values(values)
+            values_cf = folder.fold_many(values)
+        self._set_items(values, values_cf)
+
+    def _set_items(self, values, values_cf) -> None:
+        """
+        Set the original and casefolded items of the array, and build the
+        lookup index.
+
+        The _order attribute has the positions of the items in the order of
+        their casefolded values, and the _sorted_casefolded attribute has the
+        casefolded values in that order. Because the sort is stable, the
+        positions for equal casefolded values are in ascending order. The
+        casefolded values are not stored in the order of the items, in order
+        to save memory.
+        """
+        if self._use_numpy:
+            self._values = _np.array(values, dtype=str)
+            values_cf = _np.array(values_cf, dtype=str)
+            self._order = _np.argsort(values_cf, kind='stable')
+            self._sorted_casefolded = values_cf[self._order]
+        else:
+            self._values = list(values)
+            # An array of positions needs less memory than a list of ints
+            self._order = array('q', sorted(range(len(values_cf)),
+                                            key=values_cf.__getitem__))
+            self._sorted_casefolded = [values_cf[i] for i in self._order]
+
+    def _casefolded_items(self):
+        """
+        Return the casefolded values in the order of the items, as a NumPy
+        array or list.
+        """
+        if self._use_numpy:
+            values_cf = _np.empty_like(self._sorted_casefolded)
+            values_cf[self._order] = self._sorted_casefolded
+            return values_cf
+        values_cf = [None] * len(self._order)
+        for i, value_cf in zip(self._order, self._sorted_casefolded):
+            values_cf[i] = value_cf
+        return values_cf
+
+    @property
+    def folder(self) -> Folder:
+        """
+        :class:`~nocaselist.Folder`: The casefold strategy object of the array.
+        """
+        return self._folder
+
+    @property
+    def uses_numpy(self) -> bool:
+        """
+        bool: Indicates whether the items are stored in NumPy arrays.
+        """
+        return self._use_numpy
+
+    def _range(self, value: str) -> tuple:
+        """
+        Return the range of the sorted casefolded items that are equal to the
+        casefolded value, as a tuple (lo, hi).
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        value_cf = self._folder.fold(value)
+        if self._use_numpy:
+            lo = int(_np.searchsorted(self._sorted_casefolded, value_cf,
+                                      side='left'))
+            hi = int(_np.searchsorted(self._sorted_casefolded, value_cf,
+                                      side='right'))
+        else:
+            lo = bisect_left(self._sorted_casefolded, value_cf)
+            hi = bisect_right(self._sorted_casefolded, value_cf, lo)
+        return lo, hi
+
+    def __reduce__(self):
+        """
+        Called when pickling the object, see :meth:`py:object.__reduce__`.
+
+        In order to save space and time, only the originally cased items are
+        saved, but not the casefolded items or the lookup index.
+        """
+        return (partial(self.__class__, folder=self._folder),
+                (list(self),))
+
+    def __len__(self) -> int:
+        """
+        Return the number of items in the array.
+
+        Invoked using ``len(nca)``.
+        """
+        return len(self._values)
+
+    def __iter__(self):
+        """
+        Return an iterator through the items of the array, as :class:`py:str`
+        objects.
+
+        Invoked using ``iter(nca)``.
+        """
+        if self._use_numpy:
+            return iter(self._values.tolist())
+        return iter(self._values)
+
+    def __getitem__(self, index: Union[SupportsIndex, slice]):
+        """
+        Return the value of the item at an existing index in the array, or a
+        new :class:`NocaseArray` with the items of a slice of the array.
+
+        Invoked using ``nca[index]``.
+
+        Raises:
+          IndexError: The index is out of range.
+        """
+        if isinstance(index, slice):
+            arr = self.__class__.__new__(self.__class__)
+            arr._folder = self._folder
+            arr._use_numpy = self._use_numpy
+            arr._set_items(self._values[index],
+                           self._casefolded_items()[index])
+            return arr
+        return str(self._values[index])
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the array.
+
+        Invoked using ``repr(nca)``.
+        """
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+    def __contains__(self, value: str) -> bool:
+        """
+        Return a boolean indicating whether the array contains at least one
+        item with the value, by looking it up case-insensitively.
+
+        Invoked using ``value in nca``.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        lo, hi = self._range(value)
+        return hi > lo
+
+    def count(self, value: str) -> int:
+        """
+        Return the number of times the specified value occurs in the array,
+        comparing the value and the array items case-insensitively.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        lo, hi = self._range(value)
+        return hi - lo
+
+    def index(self, value: str, start: SupportsIndex = 0,
+              stop: Optional[SupportsIndex] = None) -> int:
+        """
+        Return the index of the first item that is equal to the specified
+        value, comparing the value and the array items case-insensitively.
+
+        The search is limited to the index range defined by the specified
+        ``start`` and ``stop`` parameters, whereby ``stop`` is the index
+        of the first item after the search range.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+          ValueError: No such item is found.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        lo, hi = self._range(value)
+        if self._use_numpy:
+            i = lo + int(_np.searchsorted(self._order[lo:hi], start))
+        else:
+            i = bisect_left(self._order, start, lo, hi)
+        if i < hi and self._order[i] < stop:
+            return int(self._order[i])
+        raise ValueError(f"{value!r} is not in NocaseArray")
+
+    def isin(self, values) -> Union[List[bool], '_np.ndarray']:
+        """
+        Return for each of the specified values whether the array contains
+        at least one item with that value, comparing the values and the
+        array items case-insensitively.
+
+        Parameters:
+          values (iterable of str): The values to be looked up.
+
+        Returns:
+          ``numpy.ndarray`` of bool if the array uses NumPy, or
+          :class:`py:list` of bool otherwise.
+
+        Raises:
+          AttributeError: A value does not have the casefold method.
+        """
+        values_cf = self._folder.fold_many(list(values))
+        sorted_cf = self._sorted_casefolded
+        if self._use_numpy:
+            values_cf = _np.array(values_cf, dtype=str)
+            if len(sorted_cf) == 0:
+                return _np.zeros(len(values_cf), dtype=bool)
+            pos = _np.searchsorted(sorted_cf, values_cf)
+            pos = _np.minimum(pos, len(sorted_cf) - 1)
+            return sorted_cf[pos] == values_cf
+        result = []
+        for value_cf in values_cf:
+            i = bisect_left(sorted_cf, value_cf)
+            result.append(i < len(sorted_cf) and sorted_cf[i] == value_cf)
+        return result
+
+    def to_list(self) -> NocaseList:
+        """
+        Return a new :class:`NocaseList` object with the items of the array
+        and the same folder, without casefolding the items again.
+        """
+        lst = NocaseList(folder=self._folder)
+        # Both lists are set directly, because NocaseList.extend() would
+        # casefold the items again.
+        list.extend(lst, self)
+        # pylint: disable=protected-access
+        values_cf = self._casefolded_items()
+        if self._use_numpy:
+            values_cf = values_cf.tolist()
+        lst._casefolded_list = values_cf
+        return lst
@@ -0,0 +1,866 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+This module provides class NocaseBlockList.
+"""
+
+import sys
+from operator import index as _index
+from functools import partial
+from itertools import accumulate, chain, compress
+from typing import Callable, Optional, Dict
+from typing import SupportsIndex  # type: ignore
+if sys.version_info[0:2] >= (3, 9):
+    from collections.abc import Iterable, MutableSequence  # type: ignore
+else:
+    # Before py39, collections.abc.Iterable did not support generic type
+    from typing import Iterable, MutableSequence
+
+from ._folders import Folder
+from ._nocaselist import NocaseList, CaseVariants, Value, IndexOrSlice, \
+    _hashable, _case_variants, _canonical_spellings
+from ._nocasesnapshot import NocaseSnapshot
+
+__all__ = ['NocaseBlockList']
+
+
+class NocaseBlockList(MutableSequence):
+    """
+    A case-insensitive and case-preserving list that stores its items in
+    blocks, for large lists with frequent insertions and deletions at
+    arbitrary positions.
+
+    The list has the same case-insensitive and case-preserving behavior and
+    the same methods as :class:`NocaseList`, including the use of the
+    ``folder`` parameter and the :meth:`__casefold__` method. However, it is
+    not derived from the built-in :class:`py:list` class.
+
+    The items are stored in a list of blocks of at most
+    :attr:`block_size` items each, with a second list of blocks for the
+    casefolded items. Inserting or deleting an item at an arbitrary position
+    (e.g. ``insert(0, value)`` or ``pop(0)``) only shifts the items of one
+    block and updates a tree of block lengths, i.e. it takes
+    O(block_size + log(n)) instead of O(n) time. Accessing an item by index
+    takes O(log(n)) time.
+
+    An immutable view of the current items can be taken in O(1) time with
+    :meth:`snapshot`, which shares the blocks with the list.
+
+    The list supports serialization via the Python :mod:`py:pickle` module.
+    Only the originally cased items are serialized.
+    """
+
+    #: Maximum number of items in a block. Blocks that grow beyond this size
+    #: are split in half. Subclasses can override this attribute.
+    block_size: int = 1000
+
+    # The casefold behavior is the same as for NocaseList, including any
+    # overriding of __casefold__() in subclasses.
+    casefold_nested_as_tuple = NocaseList.casefold_nested_as_tuple
+    __casefold__ = staticmethod(NocaseList.__casefold__)
+    _casefolded_value = NocaseList._casefolded_value
+    _new_casefolded_list = NocaseList._new_casefolded_list
+    _folder: Optional[Folder] = None
+    folder = NocaseList.folder
+
+    def __init__(self, iterable=(), *, folder: Optional[Folder] = None) \
+            -> None:
+        """
+        Initialize the list with the items in the specified iterable.
+
+        The ``folder`` parameter is the casefold strategy object, as for
+        :class:`NocaseList`. If `None` and the iterable is a
+        :class:`NocaseList` or :class:`NocaseBlockList`, the folder of that
+        list is used.
+        """
+        if folder is None and \
+                isinstance(iterable, (NocaseList, NocaseBlockList)):
+            folder = iterable._folder  # pylint: disable=protected-access
+        if folder is not None:
+            self._folder = folder
+        # The _blocks attribute is a list of blocks, each of which is a list
+        # of original items. The _casefolded_blocks attribute is a list of
+        # blocks with the corresponding casefolded items.
+        self._blocks: list = []
+        self._casefolded_blocks: list = []
+        # The _tree attribute is a Fenwick tree (binary indexed tree) over the
+        # block lengths for locating list indexes in O(log(n)), or None if it
+        # needs to be rebuilt because blocks have been added or removed.
+        self._tree: Optional[list] = None
+        self._len: int = 0
+        # The _shared_lists attribute indicates whether the lists of blocks
+        # may be shared with a snapshot. The _owned_blocks attribute is None
+        # if no blocks are shared with a snapshot. Otherwise, the blocks that
+        # existed when the last snapshot was taken may be shared, and it is
+        # the set of the ids of the blocks that have been copied since then.
+        self._shared_lists: bool = False
+        self._owned_blocks: Optional[set] = None
+        if self._shares_casefolding(iterable):
+            values, values_cf = _items_of(iterable)
+            self._set_items(list(values), list(values_cf))
+        else:
+            values = list(iterable)
+            self._set_items(values, self._new_casefolded_list(values))
+
+    def _set_items(self, values: list, values_cf: list) -> None:
+        """
+        Replace all items of the list with the specified original and
+        casefolded items, which are stored in full blocks.
+        """
+        size = self.block_size
+        self._blocks = [values[i:i + size]
+                        for i in range(0, len(values), size)]
+        self._casefolded_blocks = [values_cf[i:i + size]
+                                   for i in range(0, len(values_cf), size)]
+        self._tree = None
+        self._len = len(values)
+        self._shared_lists = False
+        self._owned_blocks = None
+
+    def _shares_casefolding(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the other object is a NocaseList
+        or NocaseBlockList whose casefolded items can be used by this list.
+        """
+        # pylint: disable=protected-access
+        # Without a folder, the items are casefolded by the __casefold__()
+        # method, which may be overridden in a subclass.
+        return isinstance(other, (NocaseList, NocaseBlockList)) and \
+            other.casefold_nested_as_tuple == \
+            self.casefold_nested_as_tuple and \
+            other._folder == self._folder and \
+            (self._folder is not None or
+             type(other).__casefold__ is type(self).__casefold__)
+
+    def _items(self) -> tuple:
+        """
+        Return a tuple of a flat list of the original items and a flat list of
+        the casefolded items.
+        """
+        return (list(chain.from_iterable(self._blocks)),
+                list(chain.from_iterable(self._casefolded_blocks)))
+
+    def _own_lists(self) -> None:
+        """
+        Copy the list of blocks and the list of casefolded blocks if they may
+        be shared with a snapshot, so that blocks can be added, removed or
+        replaced.
+        """
+        if self._shared_lists:
+            self._blocks = list(self._blocks)
+            self._casefolded_blocks = list(self._casefolded_blocks)
+            self._shared_lists = False
+
+    def _own_block(self, block_index: int) -> list:
+        """
+        Copy the specified block and its casefolded block if they may be
+        shared with a snapshot, so that they can be changed in place, and
+        return the block.
+        """
+        block = self._blocks[block_index]
+        owned = self._owned_blocks
+        if owned is not None and id(block) not in owned:
+            self._own_lists()
+            block = list(block)
+            self._blocks[block_index] = block
+            self._casefolded_blocks[block_index] = list(
+                self._casefolded_blocks[block_index])
+            owned.add(id(block))
+        return block
+
+    def _get_tree(self) -> list:
+        """
+        Return the Fenwick tree over the block lengths, building it if needed.
+        Element i (1-based) of the tree holds the sum of the lengths of the
+        blocks i-(i&-i) to i-1 (0-based).
+        """
+        tree = self._tree
+        if tree is None:
+            tree = [0]
+            tree.extend(map(len, self._blocks))
+            size = len(tree)
+            for i in range(1, size):
+                j = i + (i & -i)
+                if j < size:
+                    tree[j] += tree[i]
+            self._tree = tree
+        return tree
+
+    def _update_tree(self, block_index: int, delta: int) -> None:
+        """
+        Update the Fenwick tree for a change of the length of the specified
+        block by the specified delta.
+        """
+        tree = self._tree
+        if tree is None:
+            return
+        size = len(tree)
+        i = block_index + 1
+        while i < size:
+            tree[i] += delta
+            i += i & -i
+
+    def _locate(self, index: SupportsIndex) -> tuple:
+        """
+        Return a tuple of the block index and the index within that block,
+        for the specified list index.
+
+        Raises:
+          IndexError: The index is out of range.
+        """
+        index = _index(index)
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("NocaseBlockList index out of range")
+        tree = self._get_tree()
+        size = len(tree)
+        block_index = 0
+        mask = 1 << (size - 1).bit_length()
+        while mask:
+            i = block_index + mask
+            if i < size and tree[i] <= index:
+                block_index = i
+                index -= tree[i]
+            mask >>= 1
+        return block_index, index
+
+    def _split_block(self, block_index: int) -> None:
+        """
+        Split the specified block in half, if it has grown beyond the block
+        size.
+        """
+        block = self._blocks[block_index]
+        if len(block) <= self.block_size:
+            return
+        half = len(block) // 2
+        block_cf = self._casefolded_blocks[block_index]
+        self._blocks[block_index:block_index + 1] = [block[:half],
+                                                     block[half:]]
+        self._casefolded_blocks[block_index:block_index + 1] = [
+            block_cf[:half], block_cf[half:]]
+        self._tree = None
+
+    def _delete_in_block(self, block_index: int, pos: int) -> None:
+        """
+        Delete the item at the specified position in the specified block.
+        """
+        block = self._own_block(block_index)
+        del block[pos]
+        del self._casefolded_blocks[block_index][pos]
+        self._len -= 1
+        if not block:
+            del self._blocks[block_index]
+            del self._casefolded_blocks[block_index]
+            self._tree = None
+            return
+        self._update_tree(block_index, -1)
+        if block_index < len(self._blocks) - 1:
+            # Merge small blocks with their successor, so that the number of
+            # blocks stays proportional to the number of items.
+            next_block = self._blocks[block_index + 1]
+            if len(block) + len(next_block) <= self.block_size // 4:
+                block.extend(next_block)
+                self._casefolded_blocks[block_index].extend(
+                    self._casefolded_blocks[block_index + 1])
+                del self._blocks[block_index + 1]
+                del self._casefolded_blocks[block_index + 1]
+                self._tree = None
+
+    def __len__(self) -> int:
+        """
+        Return the number of items in the list.
+
+        Invoked using ``len(ncl)``.
+        """
+        return self._len
+
+    def __iter__(self):
+        """
+        Return an iterator through the list items, in their original lexical
+        case.
+
+        Invoked using ``iter(ncl)``.
+        """
+        return chain.from_iterable(self._blocks)
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the list, in the same format as
+        for :class:`py:list`.
+
+        Invoked using ``repr(ncl)``.
+        """
+        return repr(list(self))
+
+    def __reduce__(self):
+        """
+        Called when pickling the object, see :meth:`py:object.__reduce__`.
+
+        In order to save space and time, only the originally cased items are
+        saved, but not the casefolded items.
+        """
+        state = self.__dict__.copy()
+        for name in ('_blocks', '_casefolded_blocks', '_tree', '_len',
+                     '_shared_lists', '_owned_blocks'):
+            del state[name]
+        folder = state.pop('_folder', None)
+        cls = self.__class__ if folder is None else \
+            partial(self.__class__, folder=folder)
+        return (cls, (list(self),), state or None)
+
+    def __getitem__(self, index: IndexOrSlice):
+        """
+        Return the value of the item at an existing index in the list, or a
+        :class:`py:list` with the values of the items of a slice of the list
+        (as for :class:`NocaseList`).
+
+        Invoked using ``ncl[index]``.
+
+        Raises:
+          IndexError: The index is out of range.
+        """
+        if isinstance(index, slice):
+            return list(self)[index]
+        block_index, pos = self._locate(index)
+        return self._blocks[block_index][pos]
+
+    def __setitem__(self, index: IndexOrSlice, value: Value) -> None:
+        """
+        Update the value of the item at an existing index or slice in the list.
+
+        Invoked using ``ncl[index] = value``.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+          IndexError: The index is out of range.
+        """
+        if isinstance(index, slice):
+            value = list(value)  # type: ignore
+            value_cf = self._new_casefolded_list(value)
+            values, values_cf = self._items()
+            values[index] = value  # type: ignore
+            values_cf[index] = value_cf  # type: ignore
+            self._set_items(values, values_cf)
+            return
+        block_index, pos = self._locate(index)
+        value_cf = self._casefolded_value(value)
+        self._own_block(block_index)[pos] = value
+        self._casefolded_blocks[block_index][pos] = value_cf
+
+    def __delitem__(self, index: IndexOrSlice) -> None:
+        """
+        Delete an item at an existing index or slice from the list.
+
+        Invoked using ``del ncl[index]``.
+
+        Raises:
+          IndexError: The index is out of range.
+        """
+        if isinstance(index, slice):
+            values, values_cf = self._items()
+            del values[index]
+            del values_cf[index]
+            self._set_items(values, values_cf)
+            return
+        self._delete_in_block(*self._locate(index))
+
+    def __contains__(self, value: Value) -> bool:
+        """
+        Return a boolean indicating whether the list contains at least one
+        item with the value, by looking it up case-insensitively.
+
+        Invoked using ``value in ncl``.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        value_cf = self._casefolded_value(value)
+        return any(value_cf in block_cf
+                   for block_cf in self._casefolded_blocks)
+
+    def __add__(self, other: Iterable) -> 'NocaseBlockList':
+        """
+        Return a new :class:`NocaseBlockList` object that contains the items
+        from the left hand operand (``self``) and the items from the right hand
+        operand (``other``).
+
+        The right hand operand (``other``) must be an instance of
+        :class:`py:list` (including :class:`NocaseList`), :class:`py:tuple` or
+        :class:`NocaseBlockList`. The operands are not changed.
+
+        Invoked using e.g. ``ncl + other``
+
+        Raises:
+          TypeError: The other iterable is not a list or tuple
+        """
+        if not isinstance(other, (list, tuple, NocaseBlockList)):
+            raise TypeError(
+                f"Can only concatenate list or tuple (not {type(other)}) to "
+                "NocaseBlockList")
+        lst = self.copy()
+        lst.extend(other)
+        return lst
+
+    def __iadd__(self, other: Iterable) -> 'NocaseBlockList':
+        """
+        Extend the left hand operand (``self``) by the items from the right
+        hand operand (``other``).
+
+        Invoked using ``ncl += other``.
+        """
+        self.extend(other)
+        return self
+
+    def __mul__(self, number: int) -> 'NocaseBlockList':
+        """
+        Return a new :class:`NocaseBlockList` object that contains the items
+        from the left hand operand (``self``) as many times as specified by the
+        right hand operand (``number``).
+
+        A number <= 0 causes the returned list to be empty.
+
+        Invoked using ``ncl * number``.
+        """
+        if not isinstance(number, int):
+            raise TypeError(
+                "Cannot multiply NocaseBlockList by non-integer of type "
+                f"{type(number)}")
+        values, values_cf = self._items()
+        return self._new_from_items(values * number, values_cf * number)
+
+    def __rmul__(self, number: int) -> 'NocaseBlockList':
+        """
+        Return a new :class:`NocaseBlockList` object that contains the items
+        from the right hand operand (``self``) as many times as specified by
+        the left hand operand (``number``).
+
+        Invoked using ``number * ncl``.
+        """
+        return self * number
+
+    def __imul__(self, number: int) -> 'NocaseBlockList':
+        """
+        Change the left hand operand (``self``) so that it contains the items
+        from the original left hand operand (``self``) as many times as
+        specified by the right hand operand (``number``).
+
+        Invoked using ``ncl *= number``.
+        """
+        if not isinstance(number, int):
+            raise TypeError(
+                "Cannot multiply NocaseBlockList by non-integer of type "
+                f"{type(number)}")
+        values, values_cf = self._items()
+        self._set_items(values * number, values_cf * number)
+        return self
+
+    def __reversed__(self) -> 'NocaseBlockList':  # type: ignore
+        """
+        Return a shallow copy of the list that has its items reversed in order.
+
+        Invoked using ``reversed(ncl)``.
+        """
+        lst = self.copy()
+        lst.reverse()
+        return lst
+
+    def _other_casefolded_list(self, other: object) -> Optional[list]:
+        """
+        Return the casefolded items of the other operand of a comparison as a
+        list, or None if the other operand is not iterable.
+        """
+        if self._shares_casefolding(other):
+            return _items_of(other)[1]
+        if isinstance(other, Iterable):
+            return self._new_casefolded_list(other)
+        return None
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list and the other list are
+        equal, by comparing corresponding list items case-insensitively.
+
+        Invoked using e.g. ``ncl == other``.
+        """
+        other_cf = self._other_casefolded_list(other)
+        if other_cf is None:
+            return NotImplemented
+        return self._items()[1] == other_cf
+
+    def __ne__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list and the other list are
+        not equal, by comparing corresponding list items case-insensitively.
+
+        Invoked using e.g. ``ncl != other``.
+        """
+        eq = self.__eq__(other)
+        if eq is NotImplemented:
+            return NotImplemented
+        return not eq
+
+    def __gt__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list is greater than the other
+        list, by comparing corresponding list items case-insensitively.
+
+        Invoked using e.g. ``ncl > other``.
+        """
+        other_cf = self._other_casefolded_list(other)
+        if other_cf is None:
+            return NotImplemented
+        return self._items()[1] > other_cf
+
+    def __lt__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list is less than the other
+        list, by comparing corresponding list items case-insensitively.
+
+        Invoked using e.g. ``ncl < other``.
+        """
+        other_cf = self._other_casefolded_list(other)
+        if other_cf is None:
+            return NotImplemented
+        return self._items()[1] < other_cf
+
+    def __ge__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list is greater than or
+        equal to the other list, by comparing corresponding list items
+        case-insensitively.
+
+        Invoked using e.g. ``ncl >= other``.
+        """
+        lt = self.__lt__(other)
+        if lt is NotImplemented:
+            return NotImplemented
+        return not lt
+
+    def __le__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the list is less than or
+        equal to the other list, by comparing corresponding list items
+        case-insensitively.
+
+        Invoked using e.g. ``ncl <= other``.
+        """
+        gt = self.__gt__(other)
+        if gt is NotImplemented:
+            return NotImplemented
+        return not gt
+
+    def _new_from_items(self, values: list, values_cf: list) \
+            -> 'NocaseBlockList':
+        """
+        Return a new list of the same class with the specified original and
+        casefolded items, without casefolding them again.
+        """
+        lst = self.__class__(folder=self._folder)
+        lst._set_items(values, values_cf)
+        return lst
+
+    def count(self, value: Value) -> int:
+        """
+        Return the number of times the specified value occurs in the list,
+        comparing the value and the list items case-insensitively.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        value_cf = self._casefolded_value(value)
+        return sum(block_cf.count(value_cf)
+                   for block_cf in self._casefolded_blocks)
+
+    def copy(self) -> 'NocaseBlockList':
+        """
+        Return a shallow copy of the list.
+        """
+        return self._new_from_items(*self._items())
+
+    def clear(self) -> None:
+        """
+        Remove all items from the list (and return None).
+        """
+        self._set_items([], [])
+
+    def index(self, value: Value, start: SupportsIndex = 0,
+              stop: SupportsIndex = sys.maxsize) -> int:
+        """
+        Return the index of the first item that is equal to the specified
+        value, comparing the value and the list items case-insensitively.
+
+        The search is limited to the index range defined by the specified
+        ``start`` and ``stop`` parameters, whereby ``stop`` is the index
+        of the first item after the search range.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+          ValueError: No such item is found.
+        """
+        value_cf = self._casefolded_value(value)
+        start, stop, _ = slice(start, stop).indices(self._len)
+        if start < stop:
+            block_index, pos = self._locate(start)
+            offset = start - pos
+            for block_cf in self._casefolded_blocks[block_index:]:
+                if offset >= stop:
+                    break
+                try:
+                    pos = block_cf.index(
+                        value_cf, max(start - offset, 0), stop - offset)
+                except ValueError:
+                    offset += len(block_cf)
+                    continue
+                return offset + pos
+        raise ValueError(f"{value!r} is not in NocaseBlockList")
+
+    def append(self, value: Value) -> None:
+        """
+        Append the specified value as a new item to the end of the list
+        (and return None).
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        value_cf = self._casefolded_value(value)
+        if not self._blocks:
+            self._own_lists()
+            self._blocks.append([])
+            self._casefolded_blocks.append([])
+            self._tree = None
+        self._own_block(-1).append(value)
+        self._casefolded_blocks[-1].append(value_cf)
+        self._len += 1
+        self._update_tree(len(self._blocks) - 1, 1)
+        self._split_block(len(self._blocks) - 1)
+
+    def extend(self, values: Iterable) -> None:
+        """
+        Extend the list by the items in the specified iterable
+        (and return None).
+
+        The items are casefolded in bulk and appended block-wise.
+
+        Raises:
+          AttributeError: A value in the iterable does not have the casefold
+            method.
+        """
+        if self._shares_casefolding(values):
+            values, values_cf = _items_of(values)
+        else:
+            values = list(values)
+            values_cf = self._new_casefolded_list(values)
+        size = self.block_size
+        i = 0
+        if self._blocks:
+            i = max(size - len(self._blocks[-1]), 0)
+            if i and values:
+                self._own_block(-1).extend(values[:i])
+                self._casefolded_blocks[-1].extend(values_cf[:i])
+                self._update_tree(len(self._blocks) - 1, min(i, len(values)))
+        if i < len(values):
+            self._own_lists()
+        for j in range(i, len(values), size):
+            self._blocks.append(values[j:j + size])
+            self._casefolded_blocks.append(values_cf[j:j + size])
+            self._tree = None
+        self._len += len(values)
+
+    def insert(self, index: SupportsIndex, value: Value) -> None:
+        """
+        Insert a new item with specified value before the item at the specified
+        index (and return None).
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        index = _index(index)
+        if index < 0:
+            index = max(index + self._len, 0)
+        if index >= self._len:
+            self.append(value)
+            return
+        value_cf = self._casefolded_value(value)
+        block_index, pos = self._locate(index)
+        self._own_block(block_index).insert(pos, value)
+        self._casefolded_blocks[block_index].insert(pos, value_cf)
+        self._len += 1
+        self._update_tree(block_index, 1)
+        self._split_block(block_index)
+
+    def pop(self, index: SupportsIndex = -1) -> Value:
+        """
+        Return the value of the item at the specified index and also remove it
+        from the list.
+
+        Raises:
+          IndexError: The list is empty or the index is out of range.
+        """
+        block_index, pos = self._locate(index)
+        value = self._blocks[block_index][pos]
+        self._delete_in_block(block_index, pos)
+        return value
+
+    def remove(self, value: Value) -> None:
+        """
+        Remove the first item from the list whose value is equal to the
+        specified value (and return None), comparing the value and the list
+        items case-insensitively.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+          ValueError: No such item is found.
+        """
+        del self[self.index(value)]
+
+    def remove_all(self, values: Iterable) -> int:
+        """
+        Remove all items from the list whose value is equal to any of the
+        specified values (and return the number of removed items), comparing
+        the values and the list items case-insensitively.
+
+        Raises:
+          AttributeError: A value in the iterable does not have the casefold
+            method.
+        """
+        values_cf = {_hashable(v) for v in self._new_casefolded_list(values)}
+        return self._compact(
+            [_hashable(value_cf) not in values_cf
+             for value_cf in chain.from_iterable(self._casefolded_blocks)])
+
+    def discard(self, value: Value) -> None:
+        """
+        Remove the first item from the list whose value is equal to the
+        specified value, if there is such an item (and return None), comparing
+        the value and the list items case-insensitively.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        try:
+            index = self.index(value)
+        except ValueError:
+            return
+        del self[index]
+
+    def retain(self, predicate: Callable) -> int:
+        """
+        Remove all items from the list for which the specified predicate
+        function returns false (and return the number of removed items).
+
+        The predicate function is called once for each list item with its
+        original (not casefolded) value.
+        """
+        return self._compact([bool(predicate(value)) for value in self])
+
+    def _compact(self, keep: list) -> int:
+        """
+        Remove the list items whose corresponding flag in the specified list
+        is false, and return the number of removed items.
+        """
+        removed = len(keep) - sum(keep)
+        if removed:
+            values, values_cf = self._items()
+            self._set_items(list(compress(values, keep)),
+                            list(compress(values_cf, keep)))
+        return removed
+
+    def case_variants(self) -> Dict[Value, CaseVariants]:
+        """
+        Return the items of the list grouped by their casefolded value.
+
+        See :meth:`NocaseList.case_variants` for details.
+        """
+        return _case_variants(chain.from_iterable(self._blocks),
+                              chain.from_iterable(self._casefolded_blocks))
+
+    def canonicalize(self, prefer: str = 'first') -> int:
+        """
+        Change all items of the list that are case-insensitively equal, to have
+        the same lexical case (and return the number of changed items).
+
+        See :meth:`NocaseList.canonicalize` for details.
+
+        Raises:
+          ValueError: Invalid value for the ``prefer`` parameter.
+        """
+        canonical = _canonical_spellings(
+            chain.from_iterable(self._blocks),
+            chain.from_iterable(self._casefolded_blocks), prefer)
+        changed = 0
+        for block_index, block_cf in enumerate(self._casefolded_blocks):
+            block = self._blocks[block_index]
+            for pos, value_cf in enumerate(block_cf):
+                value = canonical[_hashable(value_cf)]
+                if block[pos] != value:
+                    block = self._own_block(block_index)
+                    block[pos] = value
+                    changed += 1
+        return changed
+
+    def snapshot(self) -> NocaseSnapshot:
+        """
+        Return an immutable snapshot of the current items of the list, as a
+        :class:`NocaseSnapshot` object, in O(1) time.
+
+        The snapshot shares the blocks with the list. The list copies a block
+        only when it changes the block for the first time after the snapshot
+        was taken, and copies its lists of blocks only when it adds or removes
+        a block for the first time. This moves the cost of isolating the
+        snapshot to the writer, which pays for it at most once per block, in
+        proportion to the number of blocks it changes.
+
+        The list itself is not thread-safe, so the snapshot needs to be taken
+        by the thread that changes the list (or while holding a lock that
+        serializes the changes). The snapshot can then be passed to any
+        number of reading threads.
+        """
+        self._shared_lists = True
+        self._owned_blocks = set()
+        return NocaseSnapshot(self, self._blocks, self._casefolded_blocks,
+                              self._len)
+
+    def reverse(self) -> None:
+        """
+        Reverse the items in the list in place (and return None).
+        """
+        values, values_cf = self._items()
+        values.reverse()
+        values_cf.reverse()
+        self._set_items(values, values_cf)
+
+    def sort(self, *, key: Optional[Callable] = None,
+             reverse: bool = False) -> None:
+        """
+        Sort the items in the list in place (and return None).
+
+        The sort is stable, in that the order of two (case-insensitively) equal
+        elements is maintained.
+
+        By default, the list is sorted in ascending order of its casefolded
+        item values. If a key function is given, it is applied once to each
+        casefolded list item and the list is sorted in ascending or
+        descending order of their key function values.
+
+        The ``reverse`` flag can be set to sort in descending order.
+        """
+        values, values_cf = self._items()
+        if key:
+            keys = [key(value_cf) for value_cf in values_cf]
+        else:
+            keys = values_cf
+        order = sorted(range(len(values)), key=keys.__getitem__,
+                       reverse=reverse)
+        self._set_items([values[i] for i in order],
+                        [values_cf[i] for i in order])
+
+
+def _items_of(lst) -> tuple:
+    """
+    Return a tuple of the original and casefolded items of a NocaseList or
+    NocaseBlockList object, as lists.
+    """
+    if isinstance(lst, NocaseList):
+        # pylint: disable=protected-access
+        return list(lst), lst._casefolded_list
+    return lst._items()  # pylint: disable=protected-access
@@ -0,0 +1,479 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+This module provides class NocaseDeque.
+"""
+
+import sys
+from collections import deque
+from functools import partial
+from typing import Optional
+from typing import SupportsIndex  # type: ignore
+if sys.version_info[0:2] >= (3, 9):
+    from collections.abc import Iterable  # type: ignore
+else:
+    # Before py39, collections.abc.Iterable did not support generic type
+    from typing import Iterable
+
+from ._folders import Folder
+from ._nocaselist import NocaseList, Value
+
+__all__ = ['NocaseDeque']
+
+
+class NocaseDeque(deque):
+    """
+    A case-insensitive and case-preserving double-ended queue.
+
+    The deque is case-insensitive: Whenever items of the deque are looked up
+    by value or item values are compared, that is done case-insensitively. The
+    case-insensitivity is defined by the ``folder`` parameter or the
+    :meth:`__casefold__` method, which are the same as for
+    :class:`NocaseList`.
+
+    The deque is case-preserving: Whenever the value of deque items is
+    returned, they have the lexical case that was originally specified when
+    adding or updating the item.
+
+    Except for the case-insensitivity of its items, it behaves like, and is
+    in fact derived from, the built-in :class:`py:collections.deque` class. In
+    particular, items can be added and removed at both ends in O(1) time, and
+    a deque with a ``maxlen`` discards items from the opposite end when new
+    items are added to a full deque.
+
+    The implementation maintains a second deque with the casefolded items of
+    the inherited deque, and ensures that both deques are in sync.
+
+    The deque supports serialization via the Python :mod:`py:pickle` module.
+    Only the originally cased items are serialized.
+    """
+
+    # The casefold behavior is the same as for NocaseList, including any
+    # overriding of __casefold__() in subclasses.
+    casefold_nested_as_tuple = NocaseList.casefold_nested_as_tuple
+    __casefold__ = staticmethod(NocaseList.__casefold__)
+    _casefolded_value = NocaseList._casefolded_value
+    _new_casefolded_list = NocaseList._new_casefolded_list
+    _folder: Optional[Folder] = None
+    folder = NocaseList.folder
+
+    def __init__(self, iterable=(), maxlen: Optional[int] = None, *,
+                 folder: Optional[Folder] = None) -> None:
+        """
+        Initialize the deque with the items in the specified iterable.
+
+        If ``maxlen`` is specified, the deque is bounded to that maximum
+        length, and only the last ``maxlen`` items of the iterable are kept.
+
+        The ``folder`` parameter is the casefold strategy object, as for
+        :class:`NocaseList`. If `None` and the iterable is a
+        :class:`NocaseDeque` or :class:`NocaseList`, the folder of that
+        object is used.
+        """
+        super().__init__(iterable, maxlen)
+
+        if folder is None and isinstance(iterable, (NocaseDeque, NocaseList)):
+            folder = iterable._folder  # pylint: disable=protected-access
+        if folder is not None:
+            self._folder = folder
+
+        # The _casefolded_deque attribute is a deque with the same items and
+        # maximum length as the original (inherited) deque, except they are
+        # casefolded using the __casefold__() method.
+        casefolded = self._reusable_casefolded(iterable)
+        if casefolded is None:
+            casefolded = self._new_casefolded_list(self)
+        self._casefolded_deque: deque = deque(casefolded, maxlen)
+
+    def _reusable_casefolded(self, other: object):
+        """
+        Return the casefolded items of the other object if it is a
+        NocaseDeque or NocaseList whose casefolded items can be used by this
+        deque, or None otherwise.
+        """
+        if getattr(other, 'casefold_nested_as_tuple', None) != \
+                self.casefold_nested_as_tuple or \
+                getattr(other, '_folder', None) != self._folder:
+            return None
+        # Without a folder, the items are casefolded by the __casefold__()
+        # method, which may be overridden in a subclass.
+        if self._folder is None and \
+                getattr(type(other), '__casefold__', None) is not \
+                type(self).__casefold__:
+            return None
+        if isinstance(other, NocaseDeque):
+            # pylint: disable=protected-access
+            return other._casefolded_deque
+        if isinstance(other, NocaseList):
+            # pylint: disable=protected-access
+            return other._casefolded_list
+        return None
+
+    def __reduce__(self):
+        """
+        Called when pickling the object, see :meth:`py:object.__reduce__`.
+
+        In order to save space and time, only the originally cased items are
+        saved, but not the casefolded items.
+        """
+        state = self.__dict__.copy()
+        del state['_casefolded_deque']
+        folder = state.pop('_folder', None)
+        cls = self.__class__ if folder is None else \
+            partial(self.__class__, folder=folder)
+        return (cls, (list(self), self.maxlen), state or None)
+
+    def __setitem__(self, index: SupportsIndex, value: Value) -> None:
+        """
+        Update the value of the item at an existing index in the deque.
+
+        Invoked using ``ncd[index] = value``.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+          IndexError: The index is out of range.
+        """
+        value_cf = self._casefolded_value(value)
+        super().__setitem__(index, value)
+        self._casefolded_deque[index] = value_cf
+
+    def __delitem__(self, index: SupportsIndex) -> None:
+        """
+        Delete an item at an existing index from the deque.
+
+        Invoked using ``del ncd[index]``.
+
+        Raises:
+          IndexError: The index is out of range.
+        """
+        super().__delitem__(index)
+        del self._casefolded_deque[index]
+
+    def __contains__(self, value: Value) -> bool:
+        """
+        Return a boolean indicating whether the deque contains at least one
+        item with the value, by looking it up case-insensitively.
+
+        Invoked using ``value in ncd``.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        return self._casefolded_value(value) in self._casefolded_deque
+
+    def __add__(self, other: 'NocaseDeque') -> 'NocaseDeque':
+        """
+        Return a new :class:`NocaseDeque` object with the same maximum length
+        as the left hand operand (``self``), that contains the items from the
+        left hand operand and the items from the right hand operand
+        (``other``).
+
+        The right hand operand (``other``) must be an instance of
+        :class:`py:collections.deque` (including :class:`NocaseDeque`).
+        The operands are not changed.
+
+        Invoked using e.g. ``ncd + other``
+
+        Raises:
+          TypeError: The other operand is not a deque
+        """
+        if not isinstance(other, deque):
+            raise TypeError(
+                f"Can only concatenate deque (not {type(other)}) to "
+                "NocaseDeque")
+        dq = self.copy()
+        dq.extend(other)
+        return dq
+
+    def __iadd__(self, other: Iterable) -> 'NocaseDeque':
+        """
+        Extend the left hand operand (``self``) by the items from the right
+        hand operand (``other``).
+
+        Invoked using ``ncd += other``.
+        """
+        self.extend(other)
+        return self
+
+    def __mul__(self, number: int) -> 'NocaseDeque':
+        """
+        Return a new :class:`NocaseDeque` object with the same maximum length
+        as the left hand operand (``self``), that contains the items from the
+        left hand operand as many times as specified by the right hand operand
+        (``number``).
+
+        Invoked using ``ncd * number``.
+        """
+        if not isinstance(number, int):
+            raise TypeError(
+                "Cannot multiply NocaseDeque by non-integer of type "
+                f"{type(number)}")
+        dq = self.copy()
+        dq *= number
+        return dq
+
+    def __rmul__(self, number: int) -> 'NocaseDeque':
+        """
+        Return a new :class:`NocaseDeque` object that contains the items from
+        the right hand operand (``self``) as many times as specified by the
+        left hand operand (``number``).
+
+        Invoked using ``number * ncd``.
+        """
+        return self * number
+
+    def __imul__(self, number: int) -> 'NocaseDeque':
+        """
+        Change the left hand operand (``self``) so that it contains the items
+        from the original left hand operand (``self``) as many times as
+        specified by the right hand operand (``number``).
+
+        Invoked using ``ncd *= number``.
+        """
+        if not isinstance(number, int):
+            raise TypeError(
+                "Cannot multiply NocaseDeque by non-integer of type "
+                f"{type(number)}")
+        super().__imul__(number)
+        self._casefolded_deque *= number
+        return self
+
+    def _other_casefolded_list(self, other: object) -> Optional[list]:
+        """
+        Return the casefolded items of the other operand of a comparison as a
+        list, or None if the other operand is not iterable.
+        """
+        other_cf = self._reusable_casefolded(other)
+        if other_cf is not None:
+            return list(other_cf)
+        if isinstance(other, Iterable):
+            return self._new_casefolded_list(other)
+        return None
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the deque and the other iterable
+        are equal, by comparing corresponding items case-insensitively.
+
+        Invoked using e.g. ``ncd == other``.
+        """
+        other_cf = self._other_casefolded_list(other)
+        if other_cf is None:
+            return NotImplemented
+        return list(self._casefolded_deque) == other_cf
+
+    def __ne__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the deque and the other iterable
+        are not equal, by comparing corresponding items case-insensitively.
+
+        Invoked using e.g. ``ncd != other``.
+        """
+        eq = self.__eq__(other)
+        if eq is NotImplemented:
+            return NotImplemented
+        return not eq
+
+    def __gt__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the deque is greater than the
+        other iterable, by comparing corresponding items case-insensitively.
+
+        Invoked using e.g. ``ncd > other``.
+        """
+        other_cf = self._other_casefolded_list(other)
+        if other_cf is None:
+            return NotImplemented
+        return list(self._casefolded_deque) > other_cf
+
+    def __lt__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the deque is less than the
+        other iterable, by comparing corresponding items case-insensitively.
+
+        Invoked using e.g. ``ncd < other``.
+        """
+        other_cf = self._other_casefolded_list(other)
+        if other_cf is None:
+            return NotImplemented
+        return list(self._casefolded_deque) < other_cf
+
+    def __ge__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the deque is greater than or
+        equal to the other iterable, by comparing corresponding items
+        case-insensitively.
+
+        Invoked using e.g. ``ncd >= other``.
+        """
+        lt = self.__lt__(other)
+        if lt is NotImplemented:
+            return NotImplemented
+        return not lt
+
+    def __le__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the deque is less than or
+        equal to the other iterable, by comparing corresponding items
+        case-insensitively.
+
+        Invoked using e.g. ``ncd <= other``.
+        """
+        gt = self.__gt__(other)
+        if gt is NotImplemented:
+            return NotImplemented
+        return not gt
+
+    def count(self, value: Value) -> int:
+        """
+        Return the number of times the specified value occurs in the deque,
+        comparing the value and the deque items case-insensitively.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        return self._casefolded_deque.count(self._casefolded_value(value))
+
+    def clear(self) -> None:
+        """
+        Remove all items from the deque (and return None).
+        """
+        super().clear()
+        self._casefolded_deque.clear()
+
+    def index(self, value: Value, start: SupportsIndex = 0,
+              stop: SupportsIndex = sys.maxsize) -> int:
+        """
+        Return the index of the first item that is equal to the specified
+        value, comparing the value and the deque items case-insensitively.
+
+        The search is limited to the index range defined by the specified
+        ``start`` and ``stop`` parameters, whereby ``stop`` is the index
+        of the first item after the search range.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+          ValueError: No such item is found.
+        """
+        return self._casefolded_deque.index(
+            self._casefolded_value(value), start, stop)
+
+    def append(self, value: Value) -> None:
+        """
+        Append the specified value as a new item to the right end of the deque
+        (and return None).
+
+        If the deque is bounded and full, the leftmost item is discarded.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        value_cf = self._casefolded_value(value)
+        super().append(value)
+        self._casefolded_deque.append(value_cf)
+
+    def appendleft(self, value: Value) -> None:
+        """
+        Append the specified value as a new item to the left end of the deque
+        (and return None).
+
+        If the deque is bounded and full, the rightmost item is discarded.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        value_cf = self._casefolded_value(value)
+        super().appendleft(value)
+        self._casefolded_deque.appendleft(value_cf)
+
+    def extend(self, values: Iterable) -> None:
+        """
+        Extend the right end of the deque by the items in the specified
+        iterable (and return None).
+
+        Raises:
+          AttributeError: A value in the iterable does not have the casefold
+            method.
+        """
+        values = list(values)
+        values_cf = self._new_casefolded_list(values)
+        super().extend(values)
+        self._casefolded_deque.extend(values_cf)
+
+    def extendleft(self, values: Iterable) -> None:
+        """
+        Extend the left end of the deque by the items in the specified
+        iterable (and return None). The order of the items is reversed in
+        the deque.
+
+        Raises:
+          AttributeError: A value in the iterable does not have the casefold
+            method.
+        """
+        values = list(values)
+        values_cf = self._new_casefolded_list(values)
+        super().extendleft(values)
+        self._casefolded_deque.extendleft(values_cf)
+
+    def insert(self, index: int, value: Value) -> None:
+        """
+        Insert a new item with specified value before the item at the specified
+        index (and return None).
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+          IndexError: The deque is bounded and full.
+        """
+        value_cf = self._casefolded_value(value)
+        super().insert(index, value)
+        self._casefolded_deque.insert(index, value_cf)
+
+    def pop(self) -> Value:  # type: ignore
+        """
+        Return the value of the rightmost item and also remove it from the
+        deque.
+
+        Raises:
+          IndexError: The deque is empty.
+        """
+        value = super().pop()
+        self._casefolded_deque.pop()
+        return value
+
+    def popleft(self) -> Value:
+        """
+        Return the value of the leftmost item and also remove it from the
+        deque.
+
+        Raises:
+          IndexError: The deque is empty.
+        """
+        value = super().popleft()
+        self._casefolded_deque.popleft()
+        return value
+
+    def remove(self, value: Value) -> None:
+        """
+        Remove the first item from the deque whose value is equal to the
+        specified value (and return None), comparing the value and the deque
+        items case-insensitively.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+          ValueError: No such item is found.
+        """
+        del self[self.index(value)]
+
+    def reverse(self) -> None:
+        """
+        Reverse the items in the deque in place (and return None).
+        """
+        super().reverse()
+        self._casefolded_deque.reverse()
+
+    def rotate(self, n: int = 1) -> None:
+        """
+        Rotate the deque ``n`` steps to the right (and return None). If ``n``
+        is negative, rotate to the left.
+        """
+        super().rotate(n)
+        self._casefolded_deque.rotate(n)
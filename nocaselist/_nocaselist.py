@@ -5,19 +5,35 @@ This module provides class NocaseList.
 
 import sys
 import os
-from typing import Callable, AnyStr, Optional, Union
+import copyreg
+import codecs
+import pickle
+import asyncio
+import weakref
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from heapq import merge
+from itertools import compress, accumulate, chain, islice, repeat
+from operator import index as _index
+from time import perf_counter
+from typing import Callable, AnyStr, Optional, Union, NamedTuple, List, Dict, \
+    Iterator
 from typing import SupportsIndex  # type: ignore
 try:
     from typing import TypeAlias  # type: ignore
 except ImportError:
     from typing_extensions import TypeAlias  # Python <=3.9
 if sys.version_info[0:2] >= (3, 9):
-    from collections.abc import Iterable  # type: ignore
+    from collections.abc import Iterable, AsyncIterable  # type: ignore
 else:
     # Before py39, collections.abc.Iterable did not support generic type
-    from typing import Iterable
+    from typing import Iterable, AsyncIterable
 
-__all__ = ['NocaseList']
+from ._folders import Folder, CasefoldFolder
+from ._bloomfilter import _BloomFilter, BloomFilterStatistics
+
+__all__ = ['NocaseList', 'CaseVariants']
 
 # This env var is set when building the docs. It causes the methods
 # that are supposed to exist only in a particular Python version, not to be
@@ -36,6 +52,196 @@ OtherList: TypeAlias = Iterable[Value]  # pylint: disable=unsubscriptable-object
 # Type for index argument that can also specify a slice
 IndexOrSlice: TypeAlias = Union[SupportsIndex, slice]
 
+# Folder with the behavior of the default __casefold__() method, that is used
+# for bulk folding of the items of lists that use that method
+_DEFAULT_FOLDER = CasefoldFolder()
+
+# Maximum number of derived results that are cached for a list, and of other
+# lists whose equality with a list is memoized (see NocaseList._cached())
+_CACHE_SIZE = 16
+
+
+class CaseVariants(NamedTuple):
+    """
+    The case variants of one casefolded value in a :class:`NocaseList`, as
+    returned by :meth:`NocaseList.case_variants`.
+    """
+
+    #: List of the indexes of the list items with this casefolded value, in
+    #: ascending order.
+    positions: List[int]
+
+    #: List of the distinct lexical spellings of these list items, in the
+    #: order in which they first occur in the list.
+    spellings: List[Value]
+
+
+def _hashable(value):
+    """
+    Return a hashable form of a casefolded value, by converting nested lists
+    (the casefolded form of list or tuple items) into tuples.
+    """
+    if isinstance(value, list):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+def _hashes(values_cf: list) -> list:
+    """
+    Return a list with the hash values of the hashable forms of the
+    casefolded values.
+    """
+    try:
+        return list(map(hash, values_cf))
+    except TypeError:
+        # There are nested lists
+        return list(map(hash, map(_hashable, values_cf)))
+
+
+def _pack_strings(values: list) -> tuple:
+    """
+    Return the non-empty list of unicode strings packed into a tuple
+    (typecode, data, offsets) for pickling them as out-of-band buffers.
+
+    If no string contains a NUL character, data is a
+    :class:`py:pickle.PickleBuffer` with the UTF-8 encoding of the strings
+    separated by NUL characters, and typecode and offsets are `None`.
+    Otherwise, data is a :class:`py:pickle.PickleBuffer` with the UTF-8
+    encoding of the joined strings, and offsets is a
+    :class:`py:pickle.PickleBuffer` with an array of the specified typecode
+    with the end offset of each string in the joined string.
+    """
+    text = '\0'.join(values)
+    if text.count('\0') == len(values) - 1:
+        return (None, pickle.PickleBuffer(
+            text.encode('utf-8', 'surrogatepass')), None)
+    offsets = array('q', accumulate(map(len, values)))
+    if offsets[-1] < 2 ** 31:
+        offsets = array('i', offsets)
+    data = ''.join(values).encode('utf-8', 'surrogatepass')
+    return (offsets.typecode, pickle.PickleBuffer(data),
+            pickle.PickleBuffer(offsets))
+
+
+def _unpack_strings(packed: tuple, byteorder: str) -> list:
+    """
+    Return the list of unicode strings from a tuple (typecode, data,
+    offsets) that was returned by _pack_strings(), whereby data and offsets
+    may be any bytes-like objects. The byteorder is that of the system that
+    packed the strings.
+    """
+    typecode, data, offsets_data = packed
+    text = str(data, 'utf-8', 'surrogatepass')
+    if typecode is None:
+        return text.split('\0')
+    offsets = array(typecode)
+    offsets.frombytes(memoryview(offsets_data).cast('B'))
+    if byteorder != sys.byteorder:
+        offsets.byteswap()
+    return list(map(text.__getitem__,
+                    map(slice, chain((0,), offsets), offsets)))
+
+
+def _restore_from_buffers(cls: type, state: dict, byteorder: str,
+                          packed_items: tuple,
+                          packed_casefolded: Optional[tuple] = None) \
+        -> 'NocaseList':
+    """
+    Return a new list of the specified NocaseList class, from its state and
+    its items and optionally its casefolded items that were packed by
+    _pack_strings().
+
+    This function is the reconstructor for lists that were pickled with
+    protocol 5 or higher.
+    """
+    lst = cls.__new__(cls)
+    state = dict(state)
+    state['_items'] = _unpack_strings(packed_items, byteorder)
+    if packed_casefolded is not None:
+        state['_casefolded_diff'] = _unpack_strings(packed_casefolded,
+                                                    byteorder)
+    lst.__setstate__(state)
+    return lst
+
+
+def _fold_chunk(template: 'NocaseList', values: list) -> list:
+    """
+    Return the casefolded values of a chunk of values, as the specified list
+    casefolds them.
+
+    This function is called in the worker processes of
+    NocaseList.extend_parallel().
+    """
+    # pylint: disable=protected-access
+    return template._new_casefolded_list(values)
+
+
+class _EventLoopPacer:
+    """
+    Returns control to the asyncio event loop during a long-running operation
+    of a list, when the operation has kept control for a maximum time.
+    """
+
+    def __init__(self, max_stall: float) -> None:
+        self._max_stall = max_stall
+        self._since = perf_counter()
+
+    async def pause(self) -> None:
+        """
+        Return control to the event loop if the maximum time has passed since
+        it last had control.
+        """
+        if perf_counter() - self._since >= self._max_stall:
+            await asyncio.sleep(0)
+            self._since = perf_counter()
+
+
+def _case_variants(values: Iterable, values_cf: Iterable) \
+        -> Dict[Value, CaseVariants]:
+    """
+    Return the specified original items grouped by their corresponding
+    casefolded items, as described for NocaseList.case_variants().
+    """
+    groups: Dict[Value, CaseVariants] = {}
+    for pos, (value, value_cf) in enumerate(zip(values, values_cf)):
+        key = _hashable(value_cf)
+        try:
+            group = groups[key]
+        except KeyError:
+            groups[key] = CaseVariants([pos], [value])
+            continue
+        group.positions.append(pos)
+        if value not in group.spellings:
+            group.spellings.append(value)
+    return groups
+
+
+def _canonical_spellings(values: Iterable, values_cf: Iterable,
+                         prefer: str) -> dict:
+    """
+    Return a dictionary with the canonical spelling for each hashable
+    casefolded value of the specified items, as described for
+    NocaseList.canonicalize().
+    """
+    if prefer == 'first':
+        canonical: dict = {}
+        for value, value_cf in zip(values, values_cf):
+            canonical.setdefault(_hashable(value_cf), value)
+        return canonical
+    if prefer == 'most_frequent':
+        counts: dict = {}
+        for value, value_cf in zip(values, values_cf):
+            spellings = counts.setdefault(_hashable(value_cf), [])
+            for entry in spellings:
+                if entry[0] == value:
+                    entry[1] += 1
+                    break
+            else:
+                spellings.append([value, 1])
+        return {key: max(spellings, key=lambda entry: entry[1])[0]
+                for key, spellings in counts.items()}
+    raise ValueError(f"Invalid value for prefer parameter: {prefer!r}")
+
 
 class NocaseList(list):
     """
@@ -58,10 +264,70 @@ class NocaseList(list):
     The implementation maintains a second list with the casefolded items of
     the inherited list, and ensures that both lists are in sync.
 
+    The case-insensitive behavior can be changed by specifying a casefold
+    strategy object (a :class:`~nocaselist.Folder`) in the ``folder``
+    parameter, or by overriding the :meth:`__casefold__` method in a subclass.
+
     The list supports serialization via the Python :mod:`py:pickle` module.
-    To save space and time, only the originally cased list is serialized.
+    To save space and time, only the originally cased list is serialized,
+    unless :attr:`pickle_casefolded` is set.
     """
 
+    #: Controls the type of the casefolded form of list or tuple items of the
+    #: list. By default, such items are casefolded into a :class:`py:list`.
+    #: If set to `True` in a subclass, they are casefolded into a
+    #: :class:`py:tuple`, which is hashable as long as its items are. This
+    #: allows hash-based lookups (e.g. in :meth:`case_variants` and
+    #: :meth:`remove_all`) to use the casefolded items directly, e.g. for lists
+    #: of compound names such as (namespace, classname) pairs.
+    #: The casefolded type does not affect the result of case-insensitive
+    #: comparisons.
+    casefold_nested_as_tuple: bool = False
+
+    #: Controls whether the casefolded items are included when the list is
+    #: pickled. By default, they are not included, and they are casefolded
+    #: again when the list is unpickled. If set to `True` in a subclass or on
+    #: a list object, the casefolded items that differ from the original
+    #: items are included, so that unpickling does not need to casefold the
+    #: items. This speeds up unpickling for lists whose casefolding is
+    #: expensive (e.g. with a normalizing :meth:`__casefold__` method), at the
+    #: expense of a larger pickle. The casefolded items are used as they
+    #: were pickled, so the casefolding must not have changed in between.
+    pickle_casefolded: bool = False
+
+    # The casefold strategy object, or None for using __casefold__(). This
+    # class attribute is the default for objects that were created without
+    # calling __init__() (e.g. when unpickling).
+    _folder: Optional[Folder] = None
+
+    # The Bloom filter for rejecting lookups of values that are not in the
+    # list, or None if the list does not have one.
+    _bloom: Optional[_BloomFilter] = None
+
+    # The nesting depth of the batches of the list (see batch()). These class
+    # attributes are the defaults for lists that are not in a batch, or have
+    # no deferred changes.
+    _batch_depth: int = 0
+
+    # The lowest index of the items that have been changed in a batch
+    # without updating the casefolded items, or None if there are no such
+    # changes. While there are such changes, the casefolded items are moved
+    # from the _casefolded_list attribute to the _deferred_casefolded_list
+    # attribute, so that accessing _casefolded_list updates them (see
+    # __getattr__()).
+    _dirty_from: Optional[int] = None
+
+    # The mutation version of the list (see version). This class attribute is
+    # the default for lists that have not been changed since they were
+    # created.
+    _version: int = 0
+
+    # The results derived from the list that have been cached (see
+    # _cached()), or None. The cached results are valid only as long as the
+    # mutation version of the list is _cache_version.
+    _cache: Optional[dict] = None
+    _cache_version: int = 0
+
     # Methods not implemented:
     #
     # * __getattribute__(self, name): The method inherited from object is used;
@@ -82,12 +348,27 @@ class NocaseList(list):
     # __iter__(): The method inherited from list is used; no reason
     #   to have a different implementation.
 
-    def __init__(self, iterable=()) -> None:
+    def __init__(self, iterable=(), *, folder: Optional[Folder] = None) \
+            -> None:
         """
         Initialize the list with the items in the specified iterable.
+
+        Parameters:
+
+          iterable (iterable): The items for the list.
+
+          folder (:class:`~nocaselist.Folder`): The casefold strategy object
+            that defines the case-insensitive behavior of the list, instead of
+            the :meth:`__casefold__` method. If `None` and the iterable is a
+            :class:`NocaseList`, the folder of that list is used.
         """
         super().__init__(iterable)
 
+        if folder is None and isinstance(iterable, NocaseList):
+            folder = iterable._folder  # pylint: disable=protected-access
+        if folder is not None:
+            self._folder = folder
+
         # The _casefolded_list attribute is a list with the same items as the
         # original (inherited) list, except they are casefolded using the
         # __casefold__() method.
@@ -95,31 +376,706 @@ class NocaseList(list):
         # The following is an optimization based on the assumption that in
         # many cases, casefolding the input list is more expensive than
         # copying it (plus the overhead to check that).
-        if isinstance(iterable, NocaseList):
+        if self._shares_casefolding(iterable):
             # pylint: disable=protected-access
-            casefolded_list = iterable._casefolded_list.copy()
+            casefolded_list = list(iterable._casefolded_list)
         else:
             casefolded_list = self._new_casefolded_list(self)
-        self._casefolded_list: list = casefolded_list
+        self._casefolded_list: list = \
+            self._new_casefolded_storage(casefolded_list)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[AnyStr], *,
+                   folder: Optional[Folder] = None,
+                   strip: Optional[AnyStr] = '\r\n', unique: bool = False,
+                   chunk_size: int = 10000,
+                   progress: Optional[Callable[[int], None]] = None) \
+            -> 'NocaseList':
+        """
+        Create a list from the lines in the specified iterable, e.g. a text
+        file object.
+
+        The lines are processed in chunks of ``chunk_size`` lines: The
+        characters in ``strip`` are removed from the end of each line, and the
+        lines of a chunk are casefolded at once if the casefolding supports
+        that (see :attr:`Folder.bulk`). Apart from the list, only one chunk of
+        lines is held in memory at a time.
+
+        Parameters:
+
+          lines (iterable of str or bytes): The lines.
+
+          folder (:class:`~nocaselist.Folder`): The casefold strategy object
+            of the new list.
+
+          strip (str or bytes): The characters that are removed from the end
+            of each line. If `None` or empty, the lines are not stripped. For
+            lines that are byte strings, this must be a byte string or `None`.
+
+          unique (bool): If `True`, lines that are equal case-insensitively to
+            a line before them are not added to the list, so that the list
+            contains the first spelling of each line.
+
+          chunk_size (int): Number of lines in a chunk.
+
+          progress (callable): If not `None`, it is called after each chunk
+            with the number of lines that have been read so far.
+
+        Returns:
+          NocaseList: The new list (or an object of the subclass this method
+          is invoked on).
+
+        Raises:
+          AttributeError: A line does not have the casefold method.
+        """
+        lst = cls(folder=folder)
+        seen: Optional[set] = set() if unique else None
+        lines = iter(lines)
+        num_lines = 0
+        while True:
+            values = list(islice(lines, chunk_size))
+            if not values:
+                break
+            num_lines += len(values)
+            lst._extend_chunk(values, strip, seen)
+            if progress is not None:
+                progress(num_lines)
+        return lst
+
+    @classmethod
+    def from_file(cls, file, *, encoding: str = 'utf-8',
+                  errors: str = 'strict', delimiter: str = '\n',
+                  folder: Optional[Folder] = None,
+                  strip: Optional[str] = '\r\n', unique: bool = False,
+                  chunk_size: int = 1 << 20,
+                  progress: Optional[Callable[[int], None]] = None) \
+            -> 'NocaseList':
+        """
+        Create a list from the lines of the specified file.
+
+        The file is read and decoded in chunks of ``chunk_size`` bytes, and
+        the lines of each chunk are processed at once, as described for
+        :meth:`from_lines`. Apart from the list, only one chunk of the file
+        is held in memory at a time, so this is suitable for large files.
+
+        A line that is not terminated by the delimiter at the end of the file
+        is added to the list as well.
+
+        Parameters:
+
+          file (str or path-like or binary file object): Path name of the file,
+            or a file object that is open for reading in binary mode.
+
+          encoding (str): Encoding of the file.
+
+          errors (str): Error handling scheme for decoding the file (see
+            :meth:`py:bytes.decode`).
+
+          delimiter (str): The string that terminates the lines. It is removed
+            from the lines.
+
+          folder (:class:`~nocaselist.Folder`): The casefold strategy object
+            of the new list.
+
+          strip (str): The characters that are removed from the end of each
+            line, after removing the delimiter. The default removes carriage
+            return characters of lines with Windows line endings. If `None` or
+            empty, the lines are not stripped.
+
+          unique (bool): If `True`, lines that are equal case-insensitively to
+            a line before them are not added to the list, so that the list
+            contains the first spelling of each line.
+
+          chunk_size (int): Number of bytes that are read at once.
+
+          progress (callable): If not `None`, it is called after each chunk
+            with the number of bytes that have been read so far.
+
+        Returns:
+          NocaseList: The new list (or an object of the subclass this method
+          is invoked on).
+
+        Raises:
+          OSError: The file cannot be opened or read.
+          UnicodeDecodeError: The file cannot be decoded.
+          ValueError: The delimiter is empty.
+        """
+        if not delimiter:
+            raise ValueError("The delimiter must not be empty")
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, 'rb') as fp:
+                return cls.from_file(
+                    fp, encoding=encoding, errors=errors, delimiter=delimiter,
+                    folder=folder, strip=strip, unique=unique,
+                    chunk_size=chunk_size, progress=progress)
+
+        lst = cls(folder=folder)
+        seen: Optional[set] = set() if unique else None
+        decoder = codecs.getincrementaldecoder(encoding)(errors)
+        rest = ''
+        num_bytes = 0
+        while True:
+            data = file.read(chunk_size)
+            num_bytes += len(data)
+            text = rest + decoder.decode(data, final=not data)
+            values = text.split(delimiter)
+            # The last value is not terminated by the delimiter yet
+            rest = values.pop()
+            if not data and rest:
+                values.append(rest)
+            if values:
+                lst._extend_chunk(values, strip, seen)
+            if progress is not None and data:
+                progress(num_bytes)
+            if not data:
+                break
+        return lst
+
+    def _extend_chunk(self, values: list, strip: Optional[AnyStr],
+                      seen: Optional[set]) -> None:
+        """
+        Extend the list by a chunk of values for :meth:`from_lines` and
+        :meth:`from_file`, after stripping them. If a set of casefolded
+        values is specified, only the values whose casefolded values are not
+        in the set are added, and the set is updated.
+        """
+        if strip:
+            values = [value.rstrip(strip) for value in values]
+        values_cf = self._new_casefolded_list(values)
+        if seen is not None:
+            keep = []
+            for value_cf in values_cf:
+                keep.append(value_cf not in seen)
+                seen.add(value_cf)
+            values = list(compress(values, keep))
+            values_cf = list(compress(values_cf, keep))
+        self._extend_casefolded(values, values_cf)
+
+    def _extend_casefolded(self, values: list, values_cf: list) -> None:
+        """
+        Extend the list by the values, whose casefolded values have been
+        determined already.
+        """
+        self._flush()
+        self._version += 1
+        super().extend(values)
+        self._casefolded_list.extend(values_cf)
+        if self._bloom is not None:
+            self._note_mutation(values_cf, 0)
+
+    @classmethod
+    def from_iterable(cls, iterable: Iterable, *,
+                      folder: Optional[Folder] = None,
+                      workers: Optional[int] = None, chunk_size: int = 10000,
+                      threshold: int = 100000) -> 'NocaseList':
+        """
+        Create a list from the items in the specified iterable, casefolding
+        them in parallel in multiple processes if there are many of them.
+
+        This is the same as using :meth:`extend_parallel` on a new empty list.
+        See there for details and for the parameters.
+
+        Returns:
+          NocaseList: The new list (or an object of the subclass this method
+          is invoked on).
+
+        Raises:
+          AttributeError: A value in the iterable does not have the casefold
+            method.
+          pickle.PicklingError: The list class or its folder cannot be
+            pickled.
+          ValueError: The number of worker processes is less than 1.
+        """
+        lst = cls(folder=folder)
+        lst.extend_parallel(iterable, workers=workers, chunk_size=chunk_size,
+                            threshold=threshold)
+        return lst
+
+    def extend_parallel(self, values: Iterable, *,
+                        workers: Optional[int] = None, chunk_size: int = 10000,
+                        threshold: int = 100000) -> None:
+        """
+        Extend the list by the items in the specified iterable
+        (and return None), casefolding them in parallel in multiple processes
+        if there are many of them.
+
+        This is useful for subclasses with an expensive :meth:`__casefold__`
+        method or lists with an expensive folder. The values are split into
+        chunks that are casefolded in the worker processes of a
+        :class:`py:concurrent.futures.ProcessPoolExecutor`, and the list is
+        extended by the values and their casefolded values in the original
+        order. If there are fewer values than the threshold or only one
+        worker, the values are casefolded in this process, as with
+        :meth:`extend`, because starting the worker processes and passing the
+        values to them and back takes longer than casefolding them.
+
+        The worker processes casefold the values using an empty list of the
+        same class and with the same folder, which is passed to them by
+        pickling it. Therefore, the class (e.g. a subclass that overrides
+        :meth:`__casefold__`) must be defined at the top level of a module,
+        and the folder must be picklable.
+
+        Parameters:
+
+          values (iterable): The values to be added.
+
+          workers (int): Maximum number of worker processes. If `None`, the
+            number of processors of the machine is used.
+
+          chunk_size (int): Number of values that are casefolded in one task of
+            a worker process.
+
+          threshold (int): Minimum number of values for casefolding them in
+            parallel.
+
+        Raises:
+          AttributeError: A value in the iterable does not have the casefold
+            method.
+          pickle.PicklingError: The list class or its folder cannot be
+            pickled.
+          ValueError: The number of worker processes is less than 1.
+        """
+        if workers is not None and workers < 1:
+            raise ValueError("The workers parameter must be at least 1, not "
+                             f"{workers!r}")
+        values = list(values)
+        if len(values) < max(threshold, 1) or workers == 1:
+            self.extend(values)
+            return
+        template = type(self)(folder=self._folder)
+        chunks = [values[pos:pos + chunk_size]
+                  for pos in range(0, len(values), chunk_size)]
+        values_cf: list = []
+        with ProcessPoolExecutor(workers) as executor:
+            for chunk_cf in executor.map(_fold_chunk, repeat(template),
+                                         chunks):
+                values_cf.extend(chunk_cf)
+        self._extend_casefolded(values, values_cf)
+
+    @classmethod
+    async def afrom_iterable(cls, iterable, *, folder: Optional[Folder] = None,
+                             chunk_size: int = 1000,
+                             max_stall: float = 0.01) -> 'NocaseList':
+        """
+        Create a list from the items in the specified iterable or asynchronous
+        iterable, returning control to the asyncio event loop in between.
+
+        This is the same as using :meth:`aextend` on a new empty list. See
+        there for details and for the parameters.
+
+        Invoked using ``lst = await NocaseList.afrom_iterable(iterable)``.
+
+        Returns:
+          NocaseList: The new list (or an object of the subclass this method
+          is invoked on).
+
+        Raises:
+          AttributeError: A value in the iterable does not have the casefold
+            method.
+        """
+        lst = cls(folder=folder)
+        await lst.aextend(iterable, chunk_size=chunk_size, max_stall=max_stall)
+        return lst
+
+    async def aextend(self, values, *, chunk_size: int = 1000,
+                      max_stall: float = 0.01) -> None:
+        """
+        Extend the list by the items in the specified iterable or asynchronous
+        iterable (and return None), returning control to the asyncio event
+        loop in between.
+
+        The values are casefolded and added to the list in chunks of
+        ``chunk_size`` values. After a chunk, control is returned to the
+        event loop if the method has kept it for ``max_stall`` seconds, so
+        that other tasks are not blocked for much longer than that while a
+        large list is built. Other tasks see the list with the chunks that
+        have been added so far.
+
+        Invoked using ``await ncl.aextend(values)``.
+
+        Parameters:
+
+          values (iterable or asynchronous iterable): The values to be added.
+
+          chunk_size (int): Number of values that are casefolded and added at
+            once.
+
+          max_stall (float): Maximum time in seconds the method keeps
+            control before returning it to the event loop. If 0, control is
+            returned after each chunk.
+
+        Raises:
+          AttributeError: A value in the iterable does not have the casefold
+            method.
+        """
+        pacer = _EventLoopPacer(max_stall)
+        if isinstance(values, AsyncIterable):
+            chunk: list = []
+            async for value in values:
+                chunk.append(value)
+                if len(chunk) >= chunk_size:
+                    self._extend_casefolded(
+                        chunk, self._new_casefolded_list(chunk))
+                    chunk = []
+                    await pacer.pause()
+            if chunk:
+                self._extend_casefolded(chunk, self._new_casefolded_list(chunk))
+            return
+        if values is self:
+            values = list(values)
+        values = iter(values)
+        while True:
+            chunk = list(islice(values, chunk_size))
+            if not chunk:
+                break
+            self._extend_casefolded(chunk, self._new_casefolded_list(chunk))
+            await pacer.pause()
+
+    async def asort(self, *, key: Optional[Callable] = None,
+                    reverse: bool = False, chunk_size: int = 10000,
+                    max_stall: float = 0.01) -> None:
+        """
+        Sort the items in the list in place (and return None), returning
+        control to the asyncio event loop in between.
+
+        The sort order is the same as for :meth:`sort`, and the sort is
+        stable as well. The list is sorted in steps that each process about
+        ``chunk_size`` items: Runs of ``chunk_size`` items are sorted and
+        then merged, using the casefolded items of the list instead of
+        casefolding them again. After a step, control is returned to the
+        event loop if the method has kept it for ``max_stall`` seconds. The
+        items of the list are replaced by the sorted items at once at the
+        end, so other tasks see the list either unsorted or sorted. Copying
+        the items at the start and replacing them at the end take O(n) time
+        without returning control, but they only copy references, which is
+        much faster than sorting.
+
+        Invoked using ``await ncl.asort()``.
+
+        Parameters:
+
+          key (callable): Key function that is applied to each casefolded
+            list item, as for :meth:`sort`.
+
+          reverse (bool): Sort in descending order.
+
+          chunk_size (int): Number of items that are processed in one step.
+
+          max_stall (float): Maximum time in seconds the method keeps
+            control before returning it to the event loop. If 0, control is
+            returned after each step.
+
+        Raises:
+          ValueError: The list has been changed by another task while it was
+            sorted.
+        """
+        pacer = _EventLoopPacer(max_stall)
+        values, values_cf, version = self._versioned_items()
+        size = len(values)
+        if key:
+            keys: list = []
+            for pos in range(0, size, chunk_size):
+                keys.extend(map(key, values_cf[pos:pos + chunk_size]))
+                await pacer.pause()
+        else:
+            keys = values_cf
+        runs = []
+        for pos in range(0, size, chunk_size):
+            runs.append(sorted(range(pos, min(pos + chunk_size, size)),
+                               key=keys.__getitem__, reverse=reverse))
+            await pacer.pause()
+        # The merge is stable, because it takes equal items from earlier runs
+        # first.
+        merged = merge(*runs, key=keys.__getitem__, reverse=reverse)
+        sorted_values: list = []
+        sorted_values_cf: list = []
+        while True:
+            part = list(islice(merged, chunk_size))
+            if not part:
+                break
+            sorted_values.extend([values[i] for i in part])
+            sorted_values_cf.extend([values_cf[i] for i in part])
+            await pacer.pause()
+        # The runs and keys are released in steps as well, because releasing
+        # their many objects at once would take a long time.
+        while runs:
+            del runs[-1]
+            await pacer.pause()
+        while keys:
+            del keys[-chunk_size:]
+            await pacer.pause()
+        self._replace_sorted(version, sorted_values, sorted_values_cf)
+
+    def _versioned_items(self) -> tuple:
+        """
+        Return a tuple of a copy of the original items and a copy of the
+        casefolded items, as lists, and the mutation version of the list.
+        """
+        return list.copy(self), list(self._casefolded_list), self._version
+
+    def _replace_sorted(self, version: int, values: list,
+                        values_cf: list) -> None:
+        """
+        Replace the items of the list, which must still have the specified
+        mutation version, by the specified sorted original and casefolded
+        items.
+
+        Raises:
+          ValueError: The list has been changed.
+        """
+        self._flush()
+        if self._version != version:
+            raise ValueError("NocaseList modified during asort()")
+        self._version += 1
+        super().__setitem__(slice(None), values)
+        self._casefolded_list = self._new_casefolded_storage(values_cf)
+
+    @property
+    def folder(self) -> Optional[Folder]:
+        """
+        :class:`~nocaselist.Folder`: The casefold strategy object of the list,
+        or `None` if the list uses its :meth:`__casefold__` method.
+        """
+        return self._folder
+
+    @property
+    def version(self) -> int:
+        """
+        int: The mutation version of the list.
+
+        The version is increased by every method that changes the list
+        (including changes within :meth:`batch`), and never decreases. It
+        can therefore be used to detect cheaply whether the list may have
+        been changed since an earlier point in time, e.g. for caching results
+        that are derived from the list. A method that is called to change the
+        list may increase the version even if it does not actually change the
+        list. Copies of the list, including unpickled lists, start with
+        version 0.
+        """
+        return self._version
+
+    @contextmanager
+    def batch(self) -> Iterator['NocaseList']:
+        """
+        Return a context manager for a batch of changes of the list, in which
+        casefolding the changed items is deferred.
+
+        Invoked using ``with ncl.batch(): ...``.
+
+        Within the batch, :meth:`append`, :meth:`extend`, :meth:`insert`,
+        :meth:`pop`, and the assignment and deletion of items and slices
+        change only the original items, and record the lowest index of the
+        changed items. When the batch ends, the items from that index on are
+        casefolded again at once (see :attr:`Folder.bulk`), and the Bloom
+        filter of the list is updated once. This makes sequences of many such
+        changes faster, in particular appends and changes near the end of
+        the list.
+
+        Within the batch, the casefolded items are brought up to date as
+        well when they are needed, e.g. for looking up a value, for
+        comparing the list, or for the other methods that change the list.
+        Batches can be nested.
+
+        Example::
+
+            with ncl.batch():
+                for line in lines:
+                    ncl.append(line.strip())
+
+        Raises:
+          AttributeError: A value that was added in the batch does not have
+            the casefold method. The values that cannot be casefolded are
+            removed from the list, and the exception for the first of them is
+            raised when the casefolded items are brought up to date.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                del self._batch_depth
+                self._flush()
+
+    def _changed_from(self, index: IndexOrSlice) -> int:
+        """
+        Return the lowest index of the items that are changed by assigning
+        or deleting the specified index or slice of the list, assuming it is
+        valid.
+        """
+        if isinstance(index, slice):
+            indexes = range(*index.indices(len(self)))
+            if not indexes:
+                return max(indexes.start, 0)
+            return min(indexes[0], indexes[-1])
+        index = _index(index)
+        return index + len(self) if index < 0 else index
+
+    def _defer(self, index: int) -> None:
+        """
+        Record that the items of the list from the specified index on have
+        been changed in a batch, without changing the casefolded items.
+        """
+        dirty_from = self._dirty_from
+        if dirty_from is None:
+            self._deferred_casefolded_list = \
+                self.__dict__.pop('_casefolded_list')
+            self._dirty_from = index
+        elif index < dirty_from:
+            self._dirty_from = index
+
+    def _flush(self) -> None:
+        """
+        Bring the casefolded items and the Bloom filter of the list up to date
+        after the changes that have been deferred in a batch.
+
+        Raises:
+          AttributeError: A changed value does not have the casefold method.
+            The values that cannot be casefolded are removed from the list.
+        """
+        dirty_from = self._dirty_from
+        if dirty_from is None:
+            return
+        casefolded_list = self.__dict__.pop('_deferred_casefolded_list')
+        del self._dirty_from
+        values = list.__getitem__(self, slice(dirty_from, None))
+        error = None
+        try:
+            values_cf = self._new_casefolded_list(values)
+        except Exception as exc:  # pylint: disable=broad-except
+            # Remove the values that cannot be casefolded, so that the list
+            # is consistent when the exception is raised.
+            error = exc
+            keep = []
+            values_cf = []
+            for value in values:
+                try:
+                    values_cf.append(self._casefolded_value(value))
+                except Exception:  # pylint: disable=broad-except
+                    keep.append(False)
+                else:
+                    keep.append(True)
+            self._version += 1
+            list.__setitem__(self, slice(dirty_from, None),
+                             list(compress(values, keep)))
+        removed = len(casefolded_list) - dirty_from
+        del casefolded_list[dirty_from:]
+        casefolded_list.extend(values_cf)
+        self._casefolded_list = casefolded_list
+        if self._bloom is not None:
+            self._note_mutation(values_cf, removed)
+        if error is not None:
+            raise error
+
+    def __getattr__(self, name: str):
+        """
+        Called when an attribute is not found, see
+        :meth:`py:object.__getattr__`.
+
+        While there are deferred changes in a batch, accessing the casefolded
+        items brings them up to date.
+        """
+        if name == '_casefolded_list' and self._dirty_from is not None:
+            self._flush()
+            return self._casefolded_list
+        raise AttributeError(
+            f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def _shares_casefolding(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the other object is a NocaseList
+        whose casefolded items can be used by this list.
+        """
+        # pylint: disable=protected-access
+        # Without a folder, the items are casefolded by the __casefold__()
+        # method, which may be overridden in a subclass.
+        return isinstance(other, NocaseList) and \
+            other.casefold_nested_as_tuple == \
+            self.casefold_nested_as_tuple and \
+            other._folder == self._folder and \
+            (self._folder is not None or
+             type(other).__casefold__ is type(self).__casefold__)
 
     def _new_casefolded_list(self, lst: OtherList) -> list:
         """
         Return a casefolded list from the input list.
-        """
+
+        If the folder supports bulk folding, the items are casefolded at once
+        unless there are items that are `None`, lists or tuples. That is also
+        done if the list uses the default :meth:`__casefold__` method.
+        """
+        folder = self._folder
+        if folder is None and \
+                type(self).__casefold__ is NocaseList.__casefold__:
+            folder = _DEFAULT_FOLDER
+        if folder is not None and folder.bulk:
+            lst = list(lst)
+            if set(map(type, lst)) <= {str, bytes}:
+                return folder.fold_many(lst)
         result = []
         for value in lst:
             result.append(self._casefolded_value(value))
         return result
 
+    def _new_casefolded_storage(self, values_cf: list) -> list:
+        """
+        Return the object that stores the casefolded items of the list, from
+        a list of casefolded items.
+
+        This method returns the input list. Subclasses can override it to
+        store the casefolded items differently, using an object that supports
+        the list methods that are used on the _casefolded_list attribute.
+        """
+        return values_cf
+
+    def _rebuild_bloom(self) -> None:
+        """
+        Build the Bloom filter of the list from its casefolded items.
+        """
+        self._bloom.build(_hashes(self._casefolded_list))  # type: ignore
+
+    def _note_mutation(self, added_cf: list, removed: int) -> None:
+        """
+        Update the Bloom filter of the list for the specified added
+        casefolded items and number of removed items, and rebuild it if
+        needed.
+        """
+        bloom = self._bloom
+        if len(added_cf) == 1:
+            bloom.add(hash(_hashable(added_cf[0])))  # type: ignore
+        elif added_cf:
+            bloom.add_many(_hashes(added_cf))  # type: ignore
+        bloom.stale += removed  # type: ignore
+        if bloom.needs_rebuild():  # type: ignore
+            self._rebuild_bloom()
+
+    def _bloom_rejects(self, value_cf: Value) -> bool:
+        """
+        Return a boolean indicating whether the Bloom filter of the list
+        rejects the casefolded value, i.e. the value is certainly not in the
+        list.
+        """
+        if self._dirty_from is not None:
+            # Within a batch, the filter does not know the deferred items yet
+            self._flush()
+        return not self._bloom.might_contain(  # type: ignore
+            hash(_hashable(value_cf)))
+
     def _casefolded_value(self, value: Value) -> Value:
         """
         This method returns the casefolded value and handles the case of value
-        being `None`. The value may be a string or an list/tuple of strings.
+        being `None`. The value may be a string or an list/tuple of strings,
+        which is casefolded into a list or tuple, dependent on the
+        casefold_nested_as_tuple attribute.
         """
         if value is None:
             return None
         if isinstance(value, (list, tuple)):
+            if self.casefold_nested_as_tuple:
+                return tuple(self._casefolded_value(v) for v in value)
             return [self._casefolded_value(v) for v in value]
+        if self._folder is not None:
+            return self._folder.fold(value)
         return self.__casefold__(value)
 
     @staticmethod
@@ -139,6 +1095,8 @@ class NocaseList(list):
         case-insensitive behavior of the class.
         See :ref:`Overriding the default casefold method` for details.
 
+        This method is not used if the list has a folder.
+
         Parameters:
           value (str or bytes): Input value. Will not be `None`.
 
@@ -153,26 +1111,101 @@ class NocaseList(list):
         except AttributeError:
             return value.lower()
 
+    def __reduce_ex__(self, protocol):
+        """
+        Called when pickling the object, see :meth:`py:object.__reduce_ex__`.
+
+        For pickle protocol 5 or higher, if all items are unicode strings,
+        the items are packed into a buffer with their UTF-8 encoding (and if
+        needed, a buffer with their offsets), which is pickled as a
+        :class:`py:pickle.PickleBuffer` object. This makes pickling and
+        unpickling faster than for each item separately, and allows passing
+        the buffers out-of-band (see :pep:`574`). If :attr:`pickle_casefolded`
+        is set, the casefolded items are packed as well.
+
+        Otherwise, the original items are saved in the state of the object
+        instead of as list items, so that unpickling creates the object
+        without items and then restores its state including the items, which
+        casefolds all items at once (or not at all, if
+        :attr:`pickle_casefolded` is set).
+        """
+        if protocol >= 5 and self and set(map(type, self)) == {str}:
+            values_cf = list(self._casefolded_list) \
+                if self.pickle_casefolded else None
+            if values_cf is None or set(map(type, values_cf)) == {str}:
+                state = self.__getstate__()
+                state.pop('_casefolded_diff', None)
+                packed_casefolded = None if values_cf is None \
+                    else _pack_strings(values_cf)
+                return (_restore_from_buffers,
+                        (self.__class__, state, sys.byteorder,
+                         _pack_strings(self), packed_casefolded))
+        state = self.__getstate__()
+        state['_items'] = list(self)
+        return (copyreg.__newobj__, (self.__class__,), state)
+
     def __getstate__(self):
         """
         Called when pickling the object, see :meth:`py:object.__getstate__`.
 
         In order to save space and time, only the list with the originally
         cased items is saved, but not the second list with the casefolded
-        items.
+        items. If :attr:`pickle_casefolded` is set, the casefolded items are
+        saved in a list in which the casefolded items that are equal to their
+        original items are represented by `None`.
+
+        Of the Bloom filter, only its parameters are saved, so that the
+        restored list (e.g. an unpickled list or a list copied with
+        :func:`py:copy.copy`) gets its own Bloom filter.
         """
+        self._flush()
         # This copies the state of the inherited list even though it is
         # not visible in self.__dict__.
         state = self.__dict__.copy()
         del state['_casefolded_list']
+        state.pop('_batch_depth', None)
+        state.pop('_cache', None)
+        state.pop('_cache_version', None)
+        state.pop('_version', None)
+        bloom = state.pop('_bloom', None)
+        if bloom is not None:
+            state['_bloom_params'] = (bloom.false_positive_rate,
+                                      bloom.rebuild_threshold)
+        if self.pickle_casefolded:
+            state['_casefolded_diff'] = [
+                None if value_cf == value else value_cf
+                for value, value_cf in zip(self, self._casefolded_list)]
         return state
 
     def __setstate__(self, state):
         """
         Called when unpickling the object, see :meth:`py:object.__setstate__`.
+
+        The original items are either in the state (see
+        :meth:`__reduce_ex__`), or have been added before by :meth:`extend`,
+        when unpickling a pickle from an earlier version of this package.
         """
+        state = dict(state)
+        items = state.pop('_items', None)
+        casefolded_diff = state.pop('_casefolded_diff', None)
+        bloom_params = state.pop('_bloom_params', None)
         self.__dict__.update(state)
-        self._casefolded_list = self._new_casefolded_list(self)
+        if items is not None:
+            super().extend(items)
+        if casefolded_diff is not None and len(casefolded_diff) == len(self):
+            # Nested lists are casefolded again, so that the casefolded item
+            # is not the same mutable object as the original item
+            casefolded_list = [
+                value_cf if value_cf is not None else
+                self._casefolded_value(value) if isinstance(value, list) else
+                value
+                for value, value_cf in zip(self, casefolded_diff)]
+        else:
+            casefolded_list = self._new_casefolded_list(self)
+        self._casefolded_list = self._new_casefolded_storage(casefolded_list)
+        if bloom_params is not None:
+            self._bloom = _BloomFilter(*bloom_params)
+            self._rebuild_bloom()
 
     def __setitem__(self, index: IndexOrSlice, value: Value) -> None:
         """
@@ -183,8 +1216,22 @@ class NocaseList(list):
         Raises:
           AttributeError: The value does not have the casefold method.
         """
+        self._version += 1
+        if self._batch_depth:
+            changed_from = self._changed_from(index)
+            super().__setitem__(index, value)  # type: ignore
+            self._defer(changed_from)
+            return
+        # The casefolded items are changed first, so that the list is
+        # unchanged if the value cannot be casefolded or stored.
+        value_cf = self._casefolded_value(value)
+        self._casefolded_list[index] = value_cf  # type: ignore
         super().__setitem__(index, value)  # type: ignore
-        self._casefolded_list[index] = self._casefolded_value(value)  # type: ignore # noqa: E501 pylint: disable=line-too-long
+        if self._bloom is not None:
+            if isinstance(index, slice):
+                self._rebuild_bloom()
+            else:
+                self._note_mutation([value_cf], 1)
 
     def __delitem__(self, index: IndexOrSlice) -> None:
         """
@@ -192,8 +1239,19 @@ class NocaseList(list):
 
         Invoked using ``del ncl[index]``.
         """
+        self._version += 1
+        if self._batch_depth:
+            changed_from = self._changed_from(index)
+            super().__delitem__(index)
+            self._defer(changed_from)
+            return
         super().__delitem__(index)
         del self._casefolded_list[index]
+        if self._bloom is not None:
+            if isinstance(index, slice):
+                self._rebuild_bloom()
+            else:
+                self._note_mutation([], 1)
 
     def __contains__(self, value: Value) -> bool:
         """
@@ -205,7 +1263,15 @@ class NocaseList(list):
         Raises:
           AttributeError: The value does not have the casefold method.
         """
-        return self._casefolded_value(value) in self._casefolded_list
+        value_cf = self._casefolded_value(value)
+        if self._bloom is None:
+            return value_cf in self._casefolded_list
+        if self._bloom_rejects(value_cf):
+            return False
+        found = value_cf in self._casefolded_list
+        if not found:
+            self._bloom.false_positives += 1
+        return found
 
     def __add__(self, other: OtherList) -> 'NocaseList':
         """
@@ -264,7 +1330,7 @@ class NocaseList(list):
             raise TypeError(
                 "Cannot multiply NocaseList by non-integer of type "
                 f"{type(number)}")
-        lst = NocaseList()
+        lst = NocaseList(folder=self._folder)
         for _ in range(0, number):
             lst.extend(self)
         return lst
@@ -329,15 +1395,18 @@ class NocaseList(list):
         The other list may be a :class:`NocaseList` object or any other
         iterable. In all cases, the comparison takes place case-insensitively.
 
+        The result of comparing the list with another :class:`NocaseList`
+        object with the same casefolding is memoized until either list is
+        changed (see :attr:`version`).
+
         Invoked using e.g. ``ncl == other``.
 
         Raises:
           AttributeError: A value in the other list does not have the casefold
             method.
         """
-        if isinstance(other, NocaseList):
-            # pylint: disable=protected-access
-            return self._casefolded_list == other._casefolded_list
+        if self._shares_casefolding(other):
+            return self._equals(other)  # type: ignore
 
         if isinstance(other, Iterable):
             return self._casefolded_list == self._new_casefolded_list(other)
@@ -377,7 +1446,7 @@ class NocaseList(list):
           AttributeError: A value in the other list does not have the casefold
             method.
         """
-        if isinstance(other, NocaseList):
+        if self._shares_casefolding(other):
             # pylint: disable=protected-access
             return self._casefolded_list > other._casefolded_list
 
@@ -400,7 +1469,7 @@ class NocaseList(list):
           AttributeError: A value in the other list does not have the casefold
             method.
         """
-        if isinstance(other, NocaseList):
+        if self._shares_casefolding(other):
             # pylint: disable=protected-access
             return self._casefolded_list < other._casefolded_list
 
@@ -457,11 +1526,21 @@ class NocaseList(list):
         Raises:
           AttributeError: The value does not have the casefold method.
         """
-        return self._casefolded_list.count(self._casefolded_value(value))
+        value_cf = self._casefolded_value(value)
+        if self._bloom is None:
+            return self._casefolded_list.count(value_cf)
+        if self._bloom_rejects(value_cf):
+            return 0
+        count = self._casefolded_list.count(value_cf)
+        if not count:
+            self._bloom.false_positives += 1
+        return count
 
     def copy(self) -> 'NocaseList':
         """
         Return a shallow copy of the list.
+
+        The copy has the same folder as the list.
         """
         return NocaseList(self)
 
@@ -469,8 +1548,11 @@ class NocaseList(list):
         """
         Remove all items from the list (and return None).
         """
+        self._version += 1
         super().clear()
         self._casefolded_list.clear()
+        if self._bloom is not None:
+            self._rebuild_bloom()
 
     def index(self, value: Value, start: SupportsIndex = 0,
               stop: SupportsIndex = 9223372036854775807) -> int:
@@ -486,8 +1568,247 @@ class NocaseList(list):
           AttributeError: The value does not have the casefold method.
           ValueError: No such item is found.
         """
-        return self._casefolded_list.index(
-            self._casefolded_value(value), start, stop)
+        value_cf = self._casefolded_value(value)
+        if self._bloom is None:
+            return self._casefolded_list.index(value_cf, start, stop)
+        if self._bloom_rejects(value_cf):
+            raise ValueError(f"{value!r} is not in list")
+        try:
+            return self._casefolded_list.index(value_cf, start, stop)
+        except ValueError:
+            self._bloom.false_positives += 1
+            raise
+
+    def case_variants(self) -> Dict[Value, CaseVariants]:
+        """
+        Return the items of the list grouped by their casefolded value.
+
+        The result is a dictionary whose keys are the casefolded values in the
+        order of their first occurrence in the list, and whose values are
+        :class:`CaseVariants` objects with the positions and the distinct
+        lexical spellings of the list items with that casefolded value.
+        Casefolded values of list or tuple items are represented as tuples in
+        the dictionary keys.
+
+        The grouping is performed in a single pass over the list, using the
+        already casefolded items.
+        """
+        return _case_variants(self, self._casefolded_list)
+
+    def canonicalize(self, prefer: str = 'first') -> int:
+        """
+        Change all items of the list that are case-insensitively equal, to have
+        the same lexical case (and return the number of changed items).
+
+        The ``prefer`` parameter selects the spelling that is used for each
+        group of case-insensitively equal items:
+
+        * ``'first'`` - the spelling of the first item in the list.
+        * ``'most_frequent'`` - the spelling that occurs most often, and
+          the first of those if there is a tie.
+
+        Since the casefolded value of the items does not change, the items are
+        not casefolded again.
+
+        Raises:
+          ValueError: Invalid value for the ``prefer`` parameter.
+        """
+        canonical = _canonical_spellings(self, self._casefolded_list, prefer)
+
+        self._version += 1
+        changed = 0
+        for pos, value_cf in enumerate(self._casefolded_list):
+            value = canonical[_hashable(value_cf)]
+            if self[pos] != value:
+                super().__setitem__(pos, value)
+                changed += 1
+        return changed
+
+    def _cached(self, key, compute: Callable):
+        """
+        Return the result derived from the list for the specified hashable
+        key, from the cache of the list if it has not been changed since the
+        result was cached, or otherwise by calling the specified function
+        without arguments and caching its result.
+
+        The cache holds at most _CACHE_SIZE results, and is emptied when it
+        is full.
+        """
+        self._flush()
+        cache = self._cache
+        if cache is None or self._cache_version != self._version:
+            cache = {}
+            self._cache = cache
+            self._cache_version = self._version
+        try:
+            return cache[key]
+        except KeyError:
+            pass
+        result = compute()
+        if len(cache) >= _CACHE_SIZE:
+            cache.clear()
+        cache[key] = result
+        return result
+
+    def _equals(self, other: 'NocaseList') -> bool:
+        """
+        Return a boolean indicating whether the list is equal to the other
+        list, whose casefolded items can be used by this list.
+
+        The result is memoized for the other list, until either list is
+        changed.
+        """
+        memo = self._cached('_equals', dict)
+        # The memo maps the id of the other list to a tuple of a weak
+        # reference to it (for detecting a reused id), its mutation version
+        # and the result.
+        entry = memo.get(id(other))
+        # pylint: disable=protected-access
+        if entry is not None and entry[0]() is other and \
+                entry[1] == other._version:
+            return entry[2]
+        result = self._casefolded_list == other._casefolded_list
+        if len(memo) >= _CACHE_SIZE:
+            memo.clear()
+        memo[id(other)] = (weakref.ref(other), other._version, result)
+        return result
+
+    def sorted_copy(self, *, key: Optional[Callable] = None,
+                    reverse: bool = False) -> 'NocaseList':
+        """
+        Return a shallow copy of the list with its items sorted as by
+        :meth:`sort`.
+
+        The sorted items are cached until the list is changed (see
+        :attr:`version`), so that calling the method again for an unchanged
+        list and the same parameters only copies them, without sorting or
+        casefolding the items again. The copy has the same folder as the
+        list.
+        """
+
+        def compute():
+            """Return a sorted copy of the list"""
+            lst = self.copy()
+            lst.sort(key=key, reverse=reverse)
+            return lst
+
+        return self._cached(('sorted_copy', key, reverse), compute).copy()
+
+    def unique(self) -> 'NocaseList':
+        """
+        Return a shallow copy of the list without the items that are
+        case-insensitively equal to an earlier item of the list, i.e. with
+        the first spelling of each item.
+
+        The result is cached until the list is changed (see :attr:`version`),
+        so that calling the method again for an unchanged list only copies
+        it. The copy has the same folder as the list.
+        """
+
+        def compute():
+            """Return a copy of the list without duplicate items"""
+            seen: set = set()
+            keep = []
+            for value_cf in map(_hashable, self._casefolded_list):
+                keep.append(value_cf not in seen)
+                seen.add(value_cf)
+            lst = self.copy()
+            lst._compact(keep)  # pylint: disable=protected-access
+            return lst
+
+        return self._cached('unique', compute).copy()
+
+    def casefolded_set(self) -> frozenset:
+        """
+        Return the casefolded values of the items of the list, as a
+        :class:`py:frozenset`, for fast repeated membership tests and set
+        operations. Casefolded values of list or tuple items are represented
+        as tuples.
+
+        The set is cached until the list is changed (see :attr:`version`),
+        so that calling the method again for an unchanged list returns the
+        same set.
+        """
+        return self._cached(
+            'casefolded_set',
+            lambda: frozenset(map(_hashable, self._casefolded_list)))
+
+    def frozen(self):
+        """
+        Return an immutable copy of the current items of the list, as a
+        :class:`NocaseSnapshot` object.
+
+        The copy is cached until the list is changed (see :attr:`version`),
+        so that calling the method again for an unchanged list returns the
+        same object, without copying the items.
+        """
+        # The module of NocaseSnapshot imports this module
+        # pylint: disable=import-outside-toplevel
+        from ._nocasesnapshot import NocaseSnapshot
+
+        def compute():
+            """Return a snapshot with a copy of the items of the list"""
+            values = list(self)
+            if not values:
+                return NocaseSnapshot(self, [], [], 0)
+            return NocaseSnapshot(self, [values],
+                                  [list(self._casefolded_list)], len(values))
+
+        return self._cached('frozen', compute)
+
+    def enable_bloom_filter(self, false_positive_rate: float = 0.01,
+                            rebuild_threshold: float = 0.5) -> None:
+        """
+        Attach a Bloom filter to the list (and return None), or replace its
+        existing Bloom filter.
+
+        The Bloom filter rejects most lookups of values that are not in the
+        list (``value in ncl``, :meth:`count`, :meth:`index` and the methods
+        using it) in constant time, without searching the list. This speeds
+        up large lists in which most lookups are misses. On the other hand,
+        the filter needs to be updated when the list is changed, and it needs
+        memory of about 10 bits per item for a false positive rate of 1%.
+
+        The filter is sized from the length of the list. It is rebuilt when
+        the list has grown beyond the size of the filter, when the number of
+        removed or replaced items exceeds the rebuild threshold, and after
+        changes of slices and other bulk changes that remove items.
+
+        The Bloom filter is kept when the list is pickled or copied with
+        :func:`py:copy.copy` (the restored list builds its own filter), but
+        not when the list is copied with :meth:`copy`.
+
+        Parameters:
+
+          false_positive_rate (float): The rate of lookups of values that
+            are not in the list, that pass the filter when it is filled to
+            its capacity. Must be between 0 and 1 (exclusive).
+
+          rebuild_threshold (float): The number of removed or replaced items,
+            relative to the capacity of the filter, above which the filter is
+            rebuilt.
+
+        Raises:
+          ValueError: Invalid parameter value.
+        """
+        self._bloom = _BloomFilter(false_positive_rate, rebuild_threshold)
+        self._rebuild_bloom()
+
+    def disable_bloom_filter(self) -> None:
+        """
+        Remove the Bloom filter from the list, if it has one
+        (and return None).
+        """
+        self.__dict__.pop('_bloom', None)
+
+    def bloom_filter_statistics(self) -> Optional[BloomFilterStatistics]:
+        """
+        Return statistics about the Bloom filter of the list, or `None` if
+        the list does not have a Bloom filter.
+        """
+        if self._bloom is None:
+            return None
+        return self._bloom.statistics()
 
     def append(self, value: Value) -> None:
         """
@@ -497,8 +1818,16 @@ class NocaseList(list):
         Raises:
           AttributeError: The value does not have the casefold method.
         """
+        self._version += 1
+        if self._batch_depth:
+            super().append(value)
+            self._defer(len(self) - 1)
+            return
+        value_cf = self._casefolded_value(value)
+        self._casefolded_list.append(value_cf)
         super().append(value)
-        self._casefolded_list.append(self._casefolded_value(value))
+        if self._bloom is not None:
+            self._note_mutation([value_cf], 0)
 
     def extend(self, values: Iterable) -> None:
         """
@@ -509,15 +1838,30 @@ class NocaseList(list):
           AttributeError: A value in the iterable does not have the casefold
             method.
         """
-        super().extend(values)
-        # The following is a circumvention for a behavior of the 'pickle' module
-        # that during unpickling may call this method on an object that has
-        # been created with __new__() without calling __init__().
+        self._version += 1
+        if self._batch_depth:
+            size = len(self)
+            super().extend(values)
+            self._defer(size)
+            return
+        # When unpickling a pickle from an earlier version of this package,
+        # the 'pickle' module calls this method on an object that has been
+        # created with __new__() without calling __init__(), and then calls
+        # __setstate__(), which casefolds the items.
         try:
-            for value in values:
-                self._casefolded_list.append(self._casefolded_value(value))
+            casefolded_list = self._casefolded_list
         except AttributeError:
-            self._casefolded_list = self._new_casefolded_list(self)
+            super().extend(values)
+            return
+        # The values are casefolded and stored first, so that the list is
+        # unchanged if a value cannot be casefolded or stored.
+        if not isinstance(values, list):
+            values = list(values)
+        values_cf = self._new_casefolded_list(values)
+        casefolded_list.extend(values_cf)
+        super().extend(values)
+        if self._bloom is not None:
+            self._note_mutation(values_cf, 0)
 
     def insert(self, index: SupportsIndex, value: Value) -> None:
         """
@@ -527,15 +1871,32 @@ class NocaseList(list):
         Raises:
           AttributeError: The value does not have the casefold method.
         """
+        self._version += 1
+        if self._batch_depth:
+            changed_from = min(max(self._changed_from(index), 0), len(self))
+            super().insert(index, value)
+            self._defer(changed_from)
+            return
+        value_cf = self._casefolded_value(value)
+        self._casefolded_list.insert(index, value_cf)
         super().insert(index, value)
-        self._casefolded_list.insert(index, self._casefolded_value(value))
+        if self._bloom is not None:
+            self._note_mutation([value_cf], 0)
 
     def pop(self, index: SupportsIndex = -1) -> Value:
         """
         Return the value of the item at the specified index and also remove it
         from the list.
         """
+        self._version += 1
+        if self._batch_depth:
+            changed_from = self._changed_from(index)
+            value = super().pop(index)
+            self._defer(changed_from)
+            return value
         self._casefolded_list.pop(index)
+        if self._bloom is not None:
+            self._note_mutation([], 1)
         return super().pop(index)
 
     def remove(self, value: Value) -> None:
@@ -544,18 +1905,86 @@ class NocaseList(list):
         specified value (and return None), comparing the value and the list
         items case-insensitively.
 
+        The item is looked up once using :meth:`index`, and is then deleted at
+        that index from the list.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+          ValueError: No such item is found.
+        """
+        del self[self.index(value)]
+
+    def remove_all(self, values: Iterable) -> int:
+        """
+        Remove all items from the list whose value is equal to any of the
+        specified values (and return the number of removed items), comparing
+        the values and the list items case-insensitively.
+
+        The remaining items are compacted in a single pass over the list.
+
+        Raises:
+          AttributeError: A value in the iterable does not have the casefold
+            method.
+        """
+        values_cf = {_hashable(v) for v in self._new_casefolded_list(values)}
+        return self._compact(
+            [_hashable(value_cf) not in values_cf
+             for value_cf in self._casefolded_list])
+
+    def discard(self, value: Value) -> None:
+        """
+        Remove the first item from the list whose value is equal to the
+        specified value, if there is such an item (and return None), comparing
+        the value and the list items case-insensitively.
+
+        In contrast to :meth:`remove`, no exception is raised when there is no
+        such item.
+
         Raises:
           AttributeError: The value does not have the casefold method.
         """
-        self._casefolded_list.remove(self._casefolded_value(value))
-        super().remove(value)
+        try:
+            index = self.index(value)
+        except ValueError:
+            return
+        del self[index]
+
+    def retain(self, predicate: Callable) -> int:
+        """
+        Remove all items from the list for which the specified predicate
+        function returns false (and return the number of removed items).
+
+        The predicate function is called once for each list item with its
+        original (not casefolded) value. The remaining items are compacted
+        in a single pass over the list.
+        """
+        return self._compact([bool(predicate(value)) for value in self])
+
+    def _compact(self, keep: list) -> int:
+        """
+        Remove the list items whose corresponding flag in the specified list
+        is false, and return the number of removed items.
+        """
+        self._flush()
+        removed = len(keep) - sum(keep)
+        if removed:
+            self._version += 1
+            super().__setitem__(slice(None), list(compress(self, keep)))
+            self._casefolded_list[:] = list(
+                compress(self._casefolded_list, keep))
+            if self._bloom is not None:
+                self._rebuild_bloom()
+        return removed
 
     def reverse(self) -> None:
         """
         Reverse the items in the list in place (and return None).
         """
+        self._flush()
+        self._version += 1
         super().reverse()
-        self._casefolded_list = self._new_casefolded_list(self)
+        self._casefolded_list = self._new_casefolded_storage(
+            self._new_casefolded_list(self))
 
     def sort(self, *, key: Optional[Callable] = None,
              reverse: bool = False) -> None:
@@ -582,5 +2011,8 @@ class NocaseList(list):
                 return key(self._casefolded_value(value))
             return self._casefolded_value(value)
 
+        self._flush()
+        self._version += 1
         super().sort(key=casefolded_key, reverse=reverse)
-        self._casefolded_list = self._new_casefolded_list(self)
+        self._casefolded_list = self._new_casefolded_storage(
+            self._new_casefolded_list(self))
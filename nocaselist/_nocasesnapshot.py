@@ -0,0 +1,288 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+This module provides class NocaseSnapshot.
+"""
+
+import sys
+from bisect import bisect_right
+from operator import index as _index
+from itertools import accumulate, chain
+from typing import Optional, Dict
+from typing import SupportsIndex  # type: ignore
+if sys.version_info[0:2] >= (3, 9):
+    from collections.abc import Iterable, Sequence  # type: ignore
+else:
+    # Before py39, collections.abc.Iterable did not support generic type
+    from typing import Iterable, Sequence
+
+from ._nocaselist import CaseVariants, Value, IndexOrSlice, _case_variants
+
+__all__ = ['NocaseSnapshot']
+
+
+class NocaseSnapshot(Sequence):
+    """
+    An immutable, case-insensitive and case-preserving view of the items that
+    a list had at a point in time.
+
+    Snapshots are created with :meth:`NocaseBlockList.snapshot` and
+    :meth:`ConcurrentNocaseList.snapshot`, and are not meant to be created
+    directly. Creating a snapshot takes O(1) time, because the snapshot
+    shares the blocks of items with the list, instead of copying them. The
+    list copies a shared block only when it changes the block for the first
+    time after the snapshot was taken (copy-on-write).
+
+    The snapshot supports the reading methods of :class:`NocaseList`
+    (e.g. ``value in snap``, :meth:`index`, :meth:`count`, indexing,
+    iteration, comparisons and :meth:`case_variants`), with the same
+    case-insensitive behavior as the list it was taken from. Because it never
+    changes, it can be read by any number of threads concurrently without
+    locking, while the list continues to be changed.
+
+    The snapshot references the list it was taken from, for casefolding the
+    values that are looked up.
+    """
+
+    def __init__(self, lst, blocks: list, casefolded_blocks: list,
+                 length: int) -> None:
+        """
+        Initialize the snapshot with the specified blocks of original and
+        casefolded items of the specified list, and their total number of
+        items. The blocks must no longer be changed by the list.
+        """
+        self._list = lst
+        self._blocks = blocks
+        self._casefolded_blocks = casefolded_blocks
+        self._len = length
+        # The _offsets attribute is a list with the index after the last item
+        # of each block, or None if it has not been needed yet.
+        self._offsets: Optional[list] = None
+
+    def _locate(self, index: SupportsIndex) -> tuple:
+        """
+        Return a tuple of the block index and the index within that block,
+        for the specified snapshot index.
+
+        Raises:
+          IndexError: The index is out of range.
+        """
+        index = _index(index)
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("NocaseSnapshot index out of range")
+        offsets = self._offsets
+        if offsets is None:
+            offsets = list(accumulate(map(len, self._blocks)))
+            self._offsets = offsets
+        block_index = bisect_right(offsets, index)
+        if block_index:
+            index -= offsets[block_index - 1]
+        return block_index, index
+
+    def __len__(self) -> int:
+        """
+        Return the number of items in the snapshot.
+
+        Invoked using ``len(snap)``.
+        """
+        return self._len
+
+    def __iter__(self):
+        """
+        Return an iterator through the items of the snapshot, in their
+        original lexical case.
+
+        Invoked using ``iter(snap)``.
+        """
+        return chain.from_iterable(self._blocks)
+
+    def __reversed__(self):
+        """
+        Return an iterator through the items of the snapshot in reverse
+        order, in their original lexical case.
+
+        Invoked using ``reversed(snap)``.
+        """
+        return chain.from_iterable(map(reversed, reversed(self._blocks)))
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the snapshot, in the same format as
+        for :class:`py:list`.
+
+        Invoked using ``repr(snap)``.
+        """
+        return repr(list(self))
+
+    def __getitem__(self, index: IndexOrSlice):
+        """
+        Return the value of the item at an existing index in the snapshot, or
+        a :class:`py:list` with the values of the items of a slice of the
+        snapshot.
+
+        Invoked using ``snap[index]``.
+
+        Raises:
+          IndexError: The index is out of range.
+        """
+        if isinstance(index, slice):
+            return list(self)[index]
+        block_index, pos = self._locate(index)
+        return self._blocks[block_index][pos]
+
+    def __contains__(self, value: Value) -> bool:
+        """
+        Return a boolean indicating whether the snapshot contains at least
+        one item with the value, by looking it up case-insensitively.
+
+        Invoked using ``value in snap``.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        # pylint: disable=protected-access
+        value_cf = self._list._casefolded_value(value)
+        return any(value_cf in block_cf
+                   for block_cf in self._casefolded_blocks)
+
+    def _other_casefolded_list(self, other: object) -> Optional[list]:
+        """
+        Return the casefolded items of the other operand of a comparison as a
+        list, or None if the other operand is not iterable.
+        """
+        # pylint: disable=protected-access
+        if isinstance(other, NocaseSnapshot) and \
+                self._list._shares_casefolding(other._list):
+            return list(chain.from_iterable(other._casefolded_blocks))
+        if isinstance(other, Iterable):
+            return self._list._new_casefolded_list(other)
+        return None
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the snapshot and the other list
+        are equal, by comparing corresponding items case-insensitively.
+
+        Invoked using e.g. ``snap == other``.
+        """
+        other_cf = self._other_casefolded_list(other)
+        if other_cf is None:
+            return NotImplemented
+        return list(chain.from_iterable(self._casefolded_blocks)) == other_cf
+
+    def __ne__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the snapshot and the other list
+        are not equal, by comparing corresponding items case-insensitively.
+
+        Invoked using e.g. ``snap != other``.
+        """
+        eq = self.__eq__(other)
+        if eq is NotImplemented:
+            return NotImplemented
+        return not eq
+
+    def __gt__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the snapshot is greater than the
+        other list, by comparing corresponding items case-insensitively.
+
+        Invoked using e.g. ``snap > other``.
+        """
+        other_cf = self._other_casefolded_list(other)
+        if other_cf is None:
+            return NotImplemented
+        return list(chain.from_iterable(self._casefolded_blocks)) > other_cf
+
+    def __lt__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the snapshot is less than the
+        other list, by comparing corresponding items case-insensitively.
+
+        Invoked using e.g. ``snap < other``.
+        """
+        other_cf = self._other_casefolded_list(other)
+        if other_cf is None:
+            return NotImplemented
+        return list(chain.from_iterable(self._casefolded_blocks)) < other_cf
+
+    def __ge__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the snapshot is greater than or
+        equal to the other list, by comparing corresponding items
+        case-insensitively.
+
+        Invoked using e.g. ``snap >= other``.
+        """
+        lt = self.__lt__(other)
+        if lt is NotImplemented:
+            return NotImplemented
+        return not lt
+
+    def __le__(self, other: object) -> bool:
+        """
+        Return a boolean indicating whether the snapshot is less than or
+        equal to the other list, by comparing corresponding items
+        case-insensitively.
+
+        Invoked using e.g. ``snap <= other``.
+        """
+        gt = self.__gt__(other)
+        if gt is NotImplemented:
+            return NotImplemented
+        return not gt
+
+    def count(self, value: Value) -> int:
+        """
+        Return the number of times the specified value occurs in the
+        snapshot, comparing the value and the items case-insensitively.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+        """
+        # pylint: disable=protected-access
+        value_cf = self._list._casefolded_value(value)
+        return sum(block_cf.count(value_cf)
+                   for block_cf in self._casefolded_blocks)
+
+    def index(self, value: Value, start: SupportsIndex = 0,
+              stop: SupportsIndex = sys.maxsize) -> int:
+        """
+        Return the index of the first item that is equal to the specified
+        value, comparing the value and the items case-insensitively.
+
+        The search is limited to the index range defined by the specified
+        ``start`` and ``stop`` parameters, whereby ``stop`` is the index
+        of the first item after the search range.
+
+        Raises:
+          AttributeError: The value does not have the casefold method.
+          ValueError: No such item is found.
+        """
+        # pylint: disable=protected-access
+        value_cf = self._list._casefolded_value(value)
+        start, stop, _ = slice(start, stop).indices(self._len)
+        if start < stop:
+            block_index, pos = self._locate(start)
+            offset = start - pos
+            for block_cf in self._casefolded_blocks[block_index:]:
+                if offset >= stop:
+                    break
+                try:
+                    pos = block_cf.index(
+                        value_cf, max(start - offset, 0), stop - offset)
+                except ValueError:
+                    offset += len(block_cf)
+                    continue
+                return offset + pos
+        raise ValueError(f"{value!r} is not in NocaseSnapshot")
+
+    def case_variants(self) -> Dict[Value, CaseVariants]:
+        """
+        Return the items of the snapshot grouped by their casefolded value.
+
+        See :meth:`NocaseList.case_variants` for details.
+        """
+        return _case_variants(chain.from_iterable(self._blocks),
+                              chain.from_iterable(self._casefolded_blocks))
@@ -0,0 +1,152 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+This module provides a reader-writer lock for the thread-safe list classes.
+"""
+
+import threading
+from time import perf_counter
+from typing import NamedTuple
+
+__all__ = ['LockStatistics']
+
+
+class LockStatistics(NamedTuple):
+    """
+    Statistics about the reader-writer lock of a
+    :class:`ThreadSafeNocaseList`, as returned by
+    :meth:`ThreadSafeNocaseList.lock_statistics`.
+
+    Nested acquisitions of the lock by a thread that holds it already (e.g.
+    the operations in a :meth:`ThreadSafeNocaseList.batch`) are not counted.
+    """
+
+    #: Number of times the lock was acquired for reading.
+    reads: int
+
+    #: Number of times the lock was acquired for writing.
+    writes: int
+
+    #: Number of read acquisitions that had to wait for a writer.
+    read_waits: int
+
+    #: Number of write acquisitions that had to wait for readers or another
+    #: writer.
+    write_waits: int
+
+    #: Total time in seconds that acquisitions waited for the lock.
+    wait_time: float
+
+
+class _RWLock:
+    """
+    A reader-writer lock that can be held by multiple reading threads or by
+    one writing thread.
+
+    The lock is reentrant: A thread that holds it for reading or writing can
+    acquire it for reading again, and a thread that holds it for writing can
+    acquire it for writing again. A thread that holds it only for reading
+    cannot acquire it for writing.
+
+    Writers are preferred: While a writer waits for the lock, new readers
+    wait as well, so that writers are not starved by a steady stream of
+    readers.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        # Number of threads that hold the lock for reading
+        self._readers = 0
+        # Identifier of the thread that holds the lock for writing, or None
+        self._writer = None
+        # Nesting depth of the write acquisitions of the writing thread
+        self._write_depth = 0
+        # Number of threads that wait for acquiring the lock for writing
+        self._waiting_writers = 0
+        # Nesting depth of the read acquisitions of each thread
+        self._local = threading.local()
+        self._reads = 0
+        self._writes = 0
+        self._read_waits = 0
+        self._write_waits = 0
+        self._wait_time = 0.0
+
+    def acquire_read(self) -> None:
+        """
+        Acquire the lock for reading, waiting while another thread holds it
+        for writing or waits for it.
+        """
+        local = self._local
+        depth = getattr(local, 'depth', 0)
+        if depth or self._writer == threading.get_ident():
+            local.depth = depth + 1
+            return
+        with self._cond:
+            self._reads += 1
+            if self._writer is not None or self._waiting_writers:
+                self._read_waits += 1
+                start = perf_counter()
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+                self._wait_time += perf_counter() - start
+            self._readers += 1
+        local.depth = 1
+
+    def release_read(self) -> None:
+        """
+        Release the lock after acquiring it for reading.
+        """
+        local = self._local
+        local.depth -= 1
+        if local.depth or self._writer == threading.get_ident():
+            return
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        """
+        Acquire the lock for writing, waiting while other threads hold it.
+
+        Raises:
+          RuntimeError: The current thread holds the lock only for reading.
+        """
+        me = threading.get_ident()
+        if self._writer == me:
+            self._write_depth += 1
+            return
+        if getattr(self._local, 'depth', 0):
+            raise RuntimeError(
+                "Cannot acquire the lock for writing while holding it for "
+                "reading")
+        with self._cond:
+            self._writes += 1
+            if self._writer is not None or self._readers:
+                self._write_waits += 1
+                start = perf_counter()
+                self._waiting_writers += 1
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+                self._waiting_writers -= 1
+                self._wait_time += perf_counter() - start
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self) -> None:
+        """
+        Release the lock after acquiring it for writing.
+        """
+        self._write_depth -= 1
+        if self._write_depth:
+            return
+        with self._cond:
+            self._writer = None
+            self._cond.notify_all()
+
+    def statistics(self) -> LockStatistics:
+        """
+        Return statistics about the use of the lock.
+        """
+        with self._cond:
+            return LockStatistics(self._reads, self._writes, self._read_waits,
+                                  self._write_waits, self._wait_time)
@@ -0,0 +1,184 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+This module provides class SharedNocaseList.
+"""
+
+import sys
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Optional
+
+from ._folders import Folder
+from ._mmapnocaselist import _BufferNocaseList, _chunks
+
+__all__ = ['SharedNocaseList']
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Return the existing shared memory block with the specified name, without
+    making this process responsible for destroying it.
+
+    Raises:
+      FileNotFoundError: The shared memory block does not exist.
+    """
+    if sys.version_info >= (3, 13):
+        # pylint: disable=unexpected-keyword-arg
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before Python 3.13, attaching registers the block with the resource
+    # tracker of this process. Processes that are started by the
+    # multiprocessing module share the resource tracker of their parent
+    # process, where the block is registered already.
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedNocaseList(_BufferNocaseList):
+    """
+    A case-insensitive and case-preserving read-only list of unicode
+    strings, that is stored in shared memory and can be used by multiple
+    processes without copying it.
+
+    The list is created in one process with :meth:`publish`, which stores the
+    original items, their casefolded values and a hash index of the
+    casefolded values in a shared memory block (see
+    :class:`py:multiprocessing.shared_memory.SharedMemory`), using the same
+    binary format as :class:`MmapNocaseList`. Other processes attach to the
+    block by its name. Attaching takes constant time regardless of the size
+    of the list, and items are decoded when they are accessed, so that the
+    processes do not hold copies of the items as Python objects.
+
+    The list is case-insensitive and case-preserving in the same way as
+    :class:`NocaseList` and supports its non-modifying operations, and its
+    case-insensitive behavior is defined by a casefold strategy object (see
+    :ref:`Casefold strategies`). ``value in sncl``, :meth:`count` and
+    :meth:`index` use the hash index and take O(1) time on average.
+
+    Pickling a list saves only the name of the shared memory block, so that
+    a list that is passed to other processes (e.g. as an argument of a task
+    of a :class:`py:multiprocessing.pool.Pool`) is attached to the same block.
+
+    Each process closes its list with :meth:`close` (or by using it as a
+    context manager). The process that published the list destroys the
+    shared memory block with :meth:`unlink` when it is no longer needed.
+
+    Before Python 3.13, the processes that attach to the block should be
+    started by the :mod:`py:multiprocessing` module from the process that
+    published the list, because the resource tracker of other processes
+    destroys the block when they end.
+    """
+
+    def __init__(self, name: str, *, folder: Optional[Folder] = None) -> None:
+        """
+        Attach to a list in shared memory that was created with
+        :meth:`publish`.
+
+        Parameters:
+
+          name (str): Name of the shared memory block (see :attr:`name`).
+
+          folder (:class:`~nocaselist.Folder`): The casefold strategy object.
+            It must be of the same type as the folder that was used for
+            publishing the list. If `None`, a folder of that type is created,
+            which is possible for the folder classes of this package.
+
+        Raises:
+          FileNotFoundError: The shared memory block does not exist.
+          ValueError: The shared memory block does not contain a list in the
+            binary format of this class, or the folder does not match it.
+        """
+        self._init(_attach_shared_memory(name), folder)
+
+    def _init(self, shm: shared_memory.SharedMemory,
+              folder: Optional[Folder]) -> None:
+        """
+        Attach the list to the shared memory block.
+        """
+        self._shm = shm
+        try:
+            self._attach(shm.buf, f"Shared memory {shm.name}", folder)
+        except Exception:
+            self.close()
+            raise
+
+    @classmethod
+    def publish(cls, iterable=(), *, folder: Optional[Folder] = None,
+                name: Optional[str] = None) -> 'SharedNocaseList':
+        """
+        Create a shared memory block with the items in the specified iterable
+        and their casefolded values, and return a list that is attached to
+        it.
+
+        Parameters:
+
+          iterable (iterable of str): The items for the list. If it is a
+            :class:`NocaseList`, :class:`NocaseArray`,
+            :class:`MmapNocaseList` or :class:`SharedNocaseList` with the same
+            folder, its casefolded items are used without casefolding them
+            again.
+
+          folder (:class:`~nocaselist.Folder`): The casefold strategy object.
+            If `None`, the folder of the iterable is used if it has one, and
+            otherwise :class:`~nocaselist.CasefoldFolder`, which has the same
+            behavior as the default for :class:`NocaseList`.
+
+          name (str): Name for the shared memory block. If `None`, a unique
+            name is generated.
+
+        Returns:
+          SharedNocaseList: The list, attached to the new shared memory
+          block.
+
+        Raises:
+          TypeError: An item is not a unicode string.
+          FileExistsError: A shared memory block with the name exists
+            already.
+        """
+        chunks = _chunks(iterable, folder, hash_index=True)
+        shm = shared_memory.SharedMemory(
+            name=name, create=True, size=sum(map(len, chunks)))
+        try:
+            pos = 0
+            for chunk in chunks:
+                shm.buf[pos:pos + len(chunk)] = chunk
+                pos += len(chunk)
+        except Exception:
+            shm.close()
+            shm.unlink()
+            raise
+        lst = cls.__new__(cls)
+        # pylint: disable=protected-access
+        lst._init(shm, folder or getattr(iterable, '_folder', None))
+        return lst
+
+    def close(self) -> None:
+        """
+        Detach the list from the shared memory block. The list cannot be used
+        afterwards, but the shared memory block continues to exist.
+        """
+        self._release()
+        self._buf = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """
+        Request that the shared memory block is destroyed. Lists that are
+        attached to it in other processes remain usable until they are
+        closed, but no more lists can be attached to it.
+        """
+        self._shm.unlink()
+
+    @property
+    def name(self) -> str:
+        """
+        str: Name of the shared memory block of the list.
+        """
+        return self._shm.name
+
+    def __reduce__(self):
+        """
+        Called when pickling the object, see :meth:`py:object.__reduce__`.
+
+        Only the name of the shared memory block and the folder are saved, so
+        the shared memory block must still exist when unpickling.
+        """
+        return (partial(self.__class__, folder=self._folder), (self.name,))
@@ -0,0 +1,230 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+This module provides class ThreadSafeNocaseList.
+"""
+
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterator, Optional
+
+from ._folders import Folder
+from ._nocaselist import NocaseList
+from ._rwlock import _RWLock, LockStatistics
+
+__all__ = ['ThreadSafeNocaseList']
+
+
+def _reading(method: Callable) -> Callable:
+    """
+    Return a wrapper for the list method that calls it while holding the lock
+    of the list for reading.
+    """
+
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        lock = self._lock
+        lock.acquire_read()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            lock.release_read()
+
+    return locked
+
+
+def _writing(method: Callable) -> Callable:
+    """
+    Return a wrapper for the list method that calls it while holding the lock
+    of the list for writing.
+    """
+
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        lock = self._lock
+        lock.acquire_write()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            lock.release_write()
+
+    return locked
+
+
+class ThreadSafeNocaseList(NocaseList):
+    """
+    A case-insensitive and case-preserving list that can be used by multiple
+    threads concurrently.
+
+    The list is derived from :class:`NocaseList` and has the same behavior,
+    but its methods hold a reader-writer lock of the list while they run:
+    Methods that only read the list (e.g. ``value in ncl``, :meth:`index`,
+    :meth:`count` and comparisons) hold it for reading, so that multiple
+    threads can read the list concurrently. Methods that change the list
+    (e.g. :meth:`append` or :meth:`remove`) hold it exclusively for writing,
+    so that readers never observe the original and the casefolded items out
+    of sync. Iterating over the list iterates over a copy of its items that
+    is taken while holding the lock for reading.
+
+    Each method is atomic, but a sequence of method calls is not. A sequence
+    of changes can be made atomic with :meth:`batch`, which holds the lock for
+    writing until the sequence is done. This also reduces the lock traffic,
+    because the methods that are called within the batch do not acquire the
+    lock again. Lock usage and contention can be monitored with
+    :meth:`lock_statistics`.
+
+    Methods that use another list (e.g. comparisons or :meth:`extend`) do
+    not lock the other list.
+
+    Under the GIL, threads do not read the list in parallel; the lock
+    ensures consistency. Lists that are read much more often than they are
+    changed can also use :class:`ConcurrentNocaseList`, whose reads do not
+    lock at all.
+    """
+
+    def __init__(self, iterable=(), *, folder: Optional[Folder] = None) \
+            -> None:
+        """
+        Initialize the list with the items in the specified iterable.
+
+        The parameters are the same as for :class:`NocaseList`.
+        """
+        # Initializing the list uses its locking methods already. The lock
+        # is replaced afterwards, so that its statistics cover only the use
+        # of the initialized list.
+        self._lock = _RWLock()
+        super().__init__(iterable, folder=folder)
+        self._lock = _RWLock()
+
+    @contextmanager
+    def batch(self) -> Iterator['ThreadSafeNocaseList']:
+        """
+        Return a context manager that holds the lock of the list for writing,
+        so that the changes and lookups made within it are atomic with
+        respect to other threads, and do not acquire the lock individually.
+
+        As for :meth:`NocaseList.batch`, casefolding the items that are
+        changed within it is deferred, and is done at once before the lock
+        is released.
+
+        Invoked using ``with ncl.batch(): ...``.
+
+        Example::
+
+            with ncl.batch():
+                if 'Foo' not in ncl:
+                    ncl.append('Foo')
+                ncl.remove_all(obsolete)
+
+        Raises:
+          RuntimeError: The current thread holds the lock only for reading
+            (e.g. in a :meth:`__casefold__` method that is called while
+            looking up a value).
+          AttributeError: A value that was added in the batch does not have
+            the casefold method (see :meth:`NocaseList.batch`).
+        """
+        self._lock.acquire_write()
+        try:
+            with super().batch():
+                yield self
+        finally:
+            self._lock.release_write()
+
+    def lock_statistics(self) -> LockStatistics:
+        """
+        Return statistics about the use of the reader-writer lock of the list,
+        e.g. for detecting lock contention.
+        """
+        return self._lock.statistics()
+
+    def __setstate__(self, state):
+        """
+        Called when unpickling the object, see :meth:`py:object.__setstate__`.
+
+        The lock is not pickled; the unpickled list has a new lock.
+        """
+        self._lock = _RWLock()
+        super().__setstate__(state)
+        self._lock = _RWLock()
+
+    @_reading
+    def __getstate__(self):
+        """
+        Called when pickling the object, see :meth:`py:object.__getstate__`.
+
+        The lock is not pickled.
+        """
+        state = super().__getstate__()
+        del state['_lock']
+        return state
+
+    @_reading
+    def __iter__(self):
+        """
+        Return an iterator through a copy of the list items, in their
+        original lexical case.
+
+        Invoked using ``iter(ncl)``.
+        """
+        return iter(list.copy(self))
+
+    @_reading
+    def copy(self) -> 'ThreadSafeNocaseList':
+        """
+        Return a shallow copy of the list, as a :class:`ThreadSafeNocaseList`
+        with its own lock.
+
+        The copy has the same folder as the list.
+        """
+        return self.__class__(self)
+
+    # Methods that read the list
+    __getitem__ = _reading(list.__getitem__)
+    __len__ = _reading(list.__len__)
+    __repr__ = _reading(list.__repr__)
+    __reduce_ex__ = _reading(NocaseList.__reduce_ex__)
+    __contains__ = _reading(NocaseList.__contains__)
+    __add__ = _reading(NocaseList.__add__)
+    __mul__ = _reading(NocaseList.__mul__)
+    __rmul__ = _reading(NocaseList.__rmul__)
+    __reversed__ = _reading(NocaseList.__reversed__)
+    __eq__ = _reading(NocaseList.__eq__)
+    __ne__ = _reading(NocaseList.__ne__)
+    __gt__ = _reading(NocaseList.__gt__)
+    __lt__ = _reading(NocaseList.__lt__)
+    __ge__ = _reading(NocaseList.__ge__)
+    __le__ = _reading(NocaseList.__le__)
+    count = _reading(NocaseList.count)
+    index = _reading(NocaseList.index)
+    case_variants = _reading(NocaseList.case_variants)
+    bloom_filter_statistics = _reading(NocaseList.bloom_filter_statistics)
+    sorted_copy = _reading(NocaseList.sorted_copy)
+    unique = _reading(NocaseList.unique)
+    casefolded_set = _reading(NocaseList.casefolded_set)
+    frozen = _reading(NocaseList.frozen)
+
+    # Methods that change the list
+    __setitem__ = _writing(NocaseList.__setitem__)
+    __delitem__ = _writing(NocaseList.__delitem__)
+    __iadd__ = _writing(NocaseList.__iadd__)
+    __imul__ = _writing(NocaseList.__imul__)
+    clear = _writing(NocaseList.clear)
+    canonicalize = _writing(NocaseList.canonicalize)
+    enable_bloom_filter = _writing(NocaseList.enable_bloom_filter)
+    disable_bloom_filter = _writing(NocaseList.disable_bloom_filter)
+    append = _writing(NocaseList.append)
+    extend = _writing(NocaseList.extend)
+    extend_parallel = _writing(NocaseList.extend_parallel)
+    insert = _writing(NocaseList.insert)
+    pop = _writing(NocaseList.pop)
+    remove = _writing(NocaseList.remove)
+    remove_all = _writing(NocaseList.remove_all)
+    discard = _writing(NocaseList.discard)
+    retain = _writing(NocaseList.retain)
+    reverse = _writing(NocaseList.reverse)
+    sort = _writing(NocaseList.sort)
+
+    # Internal methods that read or change the list for methods that do not
+    # hold the lock for their whole duration (e.g. aextend() and asort())
+    _versioned_items = _reading(NocaseList._versioned_items)
+    _extend_casefolded = _writing(NocaseList._extend_casefolded)
+    _replace_sorted = _writing(NocaseList._replace_sorted)
@@ -0,0 +1,808 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+Performance tests for the nocaselist package.
+
+The performance tests measure the time (and where relevant the memory) of
+selected operations and print the results. The results are not validated
+automatically; they are meant for comparing implementations and for detecting
+performance regressions manually.
+
+Usage:
+
+    python -m tests.perftest.perf_nocaselist [NAME ...]
+
+If no names are specified, all performance tests are run.
+"""
+
+import io
+import os
+import asyncio
+import sys
+import pickle
+import tempfile
+import threading
+import timeit
+import tracemalloc
+from unicodedata import normalize
+
+# pylint: disable=wrong-import-position, wrong-import-order, invalid-name
+from ..utils.import_installed import import_installed
+nocaselist = import_installed('nocaselist')
+from nocaselist import NocaseList, NocaseBlockList, NocaseArray, \
+    CompactNocaseList, FingerprintNocaseList, MmapNocaseList, \
+    SharedNocaseList, ConcurrentNocaseList, ThreadSafeNocaseList, \
+    NFKDCasefoldFolder  # noqa: E402
+# pylint: enable=wrong-import-position, wrong-import-order, invalid-name
+
+# The registered performance tests, by name
+PERFTESTS = {}
+
+
+def perftest(func):
+    """
+    Decorator that registers a performance test function.
+    """
+    PERFTESTS[func.__name__] = func
+    return func
+
+
+def names(size, prefix='CIM_Name'):
+    """
+    Return a list of the specified number of distinct mixed-case names.
+    """
+    return [f"{prefix}{i}" for i in range(size)]
+
+
+def report(desc, seconds, number=1):
+    """
+    Print the time per operation of a performance test.
+    """
+    print(f"  {desc:<60} {seconds / number * 1e6:12.2f} us")
+
+
+@perftest
+def perf_remove_near_end(size=100000, number=20):
+    """
+    Remove an item whose match is near the end of the list, using a value
+    with a different lexical case than the item.
+    """
+    print(f"perf_remove_near_end: {size} items")
+    ncl = NocaseList(names(size))
+    value = f"cim_name{size - 2}"
+
+    def remove():
+        ncl.remove(value)
+        ncl.insert(size - 2, value)
+
+    report("NocaseList.remove() + insert() near end",
+           timeit.timeit(remove, number=number), number)
+
+
+@perftest
+def perf_front_operations(size=1000000, number=1000):
+    """
+    Insert and pop items at the front of a large list, for NocaseList and
+    NocaseBlockList.
+    """
+    print(f"perf_front_operations: {size} items")
+    for cls in (NocaseList, NocaseBlockList):
+        lst = cls(names(size))
+
+        def front_ops(lst=lst):
+            lst.insert(0, 'CIM_Front')
+            lst.pop(0)
+
+        report(f"{cls.__name__}.insert(0) + pop(0)",
+               timeit.timeit(front_ops, number=number), number)
+
+
+class NormalizingNocaseList(NocaseList):
+    """
+    NocaseList that normalizes by overriding __casefold__(), as shown in the
+    documentation.
+    """
+
+    @staticmethod
+    def __casefold__(value):
+        return normalize('NFKD', value).casefold()
+
+
+@perftest
+def perf_normalizing_fold(size=100000, number=10):
+    """
+    Create a list, append items one by one, and look up items in a small
+    list, for the default casefold method, an overriding normalizing casefold
+    method, and the NFKDCasefoldFolder. Half of the items are not ASCII.
+    """
+    print(f"perf_normalizing_fold: {size} items")
+    items = names(size // 2) + names(size // 2, prefix='Straße_Ça_')
+    small_items = items[::size // 100]
+    lookups = [item.upper() for item in small_items] * 100
+    for desc, factory in (
+            ("NocaseList", NocaseList),
+            ("NocaseList with __casefold__ override", NormalizingNocaseList),
+            ("NocaseList with NFKDCasefoldFolder",
+             lambda items=(): NocaseList(items, folder=NFKDCasefoldFolder()))):
+
+        report(f"{desc}: create",
+               timeit.timeit(lambda f=factory: f(items), number=number),
+               number)
+
+        def append(factory=factory):
+            ncl = factory()
+            for value in items:
+                ncl.append(value)
+
+        report(f"{desc}: append",
+               timeit.timeit(append, number=number), number)
+
+        ncl = factory(small_items)
+
+        def lookup(ncl=ncl):
+            for value in lookups:
+                _ = value in ncl
+
+        report(f"{desc}: {len(lookups)} lookups in {len(ncl)} items",
+               timeit.timeit(lookup, number=number), number)
+
+
+def traced_memory(func):
+    """
+    Call the function and return its result and the memory in bytes that
+    was allocated during the call and is still allocated after it.
+    """
+    tracemalloc.start()
+    try:
+        result = func()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+class PicklingNormalizingNocaseList(NormalizingNocaseList):
+    """
+    NormalizingNocaseList that includes the casefolded items when pickled.
+    """
+    pickle_casefolded = True
+
+
+@perftest
+def perf_pickle_casefolded(size=100000, number=10):
+    """
+    Pickle and unpickle a list with an expensive casefold method, without
+    and with the casefolded items in the pickle. Half of the items are in
+    lower case, so that their casefolded items are omitted from the pickle.
+    """
+    print(f"perf_pickle_casefolded: {size} items")
+    items = names(size // 2, prefix='cim_name') + \
+        names(size // 2, prefix='Straße_Ça_')
+    for cls in (NormalizingNocaseList, PicklingNormalizingNocaseList):
+        ncl = cls(items)
+        pkl = pickle.dumps(ncl, protocol=pickle.HIGHEST_PROTOCOL)
+        print(f"  {cls.__name__ + ': pickle size':<60} "
+              f"{len(pkl) / 2**20:12.2f} MiB")
+        report(f"{cls.__name__}: dumps()",
+               timeit.timeit(lambda ncl=ncl: pickle.dumps(ncl),
+                             number=number), number)
+        report(f"{cls.__name__}: loads()",
+               timeit.timeit(lambda pkl=pkl: pickle.loads(pkl),
+                             number=number), number)
+    # For comparison, the size with all casefolded items
+    # pylint: disable=protected-access
+    pkl = pickle.dumps((list(ncl), list(ncl._casefolded_list)),
+                       protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"  {'Items and all casefolded items: pickle size':<60} "
+          f"{len(pkl) / 2**20:12.2f} MiB")
+
+
+def legacy_dumps(obj, protocol):
+    """
+    Return the pickle of a NocaseList object as created with the inherited
+    object.__reduce_ex__() method, as earlier versions of the package did.
+    """
+    file = io.BytesIO()
+    pickler = pickle.Pickler(file, protocol=protocol)
+    pickler.dispatch_table = {
+        type(obj): lambda o: object.__reduce_ex__(o, protocol)}
+    pickler.dump(obj)
+    return file.getvalue()
+
+
+@perftest
+def perf_pickle_fold_once(size=1000000, number=3):
+    """
+    Unpickle a large list that was pickled in the format of earlier versions
+    of the package (where the items are added with extend()), and in the
+    current format (where the items are in the state), with pickle protocol 4.
+    In both cases, the items should be casefolded only once.
+    """
+    print(f"perf_pickle_fold_once: {size} items")
+    ncl = NocaseList(names(size))
+    for desc, pkl in (("Earlier pickle", legacy_dumps(ncl, 4)),
+                      ("Current pickle", pickle.dumps(ncl, protocol=4))):
+        report(f"{desc}: loads()",
+               timeit.timeit(lambda pkl=pkl: pickle.loads(pkl),
+                             number=number), number)
+
+
+@perftest
+def perf_pickle_buffers(size=1000000, number=3):
+    """
+    Pickle and unpickle a large list with pickle protocol 4, where the items
+    are pickled individually, and with protocol 5, where the items are packed
+    into buffers that are passed in-band or out-of-band.
+    """
+    print(f"perf_pickle_buffers: {size} items")
+    ncl = NocaseList(names(size))
+    for desc, protocol, out_of_band in (("Protocol 4", 4, False),
+                                        ("Protocol 5", 5, False),
+                                        ("Protocol 5 out-of-band", 5, True)):
+        buffers = []
+        callback = buffers.append if out_of_band else None
+        pkl = pickle.dumps(ncl, protocol=protocol, buffer_callback=callback)
+        print(f"  {desc + ': pickle size':<60} "
+              f"{len(pkl) / 2**20:12.2f} MiB")
+        report(f"{desc}: dumps()",
+               timeit.timeit(lambda p=protocol, c=callback: pickle.dumps(
+                   ncl, protocol=p, buffer_callback=c), number=number),
+               number)
+        report(f"{desc}: loads()",
+               timeit.timeit(lambda pkl=pkl, b=buffers: pickle.loads(
+                   pkl, buffers=b), number=number),
+               number)
+
+
+@perftest
+def perf_nocasearray(size=1000000, number=1000):
+    """
+    Create a large list and look up items in it, for NocaseList and
+    NocaseArray with and without NumPy.
+    """
+    print(f"perf_nocasearray: {size} items")
+    items = names(size)
+    lookups = [f"cim_name{i}" for i in range(0, size, size // number)]
+    factories = [("NocaseList", NocaseList),
+                 ("NocaseArray (lists)",
+                  lambda items: NocaseArray(items, use_numpy=False))]
+    if NocaseArray().uses_numpy:
+        factories.append(("NocaseArray (numpy)",
+                          lambda items: NocaseArray(items, use_numpy=True)))
+    for desc, factory in factories:
+        # The memory includes the originally cased items
+        lst, size_bytes = traced_memory(lambda f=factory: f(names(size)))
+        print(f"  {desc + ': memory':<60} {size_bytes / 2**20:12.2f} MiB")
+        report(f"{desc}: create",
+               timeit.timeit(lambda f=factory: f(items), number=1))
+        # Linear lookups in NocaseList are slow, so fewer of them are measured
+        values = lookups[::100] if desc == "NocaseList" else lookups
+
+        def lookup(lst=lst, values=values):
+            for value in values:
+                _ = value in lst
+
+        report(f"{desc}: lookup", timeit.timeit(lookup, number=1),
+               len(values))
+
+
+@perftest
+def perf_compact_storage(size=1000000, number=100):
+    """
+    Measure the memory of the casefolded items and the time of lookups and
+    changes, for NocaseList, CompactNocaseList and FingerprintNocaseList.
+    """
+    print(f"perf_compact_storage: {size} items")
+    items = names(size)
+    raw_size = sum(map(len, items))
+    print(f"  {'Raw text size':<60} {raw_size / 2**20:12.2f} MiB")
+    for cls in (NocaseList, CompactNocaseList, FingerprintNocaseList):
+        # The originally cased items already exist, so the allocated memory
+        # is the list object with its item references, plus the casefolded
+        # items.
+        lst, size_bytes = traced_memory(lambda cls=cls: cls(items))
+        folded_bytes = size_bytes - sys.getsizeof(lst)
+        print(f"  {cls.__name__ + ': casefolded items memory':<60} "
+              f"{folded_bytes / 2**20:12.2f} MiB "
+              f"({folded_bytes / raw_size:.2f} x raw size)")
+
+        values = [f"CIM_NAME{i}" for i in range(0, size, size // number)]
+
+        def lookup(lst=lst, values=values):
+            for value in values:
+                lst.index(value)
+
+        report(f"{cls.__name__}: index()",
+               timeit.timeit(lookup, number=1), len(values))
+
+        def miss(lst=lst, values=values):
+            for value in values:
+                _ = value + '_' in lst
+
+        report(f"{cls.__name__}: 'in' for missing value",
+               timeit.timeit(miss, number=1), len(values))
+
+        def change(lst=lst):
+            for i in range(0, size, size // number):
+                lst[i] = 'CIM_Changed'
+                _ = lst[i + 1]
+
+        report(f"{cls.__name__}: __setitem__() + __getitem__()",
+               timeit.timeit(change, number=1), number)
+
+
+@perftest
+def perf_bloom_filter(size=1000000, number=1000):
+    """
+    Look up values that are not in a large list, and change the list, for
+    NocaseList without and with a Bloom filter.
+    """
+    print(f"perf_bloom_filter: {size} items")
+    misses = [f"CIM_Other{i}" for i in range(number)]
+    for desc, bloom in (("NocaseList", False),
+                        ("NocaseList with Bloom filter", True)):
+        ncl = NocaseList(names(size))
+        if bloom:
+            report(f"{desc}: enable_bloom_filter()",
+                   timeit.timeit(ncl.enable_bloom_filter, number=1))
+        # Linear lookups without the filter are slow, so fewer of them are
+        # measured
+        values = misses if bloom else misses[:number // 100]
+
+        def lookup(ncl=ncl, values=values):
+            for value in values:
+                _ = value in ncl
+
+        report(f"{desc}: 'in' for missing value",
+               timeit.timeit(lookup, number=1), len(values))
+
+        def change(ncl=ncl):
+            for value in misses:
+                ncl.append(value)
+                ncl.pop()
+
+        report(f"{desc}: append() + pop()",
+               timeit.timeit(change, number=1), number)
+        print(f"  {desc}: {ncl.bloom_filter_statistics()}")
+
+
+@perftest
+def perf_mmap(size=1000000, number=1000):
+    """
+    Write a large list to a file and open it as MmapNocaseList, compared to
+    creating a NocaseList, and look up items in it.
+    """
+    print(f"perf_mmap: {size} items")
+    items = names(size)
+    values = [f"cim_name{i}" for i in range(0, size, size // number)]
+    report("NocaseList: create",
+           timeit.timeit(lambda: NocaseList(items), number=1))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for hash_index in (True, False):
+            desc = "MmapNocaseList" + (" with hash index" if hash_index
+                                       else " without hash index")
+            path = os.path.join(tmp_dir, f'list{hash_index}.ncl')
+            report(f"{desc}: write()",
+                   timeit.timeit(lambda p=path, h=hash_index:
+                                 MmapNocaseList.write(p, items, hash_index=h),
+                                 number=1))
+            print(f"  {desc + ': file size':<60} "
+                  f"{os.path.getsize(path) / 2**20:12.2f} MiB")
+            report(f"{desc}: open and close",
+                   timeit.timeit(lambda p=path: MmapNocaseList(p).close(),
+                                 number=number), number)
+            with MmapNocaseList(path) as mncl:
+                # Searches without hash index are slower, so fewer of them
+                # are measured
+                lookups = values if hash_index else values[::100]
+
+                def lookup(mncl=mncl, lookups=lookups):
+                    for value in lookups:
+                        mncl.index(value)
+
+                report(f"{desc}: index()",
+                       timeit.timeit(lookup, number=1), len(lookups))
+
+                def miss(mncl=mncl, lookups=lookups):
+                    for value in lookups:
+                        _ = value + '_' in mncl
+
+                report(f"{desc}: 'in' for missing value",
+                       timeit.timeit(miss, number=1), len(lookups))
+
+
+@perftest
+def perf_shared_memory(size=1000000, number=1000):
+    """
+    Pass a large list to another process by pickling it, for NocaseList and
+    SharedNocaseList, and look up items in it.
+    """
+    print(f"perf_shared_memory: {size} items")
+    ncl = NocaseList(names(size))
+    sncl = SharedNocaseList.publish(ncl)
+    try:
+        report("SharedNocaseList: publish()",
+               timeit.timeit(lambda: SharedNocaseList.publish(ncl).unlink(),
+                             number=1))
+        values = [f"cim_name{i}" for i in range(0, size, size // number)]
+        for desc, lst in (("NocaseList", ncl), ("SharedNocaseList", sncl)):
+            pkl = pickle.dumps(lst, protocol=pickle.HIGHEST_PROTOCOL)
+            print(f"  {desc + ': pickle size':<60} {len(pkl):12} B")
+            report(f"{desc}: loads()",
+                   timeit.timeit(lambda pkl=pkl: pickle.loads(pkl),
+                                 number=1))
+            # Linear lookups in NocaseList are slow, so fewer of them are
+            # measured
+            lookups = values[::100] if desc == "NocaseList" else values
+
+            def lookup(lst=lst, lookups=lookups):
+                for value in lookups:
+                    lst.index(value)
+
+            report(f"{desc}: index()",
+                   timeit.timeit(lookup, number=1), len(lookups))
+    finally:
+        sncl.close()
+        sncl.unlink()
+
+
+@perftest
+def perf_from_file(size=1000000):
+    """
+    Create a list from the lines of a large file, by iterating over the file
+    and with NocaseList.from_file(), and show the peak memory that is
+    allocated in addition to the list.
+    """
+    print(f"perf_from_file: {size} lines")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'lines.txt')
+        with open(path, 'w', encoding='utf-8') as fp:
+            fp.writelines(f"{name}\n" for name in names(size))
+
+        def iterate():
+            with open(path, encoding='utf-8') as fp:
+                return NocaseList(line.rstrip('\n') for line in fp)
+
+        tests = (
+            ("NocaseList(line.rstrip() for line in file)", iterate),
+            ("NocaseList.from_file()", lambda: NocaseList.from_file(path)),
+            ("NocaseList.from_file(unique=True)",
+             lambda: NocaseList.from_file(path, unique=True)),
+        )
+        for desc, func in tests:
+            report(desc, timeit.timeit(func, number=1))
+            tracemalloc.start()
+            try:
+                lst = func()
+                size, peak = tracemalloc.get_traced_memory()
+                del lst
+            finally:
+                tracemalloc.stop()
+            print(f"  {desc + ': peak memory beyond the list':<60} "
+                  f"{(peak - size) / 2**20:12.2f} MiB")
+
+
+@perftest
+def perf_parallel_fold(size=1000000):
+    """
+    Create a list with an overriding normalizing casefold method, in this
+    process and with NocaseList.from_iterable() in worker processes.
+    """
+    print(f"perf_parallel_fold: {size} items, {os.cpu_count()} processors")
+    items = names(size // 2) + names(size // 2, prefix='Straße_Ça_')
+    report("NocaseList with __casefold__ override: create",
+           timeit.timeit(lambda: NormalizingNocaseList(items), number=1))
+    for workers in sorted({2, 4, os.cpu_count() or 1}):
+        report(f"NocaseList with __casefold__ override: from_iterable() "
+               f"with {workers} workers",
+               timeit.timeit(lambda w=workers: NormalizingNocaseList.
+                             from_iterable(items, workers=w), number=1))
+
+
+def run_threads(num_threads, func):
+    """
+    Call the function in the specified number of threads concurrently, and
+    return the elapsed time in seconds.
+    """
+    barrier = threading.Barrier(num_threads + 1)
+
+    def run():
+        barrier.wait()
+        func()
+
+    threads = [threading.Thread(target=run) for _ in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = timeit.default_timer()
+    for thread in threads:
+        thread.join()
+    return timeit.default_timer() - start
+
+
+@perftest
+def perf_concurrent_reads(size=10000, number=2000):
+    """
+    Look up items in a ConcurrentNocaseList in multiple threads, without and
+    with a thread that changes the list concurrently, and show the lookup
+    throughput. The throughput scales with the number of threads only on
+    free-threaded Python builds.
+    """
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)
+    print(f"perf_concurrent_reads: {size} items, "
+          f"GIL {'enabled' if is_gil_enabled() else 'disabled'}, "
+          f"{os.cpu_count()} processors")
+    cclist = ConcurrentNocaseList(names(size))
+    values = [f"cim_name{i}" for i in range(0, size, size // 100)]
+
+    def lookup():
+        for _ in range(number // len(values)):
+            for value in values:
+                _ = value in cclist
+                cclist.index(value)
+
+    for with_writer in (False, True):
+        stop = threading.Event()
+        changes = []
+
+        def write(changes=changes, stop=stop):
+            while not stop.is_set():
+                cclist.append('New_Item')
+                cclist.remove('new_item')
+                changes.append(2)
+
+        writer = threading.Thread(target=write)
+        if with_writer:
+            writer.start()
+        desc = "with a writer" if with_writer else "without writers"
+        for num_threads in (1, 2, 4, 8):
+            seconds = run_threads(num_threads, lookup)
+            lookups = num_threads * number
+            print(f"  {f'{num_threads} threads {desc}: lookups/s':<60} "
+                  f"{lookups / seconds:12.0f}")
+        stop.set()
+        if with_writer:
+            writer.join()
+            print(f"  {'Changes by the writer':<60} {sum(changes):12}")
+        assert len(cclist) == size
+
+
+@perftest
+def perf_threadsafe(size=1000, number=10000):
+    """
+    Measure the locking overhead of ThreadSafeNocaseList compared to
+    NocaseList for lookups and appends, the effect of batching appends, and
+    the lock contention of readers with a concurrent writer.
+    """
+    print(f"perf_threadsafe: {size} items")
+    items = names(size)
+    value = items[size // 2].upper()
+    for desc, cls in (("NocaseList", NocaseList),
+                      ("ThreadSafeNocaseList", ThreadSafeNocaseList)):
+        lst = cls(items)
+        report(f"{desc}: index()",
+               timeit.timeit(lambda lst=lst: lst.index(value),
+                             number=number), number)
+        report(f"{desc}: append()",
+               timeit.timeit(lambda lst=lst: lst.append('New_Item'),
+                             number=number), number)
+
+    tslist = ThreadSafeNocaseList(items)
+
+    def append_batch():
+        with tslist.batch():
+            for _ in range(number):
+                tslist.append('New_Item')
+
+    report("ThreadSafeNocaseList: append() in batch()",
+           timeit.timeit(append_batch, number=1), number)
+
+    tslist = ThreadSafeNocaseList(items)
+    stop = threading.Event()
+
+    def write():
+        while not stop.is_set():
+            with tslist.batch():
+                tslist.append('New_Item')
+                tslist.remove('new_item')
+
+    def lookup():
+        for _ in range(number // 10):
+            tslist.index(value)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    seconds = run_threads(4, lookup)
+    stop.set()
+    writer.join()
+    report("ThreadSafeNocaseList: index() in 4 threads with a writer",
+           seconds, 4 * (number // 10))
+    stats = tslist.lock_statistics()
+    print(f"  {'Lock statistics':<60} reads={stats.reads} "
+          f"writes={stats.writes} read_waits={stats.read_waits} "
+          f"write_waits={stats.write_waits} "
+          f"wait_time={stats.wait_time:.3f}s")
+
+
+@perftest
+def perf_snapshot(size=1000000, number=100):
+    """
+    Measure the time of taking an immutable view of a list with copying it,
+    compared to snapshots of NocaseBlockList and ConcurrentNocaseList, and
+    the copy-on-write cost of the first and of later changes of the
+    NocaseBlockList after a snapshot.
+    """
+    print(f"perf_snapshot: {size} items")
+    items = names(size)
+    ncl = NocaseList(items)
+    report("NocaseList: copy()",
+           timeit.timeit(ncl.copy, number=number // 10), number // 10)
+    bllist = NocaseBlockList(items)
+    report("NocaseBlockList: snapshot()",
+           timeit.timeit(bllist.snapshot, number=number), number)
+    cclist = ConcurrentNocaseList(items)
+    report("ConcurrentNocaseList: snapshot()",
+           timeit.timeit(cclist.snapshot, number=number), number)
+
+    def change_after_snapshot():
+        bllist.snapshot()
+        bllist[size // 2] = 'New_Item'
+
+    report("NocaseBlockList: snapshot() and first change",
+           timeit.timeit(change_after_snapshot, number=number), number)
+    bllist.snapshot()
+    bllist[size // 2] = 'New_Item'
+    report("NocaseBlockList: later change in the same block",
+           timeit.timeit(lambda: bllist.__setitem__(size // 2, 'Other_Item'),
+                         number=number), number)
+
+
+def max_loop_stall(coro):
+    """
+    Run the coroutine in a new event loop, together with a task that
+    measures how long the event loop was blocked at most, and return a tuple
+    of the result of the coroutine, its run time and the maximum stall time.
+    """
+
+    async def run():
+        stalls = [0.0]
+        done = asyncio.Event()
+
+        async def ticker():
+            last = timeit.default_timer()
+            while not done.is_set():
+                await asyncio.sleep(0)
+                now = timeit.default_timer()
+                stalls[0] = max(stalls[0], now - last)
+                last = now
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        start = timeit.default_timer()
+        result = await coro
+        seconds = timeit.default_timer() - start
+        done.set()
+        await task
+        return result, seconds, stalls[0]
+
+    return asyncio.run(run())
+
+
+@perftest
+def perf_async(size=1000000):
+    """
+    Measure the time and the maximum event loop stall of building and sorting
+    a list with the asynchronous methods, compared to the synchronous methods.
+    """
+    print(f"perf_async: {size} items")
+    items = names(size)
+    report("NocaseList(): build (stalls the event loop)",
+           timeit.timeit(lambda: NocaseList(items), number=1))
+    ncl, seconds, stall = max_loop_stall(NocaseList.afrom_iterable(items))
+    report("NocaseList.afrom_iterable(): build", seconds)
+    report("NocaseList.afrom_iterable(): maximum event loop stall", stall)
+
+    lst = NocaseList(reversed(items))
+    report("NocaseList.sort() (stalls the event loop)",
+           timeit.timeit(lst.sort, number=1))
+    lst = NocaseList(reversed(items))
+    _, seconds, stall = max_loop_stall(lst.asort())
+    report("NocaseList.asort()", seconds)
+    report("NocaseList.asort(): maximum event loop stall", stall)
+
+
+@perftest
+def perf_batch(size=100000, number=100000):
+    """
+    Measure the time of appending and updating items one by one, compared to
+    doing so in NocaseList.batch(), for lists without and with a Bloom filter
+    and with a casefold strategy that folds many items at once.
+    """
+    print(f"perf_batch: {size} items")
+    items = names(size)
+    new_items = names(number)
+
+    def append(ncl):
+        for value in new_items:
+            ncl.append(value)
+
+    def update(ncl):
+        for i, value in enumerate(new_items):
+            ncl[i % size] = value
+
+    def batched(func):
+
+        def run(ncl):
+            with ncl.batch():
+                func(ncl)
+
+        return run
+
+    for desc, bloom, folder in (
+            ("NocaseList", False, None),
+            ("NocaseList with Bloom filter", True, None),
+            ("NocaseList with NFKDCasefoldFolder", False,
+             NFKDCasefoldFolder())):
+        for op, func in (("append()", append), ("__setitem__()", update)):
+            for in_batch in (False, True):
+                ncl = NocaseList(items, folder=folder)
+                if bloom:
+                    ncl.enable_bloom_filter()
+                run = batched(func) if in_batch else func
+                report(f"{desc}: {op}{' in batch()' if in_batch else ''}",
+                       timeit.timeit(lambda ncl=ncl, run=run: run(ncl),
+                                     number=1), number)
+
+
+@perftest
+def perf_cached(size=100000, number=100):
+    """
+    Measure the time of deriving results from an unchanged list repeatedly,
+    with and without the cached results of NocaseList, and the time of
+    comparing unchanged lists with and without the memoized equality.
+    """
+    # pylint: disable=protected-access
+    print(f"perf_cached: {size} items")
+    items = names(size)
+    ncl = NocaseList(reversed(items))
+
+    def sorted_uncached():
+        lst = ncl.copy()
+        lst.sort()
+        return lst
+
+    report("NocaseList: copy() and sort()",
+           timeit.timeit(sorted_uncached, number=number), number)
+    report("NocaseList: sorted_copy()",
+           timeit.timeit(ncl.sorted_copy, number=number), number)
+    report("NocaseList: set of casefolded items",
+           timeit.timeit(lambda: set(ncl._casefolded_list),
+                         number=number), number)
+    report("NocaseList: casefolded_set()",
+           timeit.timeit(ncl.casefolded_set, number=number), number)
+    report("NocaseList: copy()",
+           timeit.timeit(ncl.copy, number=number), number)
+    report("NocaseList: frozen()",
+           timeit.timeit(ncl.frozen, number=number), number)
+
+    other = NocaseList(reversed(items))
+    report("NocaseList: comparing the casefolded items",
+           timeit.timeit(
+               lambda: ncl._casefolded_list == other._casefolded_list,
+               number=number), number)
+    report("NocaseList: == unchanged NocaseList",
+           timeit.timeit(lambda: ncl == other, number=number), number)
+    report("NocaseList: append() with version counter",
+           timeit.timeit(lambda: other.append('New_Item'),
+                         number=number * 1000), number * 1000)
+
+
+def main(argv):
+    """
+    Run the performance tests specified by name, or all of them.
+    """
+    for name in argv or PERFTESTS:
+        PERFTESTS[name]()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
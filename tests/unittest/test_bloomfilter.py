@@ -0,0 +1,243 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+Test the Bloom filter of the NocaseList class.
+"""
+
+
+import copy
+import pickle
+import random
+import pytest
+
+from ..utils.simplified_test_function import simplified_test_function
+
+# pylint: disable=wrong-import-position, wrong-import-order, invalid-name
+from ..utils.import_installed import import_installed
+nocaselist = import_installed('nocaselist')
+from nocaselist import NocaseList, FingerprintNocaseList, \
+    BloomFilterStatistics  # noqa: E402
+# pylint: enable=wrong-import-position, wrong-import-order, invalid-name
+
+# pylint: disable=use-dict-literal
+
+
+TESTCASES_BLOOM_FILTER_ENABLE = [
+
+    # Testcases for NocaseList.enable_bloom_filter()
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * kwargs: Keyword arguments for enable_bloom_filter().
+    #   * exp_num_hashes: Expected number of bits set for each value.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Default parameters",
+        dict(
+            kwargs=dict(),
+            exp_num_hashes=7,
+        ),
+        None, None, True
+    ),
+    (
+        "Higher false positive rate",
+        dict(
+            kwargs=dict(false_positive_rate=0.1),
+            exp_num_hashes=3,
+        ),
+        None, None, True
+    ),
+    (
+        "False positive rate of 0",
+        dict(
+            kwargs=dict(false_positive_rate=0),
+            exp_num_hashes=None,
+        ),
+        ValueError, None, True
+    ),
+    (
+        "False positive rate of 1",
+        dict(
+            kwargs=dict(false_positive_rate=1),
+            exp_num_hashes=None,
+        ),
+        ValueError, None, True
+    ),
+    (
+        "Rebuild threshold of 0",
+        dict(
+            kwargs=dict(rebuild_threshold=0),
+            exp_num_hashes=None,
+        ),
+        ValueError, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_BLOOM_FILTER_ENABLE)
+@simplified_test_function
+def test_NocaseList_enable_bloom_filter(testcase, kwargs, exp_num_hashes):
+    """
+    Test function for NocaseList.enable_bloom_filter()
+    """
+    ncl = NocaseList(['Dog', 'Cat', None, ['Budgie']])
+
+    # The code to be tested
+    ncl.enable_bloom_filter(**kwargs)
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    stats = ncl.bloom_filter_statistics()
+    assert isinstance(stats, BloomFilterStatistics)
+    assert stats.num_hashes == exp_num_hashes
+    assert stats.added == 4
+    assert stats.builds == 1
+    assert 'DOG' in ncl
+    assert None in ncl
+    assert ['BUDGIE'] in ncl
+    assert 'Eel' not in ncl
+    assert ncl.count('Eel') == 0
+    with pytest.raises(ValueError):
+        ncl.index('Eel')
+
+
+def test_NocaseList_bloom_filter_lookup():
+    """
+    Test function for lookups in a NocaseList with a Bloom filter.
+    """
+    ncl = NocaseList(f"Name{i}" for i in range(1000))
+    assert ncl.bloom_filter_statistics() is None
+    ncl.enable_bloom_filter()
+
+    for i in range(1000):
+        assert f"NAME{i}" in ncl
+        assert f"OTHER{i}" not in ncl
+
+    stats = ncl.bloom_filter_statistics()
+    assert stats.lookups == 2000
+    assert stats.rejected + stats.false_positives == 1000
+    # The false positive rate is approximate
+    assert stats.false_positives < 50
+
+    ncl.disable_bloom_filter()
+    assert ncl.bloom_filter_statistics() is None
+    assert 'NAME1' in ncl
+
+
+def test_NocaseList_bloom_filter_rebuild():
+    """
+    Test function for rebuilding the Bloom filter of a NocaseList.
+    """
+    ncl = NocaseList(['Dog'])
+    ncl.enable_bloom_filter(rebuild_threshold=0.1)
+    capacity = ncl.bloom_filter_statistics().capacity
+
+    # Adding more items than the capacity
+    ncl.extend([f"Name{i}" for i in range(capacity + 1)])
+    stats = ncl.bloom_filter_statistics()
+    assert stats.builds == 2
+    assert stats.capacity > capacity
+    capacity = stats.capacity
+
+    # Removing items until the rebuild threshold is exceeded
+    while ncl.bloom_filter_statistics().builds == 2:
+        ncl.pop()
+    assert ncl.bloom_filter_statistics().stale == 0
+    assert len(ncl) == capacity // 2 - int(capacity * 0.1) - 1
+
+    # Changing slices
+    ncl[0:2] = ['Cat']
+    assert ncl.bloom_filter_statistics().builds == 4
+    assert 'DOG' not in ncl
+    assert 'CAT' in ncl
+    ncl.clear()
+    assert ncl.bloom_filter_statistics().builds == 5
+    assert 'CAT' not in ncl
+
+
+def test_NocaseList_bloom_filter_mutations():
+    """
+    Test function that applies random changes to NocaseList objects with and
+    without a Bloom filter and compares their lookups.
+    """
+    rand = random.Random(42)
+    items = [f"Name{i}" for i in range(20)]
+    exp_ncl = NocaseList(items)
+    ncls = [NocaseList(items), FingerprintNocaseList(items)]
+    for ncl in ncls:
+        ncl.enable_bloom_filter(rebuild_threshold=0.01)
+
+    for _ in range(500):
+        value = f"NAME{rand.randint(0, 40)}"
+        index = rand.randint(0, max(len(exp_ncl) - 1, 0))
+        operation = rand.randint(0, 8)
+        for lst in ncls + [exp_ncl]:
+            if operation == 0:
+                lst.append(value)
+            elif operation == 1:
+                lst.insert(index, value)
+            elif operation == 2 and lst:
+                lst[index] = value
+            elif operation == 3 and lst:
+                del lst[index]
+            elif operation == 4:
+                lst.discard(value)
+            elif operation == 5:
+                lst.remove_all([value])
+            elif operation == 6:
+                lst += [value, value.lower()]
+            elif operation == 7:
+                del lst[index:index + 2]
+
+        for ncl in ncls:
+            assert ncl == exp_ncl
+            assert (value in ncl) == (value in exp_ncl)
+            assert ncl.count(value) == exp_ncl.count(value)
+            if value in exp_ncl:
+                assert ncl.index(value) == exp_ncl.index(value)
+
+
+def test_NocaseList_bloom_filter_copy():
+    """
+    Test function for copying and pickling a NocaseList with a Bloom filter.
+    """
+    ncl = NocaseList(['Dog', 'Cat'])
+    ncl.enable_bloom_filter(false_positive_rate=0.05)
+
+    ncl2 = pickle.loads(pickle.dumps(ncl))
+    stats = ncl2.bloom_filter_statistics()
+    assert stats.false_positive_rate == 0.05
+    assert stats.added == 2
+    assert 'DOG' in ncl2
+    assert 'Eel' not in ncl2
+
+    assert ncl.copy().bloom_filter_statistics() is None
+
+
+def test_NocaseList_bloom_filter_copy_independent():
+    """
+    Test function for changing a NocaseList with a Bloom filter and its copy
+    made with copy.copy().
+    """
+    ncl = NocaseList(['Dog'])
+    ncl.enable_bloom_filter()
+
+    ncl2 = copy.copy(ncl)
+    assert ncl2.bloom_filter_statistics() is not None
+    ncl2.append('Cat')
+    ncl.clear()
+    ncl.append('Eel')
+
+    assert 'dog' in ncl2
+    assert 'cat' in ncl2
+    assert 'eel' not in ncl2
+    assert 'eel' in ncl
+    assert 'dog' not in ncl
+    assert 'cat' not in ncl
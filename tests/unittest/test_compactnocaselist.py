@@ -0,0 +1,272 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+Test the CompactNocaseList class.
+"""
+
+
+import pickle
+import random
+import pytest
+
+from ..utils.simplified_test_function import simplified_test_function
+
+# pylint: disable=wrong-import-position, wrong-import-order, invalid-name
+from ..utils.import_installed import import_installed
+nocaselist = import_installed('nocaselist')
+from nocaselist import NocaseList, CompactNocaseList  # noqa: E402
+from nocaselist import _compactnocaselist  # noqa: E402
+# pylint: enable=wrong-import-position, wrong-import-order, invalid-name
+
+# pylint: disable=use-dict-literal
+
+
+TESTCASES_COMPACTNOCASELIST_LOOKUP = [
+
+    # Testcases for CompactNocaseList lookup methods
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * items: Items of the CompactNocaseList object to be used for the test.
+    #   * value: Value to be looked up.
+    #   * index_args: Additional positional arguments for index().
+    #   * exp_contains: Expected result of the 'in' operator.
+    #   * exp_count: Expected result of count().
+    #   * exp_index: Expected result of index(), or None for ValueError.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty list",
+        dict(
+            items=[],
+            value='Dog',
+            index_args=(),
+            exp_contains=False,
+            exp_count=0,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Value with different lexical case",
+        dict(
+            items=['Cat', 'Dog', 'Budgie', 'dog'],
+            value='DOG',
+            index_args=(),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=1,
+        ),
+        None, None, True
+    ),
+    (
+        "Value that is a part of items",
+        dict(
+            items=['Hotdog', 'Dogs'],
+            value='DOG',
+            index_args=(),
+            exp_contains=False,
+            exp_count=0,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Value that is casefolded to multiple characters",
+        dict(
+            items=['Café', 'Straße'],
+            value='STRASSE',
+            index_args=(),
+            exp_contains=True,
+            exp_count=1,
+            exp_index=1,
+        ),
+        None, None, True
+    ),
+    (
+        "Empty string value",
+        dict(
+            items=['Cat', '', 'Dog', ''],
+            value='',
+            index_args=(2,),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=3,
+        ),
+        None, None, True
+    ),
+    (
+        "Index with negative start and stop range excluding matches",
+        dict(
+            items=['Cat', 'Dog', 'Budgie', 'dog'],
+            value='DOG',
+            index_args=(-2, -1),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Value that contains a NUL character",
+        dict(
+            items=['Cat', 'Dog'],
+            value='Cat\0Dog',
+            index_args=(),
+            exp_contains=False,
+            exp_count=0,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Value that has no casefold method",
+        dict(
+            items=['Cat', 'Dog'],
+            value=42,
+            index_args=(),
+            exp_contains=None,
+            exp_count=None,
+            exp_index=None,
+        ),
+        AttributeError, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_COMPACTNOCASELIST_LOOKUP)
+@simplified_test_function
+def test_CompactNocaseList_lookup(testcase, items, value, index_args,
+                                  exp_contains, exp_count, exp_index):
+    """
+    Test function for CompactNocaseList.__contains__(), count(), index()
+    """
+    lst = CompactNocaseList(items)
+
+    # The code to be tested
+    contains = value in lst
+    count = lst.count(value)
+    if exp_index is None:
+        with pytest.raises(ValueError):
+            lst.index(value, *index_args)
+    else:
+        assert lst.index(value, *index_args) == exp_index
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    assert contains == exp_contains
+    assert count == exp_count
+
+
+def test_CompactNocaseList_items():
+    """
+    Test function for adding invalid items to a CompactNocaseList.
+    """
+    with pytest.raises(TypeError):
+        CompactNocaseList(['Dog', None])
+    with pytest.raises(TypeError):
+        CompactNocaseList(['Dog', b'Cat'])
+    with pytest.raises(ValueError):
+        CompactNocaseList(['Dog', 'Cat\0'])
+
+    # The list must be unchanged after rejecting an item
+    invalid_changes = [
+        (TypeError, lambda lst: lst.append(None)),
+        (TypeError, lambda lst: lst.append(b'Cat')),
+        (ValueError, lambda lst: lst.append('Cat\0')),
+        (TypeError, lambda lst: lst.extend(['Cat', None])),
+        (ValueError, lambda lst: lst.extend(iter(['Cat', 'a\0b']))),
+        (TypeError, lambda lst: lst.insert(0, None)),
+        (ValueError, lambda lst: lst.insert(0, '\0')),
+        (ValueError, lambda lst: lst.__setitem__(0, 'a\0b')),
+        (TypeError, lambda lst: lst.__setitem__(slice(1), ['Cat', None])),
+        (TypeError, lambda lst: lst.__iadd__([None])),
+    ]
+    for exc_type, change in invalid_changes:
+        lst = CompactNocaseList(['Dog', 'Budgie'])
+        with pytest.raises(exc_type):
+            change(lst)
+        assert list(lst) == ['Dog', 'Budgie']
+        # pylint: disable=protected-access
+        assert list(lst._casefolded_list) == ['dog', 'budgie']
+        assert lst.index('BUDGIE') == 1
+        lst.remove('budgie')
+        assert list(lst) == ['Dog']
+
+
+def test_CompactNocaseList_copy():
+    """
+    Test function for copying, pickling and comparing CompactNocaseList
+    objects.
+    """
+    items = ['Dog', 'Straße', '', 'Café']
+    lst = CompactNocaseList(items)
+
+    for other in (lst.copy(), reversed(lst), pickle.loads(pickle.dumps(lst))):
+        assert isinstance(other, CompactNocaseList)
+        assert 'STRASSE' in other
+    assert lst.copy() == lst
+    assert lst * 2 == items * 2
+    assert lst == NocaseList(items)
+    assert NocaseList(items) == lst
+    assert lst < ['dog', 'teapot']
+    assert list(lst) == items
+
+
+def test_CompactNocaseList_random(monkeypatch):
+    """
+    Test function that applies random changes to a CompactNocaseList and a
+    NocaseList and compares them, with a small distance between the marks
+    of the buffer.
+    """
+    monkeypatch.setattr(_compactnocaselist, '_MARK_STRIDE', 3)
+    rand = random.Random(42)
+    lst = CompactNocaseList()
+    exp_lst = NocaseList()
+
+    for _ in range(1000):
+        value = rand.choice(['Dog', 'CAT', '', 'Straße', 'é']) + \
+            rand.choice(['', '1', '22'])
+        index = rand.randint(-len(exp_lst) - 1, len(exp_lst))
+        operation = rand.randint(0, 6)
+        if operation == 0:
+            lst.insert(index, value)
+            exp_lst.insert(index, value)
+        elif operation == 1:
+            number = rand.randint(0, 5)
+            lst.extend([value] * number)
+            exp_lst.extend([value] * number)
+        elif operation == 2 and 0 <= index < len(exp_lst):
+            assert lst.pop(index) == exp_lst.pop(index)
+        elif operation == 3 and 0 <= index < len(exp_lst):
+            lst[index] = value
+            exp_lst[index] = value
+        elif operation == 4 and len(exp_lst) > 4:
+            del lst[1:3]
+            del exp_lst[1:3]
+        else:
+            value = value.swapcase()
+            start = rand.randint(-3, len(exp_lst))
+            assert (value in lst) == (value in exp_lst)
+            assert lst.count(value) == exp_lst.count(value)
+            try:
+                exp_index = exp_lst.index(value, start)
+            except ValueError:
+                exp_index = None
+            try:
+                index = lst.index(value, start)
+            except ValueError:
+                index = None
+            assert index == exp_index
+
+        assert lst == exp_lst
+        # pylint: disable=protected-access
+        casefolded = lst._casefolded_list
+        for i in rand.sample(range(len(exp_lst)), min(len(exp_lst), 5)):
+            assert casefolded[i] == exp_lst._casefolded_list[i]
@@ -0,0 +1,399 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+Test the ConcurrentNocaseList class.
+"""
+
+
+import pickle
+import random
+import threading
+import pytest
+
+from ..utils.simplified_test_function import simplified_test_function
+
+# pylint: disable=wrong-import-position, wrong-import-order, invalid-name
+from ..utils.import_installed import import_installed
+nocaselist = import_installed('nocaselist')
+from nocaselist import NocaseList, NocaseBlockList, ConcurrentNocaseList, \
+    LowerFolder  # noqa: E402
+# pylint: enable=wrong-import-position, wrong-import-order, invalid-name
+
+# pylint: disable=use-dict-literal
+
+
+def assert_consistent(cclist, exp_list):
+    """
+    Assert that the ConcurrentNocaseList cclist has the items in exp_list,
+    and that its casefolded items are consistent with them.
+    """
+    assert list(cclist) == list(exp_list)
+    assert len(cclist) == len(exp_list)
+    # pylint: disable=protected-access
+    values, values_cf = cclist._state
+    assert isinstance(values, tuple)
+    assert isinstance(values_cf, tuple)
+    assert list(values_cf) == [cclist._casefolded_value(v) for v in values]
+
+
+TESTCASES_CONCURRENTNOCASELIST_INIT = [
+
+    # Testcases for ConcurrentNocaseList.__init__()
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * init_args: Tuple of positional arguments to ConcurrentNocaseList().
+    #   * exp_list: Expected resulting list.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty list from no args",
+        dict(
+            init_args=(),
+            exp_list=[],
+        ),
+        None, None, True
+    ),
+    (
+        "List from iterator",
+        dict(
+            init_args=(iter(['Dog', 'Cat', 'Straße']),),
+            exp_list=['Dog', 'Cat', 'Straße'],
+        ),
+        None, None, True
+    ),
+    (
+        "List from NocaseList",
+        dict(
+            init_args=(NocaseList(['Dog', 'Cat']),),
+            exp_list=['Dog', 'Cat'],
+        ),
+        None, None, True
+    ),
+    (
+        "List from NocaseBlockList",
+        dict(
+            init_args=(NocaseBlockList(['Dog', 'Cat']),),
+            exp_list=['Dog', 'Cat'],
+        ),
+        None, None, True
+    ),
+    (
+        "List from ConcurrentNocaseList",
+        dict(
+            init_args=(ConcurrentNocaseList(['Dog', 'Cat']),),
+            exp_list=['Dog', 'Cat'],
+        ),
+        None, None, True
+    ),
+    (
+        "List from list with item that has no casefold method",
+        dict(
+            init_args=(['Dog', 42],),
+            exp_list=None,
+        ),
+        AttributeError, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_CONCURRENTNOCASELIST_INIT)
+@simplified_test_function
+def test_ConcurrentNocaseList_init(testcase, init_args, exp_list):
+    """
+    Test function for ConcurrentNocaseList.__init__()
+    """
+
+    # The code to be tested
+    cclist = ConcurrentNocaseList(*init_args)
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    assert_consistent(cclist, exp_list)
+
+
+TESTCASES_CONCURRENTNOCASELIST_LOOKUP = [
+
+    # Testcases for ConcurrentNocaseList lookup methods
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * items: Items of the ConcurrentNocaseList object to be used for the
+    #     test.
+    #   * value: Value to be looked up.
+    #   * index_args: Additional positional arguments for index().
+    #   * exp_contains: Expected result of the 'in' operator.
+    #   * exp_count: Expected result of count().
+    #   * exp_index: Expected result of index(), or None for ValueError.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty list",
+        dict(
+            items=[],
+            value='Dog',
+            index_args=(),
+            exp_contains=False,
+            exp_count=0,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Value with different lexical case",
+        dict(
+            items=['Cat', 'Dog', 'Budgie', 'dog'],
+            value='DOG',
+            index_args=(),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=1,
+        ),
+        None, None, True
+    ),
+    (
+        "Index with start range beyond first match",
+        dict(
+            items=['Cat', 'Dog', 'Budgie', 'dog'],
+            value='DOG',
+            index_args=(2,),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=3,
+        ),
+        None, None, True
+    ),
+    (
+        "Index with negative start and stop range excluding matches",
+        dict(
+            items=['Cat', 'Dog', 'Budgie', 'dog'],
+            value='DOG',
+            index_args=(-2, -1),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Value that has no casefold method",
+        dict(
+            items=['Cat', 'Dog'],
+            value=42,
+            index_args=(),
+            exp_contains=None,
+            exp_count=None,
+            exp_index=None,
+        ),
+        AttributeError, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_CONCURRENTNOCASELIST_LOOKUP)
+@simplified_test_function
+def test_ConcurrentNocaseList_lookup(testcase, items, value, index_args,
+                                     exp_contains, exp_count, exp_index):
+    """
+    Test function for ConcurrentNocaseList.__contains__(), count(), index()
+    """
+    cclist = ConcurrentNocaseList(items)
+
+    # The code to be tested
+    contains = value in cclist
+    count = cclist.count(value)
+    if exp_index is None:
+        with pytest.raises(ValueError):
+            cclist.index(value, *index_args)
+    else:
+        assert cclist.index(value, *index_args) == exp_index
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    assert contains == exp_contains
+    assert count == exp_count
+
+
+def test_ConcurrentNocaseList_random_operations():
+    """
+    Test function for a random sequence of operations on a
+    ConcurrentNocaseList, compared against a NocaseList.
+    """
+    rand = random.Random(42)
+    cclist = ConcurrentNocaseList()
+    ncl = NocaseList()
+    for _ in range(1000):
+        value = rand.choice(['Dog', 'CAT', 'budgie']) + str(rand.randint(0, 3))
+        op = rand.randint(0, 6)
+        if op == 0:
+            index = rand.randint(-len(ncl) - 2, len(ncl) + 2)
+            cclist.insert(index, value)
+            ncl.insert(index, value)
+        elif op == 1:
+            cclist.append(value)
+            ncl.append(value)
+        elif op == 2 and ncl:
+            index = rand.randint(-len(ncl), len(ncl) - 1)
+            assert cclist.pop(index) == ncl.pop(index)
+        elif op == 3 and ncl:
+            index = rand.randint(0, len(ncl) - 1)
+            cclist[index] = value
+            ncl[index] = value
+        elif op == 4:
+            cclist.extend([value, value.upper()])
+            ncl.extend([value, value.upper()])
+        elif op == 5:
+            cclist.discard(value)
+            ncl.discard(value)
+        else:
+            value = value.swapcase()
+            assert (value in cclist) == (value in ncl)
+            assert cclist.count(value) == ncl.count(value)
+            if value in ncl:
+                assert cclist.index(value) == ncl.index(value)
+        assert_consistent(cclist, ncl)
+    assert cclist == ncl
+
+
+def test_ConcurrentNocaseList_bulk_operations():
+    """
+    Test function for ConcurrentNocaseList methods that operate on all
+    items.
+    """
+    items = ['Dog', 'cat', 'Budgie', 'DOG', 'Cat', 'kitten']
+    cclist = ConcurrentNocaseList(items)
+
+    assert cclist == NocaseList(items)
+    assert cclist == [item.upper() for item in items]
+    assert cclist != items[1:]
+    assert cclist < ['eel']
+    assert cclist > ['cat']
+    assert cclist[1:3] == ['cat', 'Budgie']
+    assert cclist[-1] == 'kitten'
+    assert repr(cclist) == repr(items)
+    with pytest.raises(IndexError):
+        _ = cclist[6]
+
+    assert_consistent(cclist + ['Eel'], items + ['Eel'])
+    assert_consistent(cclist * 2, items * 2)
+    assert_consistent(reversed(cclist), list(reversed(items)))
+    with pytest.raises(TypeError):
+        _ = cclist + {'Eel'}
+
+    sorted_list = cclist.copy()
+    sorted_list.sort()
+    assert_consistent(
+        sorted_list, ['Budgie', 'cat', 'Cat', 'Dog', 'DOG', 'kitten'])
+    sorted_list.reverse()
+    assert_consistent(
+        sorted_list, ['kitten', 'DOG', 'Dog', 'Cat', 'cat', 'Budgie'])
+
+    groups = cclist.case_variants()
+    assert groups['dog'].positions == [0, 3]
+
+    canon = cclist.copy()
+    assert canon.canonicalize() == 2
+    assert_consistent(canon, ['Dog', 'cat', 'Budgie', 'Dog', 'cat', 'kitten'])
+
+    pruned = cclist.copy()
+    assert pruned.remove_all(['DOG', 'Eel']) == 2
+    assert_consistent(pruned, ['cat', 'Budgie', 'Cat', 'kitten'])
+    assert pruned.retain(lambda v: v[0].islower()) == 2
+    assert_consistent(pruned, ['cat', 'kitten'])
+    pruned.remove('KITTEN')
+    assert_consistent(pruned, ['cat'])
+    with pytest.raises(ValueError):
+        pruned.remove('kitten')
+
+    del cclist[1:4]
+    assert_consistent(cclist, ['Dog', 'Cat', 'kitten'])
+    cclist[0:1] = ['Eel', 'Fish']
+    assert_consistent(cclist, ['Eel', 'Fish', 'Cat', 'kitten'])
+    cclist *= 2
+    assert len(cclist) == 8
+    cclist.clear()
+    assert_consistent(cclist, [])
+
+    cclist = ConcurrentNocaseList(['Straße'], folder=LowerFolder())
+    assert cclist.folder == LowerFolder()
+    assert 'STRAßE' in cclist
+    assert 'STRASSE' not in cclist
+
+
+def test_ConcurrentNocaseList_pickle():
+    """
+    Test function for pickling and unpickling ConcurrentNocaseList objects.
+    """
+    cclist = ConcurrentNocaseList(['Dog', 'cat', 'Straße'],
+                                  folder=LowerFolder())
+
+    cclist2 = pickle.loads(pickle.dumps(cclist))
+
+    assert isinstance(cclist2, ConcurrentNocaseList)
+    assert cclist2.folder == LowerFolder()
+    assert_consistent(cclist2, cclist)
+    cclist2.append('Eel')
+    assert len(cclist) == 3
+
+
+def test_ConcurrentNocaseList_threads():
+    """
+    Test function for reading and changing a ConcurrentNocaseList in
+    multiple threads concurrently.
+    """
+    cclist = ConcurrentNocaseList(f"Item{i}" for i in range(100))
+    num_writers = 4
+    num_changes = 200
+    errors = []
+    done = threading.Event()
+
+    def writer(writer_id):
+        try:
+            for i in range(num_changes):
+                cclist.append(f"Writer{writer_id}_{i}")
+                cclist.remove(f"WRITER{writer_id}_{i}")
+                cclist.append(f"Kept{writer_id}_{i}")
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+
+    def reader():
+        try:
+            while not done.is_set():
+                assert 'ITEM50' in cclist
+                assert cclist.index('item99') == 99
+                items = list(cclist)
+                assert items[:100] == [f"Item{i}" for i in range(100)]
+                assert len(items) <= 100 + num_writers * num_changes + 1
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    writers = [threading.Thread(target=writer, args=(i,))
+               for i in range(num_writers)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert len(cclist) == 100 + num_writers * num_changes
+    assert not any(item.startswith('Writer') for item in cclist)
+    for writer_id in range(num_writers):
+        assert cclist.count(f"kept{writer_id}_0") == 1
+    assert_consistent(cclist, list(cclist))
@@ -0,0 +1,288 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+Test the FingerprintNocaseList class.
+"""
+
+
+import pickle
+import random
+import pytest
+
+from ..utils.simplified_test_function import simplified_test_function
+
+# pylint: disable=wrong-import-position, wrong-import-order, invalid-name
+from ..utils.import_installed import import_installed
+nocaselist = import_installed('nocaselist')
+from nocaselist import NocaseList, FingerprintNocaseList, \
+    AsciiLowerFolder  # noqa: E402
+from nocaselist import _fingerprintnocaselist  # noqa: E402
+# pylint: enable=wrong-import-position, wrong-import-order, invalid-name
+
+# pylint: disable=use-dict-literal
+
+
+TESTCASES_FINGERPRINTNOCASELIST_LOOKUP = [
+
+    # Testcases for FingerprintNocaseList lookup methods
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * items: Items of the FingerprintNocaseList object to be used for the
+    #     test.
+    #   * value: Value to be looked up.
+    #   * index_args: Additional positional arguments for index().
+    #   * exp_contains: Expected result of the 'in' operator.
+    #   * exp_count: Expected result of count().
+    #   * exp_index: Expected result of index(), or None for ValueError.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty list",
+        dict(
+            items=[],
+            value='Dog',
+            index_args=(),
+            exp_contains=False,
+            exp_count=0,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Value with different lexical case",
+        dict(
+            items=['Cat', 'Dog', 'Budgie', 'dog'],
+            value='DOG',
+            index_args=(),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=1,
+        ),
+        None, None, True
+    ),
+    (
+        "Value that is casefolded to multiple characters",
+        dict(
+            items=['Café', 'Straße'],
+            value='STRASSE',
+            index_args=(),
+            exp_contains=True,
+            exp_count=1,
+            exp_index=1,
+        ),
+        None, None, True
+    ),
+    (
+        "Index with negative start and stop range excluding matches",
+        dict(
+            items=['Cat', 'Dog', 'Budgie', 'dog'],
+            value='DOG',
+            index_args=(-2, -1),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "None, byte string and nested list items",
+        dict(
+            items=[None, b'Dog', ['Cat', 'DOG'], 'Dog'],
+            value=['CAT', 'dog'],
+            index_args=(),
+            exp_contains=True,
+            exp_count=1,
+            exp_index=2,
+        ),
+        None, None, True
+    ),
+    (
+        "Tuple value for a list item",
+        dict(
+            items=['Cat', ['Cat', 'Dog']],
+            value=('CAT', 'dog'),
+            index_args=(),
+            exp_contains=True,
+            exp_count=1,
+            exp_index=1,
+        ),
+        None, None, True
+    ),
+    (
+        "Value that has no casefold method",
+        dict(
+            items=['Cat', 'Dog'],
+            value=42,
+            index_args=(),
+            exp_contains=None,
+            exp_count=None,
+            exp_index=None,
+        ),
+        AttributeError, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_FINGERPRINTNOCASELIST_LOOKUP)
+@simplified_test_function
+def test_FingerprintNocaseList_lookup(testcase, items, value, index_args,
+                                      exp_contains, exp_count, exp_index):
+    """
+    Test function for FingerprintNocaseList.__contains__(), count(), index()
+    """
+    lst = FingerprintNocaseList(items)
+
+    # The code to be tested
+    contains = value in lst
+    count = lst.count(value)
+    if exp_index is None:
+        with pytest.raises(ValueError):
+            lst.index(value, *index_args)
+    else:
+        assert lst.index(value, *index_args) == exp_index
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    assert contains == exp_contains
+    assert count == exp_count
+
+
+def test_FingerprintNocaseList_collisions(monkeypatch):
+    """
+    Test function for FingerprintNocaseList when all casefolded values have
+    the same fingerprint.
+    """
+    monkeypatch.setattr(_fingerprintnocaselist, '_fingerprint',
+                        lambda value_cf: 0)
+    lst = FingerprintNocaseList(['Cat', 'Dog', 'Budgie', 'dog'])
+
+    assert 'DOG' in lst
+    assert 'Eel' not in lst
+    assert lst.count('DOG') == 2
+    assert lst.index('DOG', 2) == 3
+    with pytest.raises(ValueError):
+        lst.index('Eel')
+    lst.remove('DOG')
+    assert lst == ['cat', 'budgie', 'dog']
+
+
+def test_FingerprintNocaseList_copy():
+    """
+    Test function for copying, pickling and comparing FingerprintNocaseList
+    objects.
+    """
+    items = ['Dog', 'Straße', None, 'Café']
+    lst = FingerprintNocaseList(items, folder=AsciiLowerFolder())
+
+    for other in (lst.copy(), reversed(lst), pickle.loads(pickle.dumps(lst))):
+        assert isinstance(other, FingerprintNocaseList)
+        assert other.folder == AsciiLowerFolder()
+        assert 'STRAßE' in other
+        assert 'STRASSE' not in other
+    assert lst.copy() == lst
+    assert lst != FingerprintNocaseList(items[:3])
+    assert lst == NocaseList(items, folder=AsciiLowerFolder())
+    assert lst < ['dog', 'teapot']
+    assert list(lst) == items
+
+
+def test_FingerprintNocaseList_random():
+    """
+    Test function that applies random changes to a FingerprintNocaseList and
+    a NocaseList and compares them.
+    """
+    rand = random.Random(42)
+    lst = FingerprintNocaseList()
+    exp_lst = NocaseList()
+
+    for _ in range(1000):
+        value = rand.choice(['Dog', 'CAT', '', 'Straße', 'é']) + \
+            rand.choice(['', '1', '22']) if rand.random() < 0.9 else None
+        index = rand.randint(-len(exp_lst) - 1, len(exp_lst))
+        operation = rand.randint(0, 7)
+        if operation == 0:
+            lst.insert(index, value)
+            exp_lst.insert(index, value)
+        elif operation == 1:
+            number = rand.randint(0, 5)
+            lst.extend([value] * number)
+            exp_lst.extend([value] * number)
+        elif operation == 2 and 0 <= index < len(exp_lst):
+            assert lst.pop(index) == exp_lst.pop(index)
+        elif operation == 3 and 0 <= index < len(exp_lst):
+            lst[index] = value
+            exp_lst[index] = value
+        elif operation == 4 and len(exp_lst) > 4:
+            lst[1:3] = ['Eel']
+            exp_lst[1:3] = ['Eel']
+        elif operation == 5 and value is not None:
+            assert lst.remove_all([value]) == exp_lst.remove_all([value])
+        elif value is not None:
+            value = value.swapcase()
+            start = rand.randint(-3, len(exp_lst))
+            assert (value in lst) == (value in exp_lst)
+            assert lst.count(value) == exp_lst.count(value)
+            try:
+                exp_index = exp_lst.index(value, start)
+            except ValueError:
+                exp_index = None
+            try:
+                index = lst.index(value, start)
+            except ValueError:
+                index = None
+            assert index == exp_index
+
+        assert lst == exp_lst
+        # pylint: disable=protected-access
+        assert len(lst._casefolded_list) == len(exp_lst)
+
+
+def test_FingerprintNocaseList_batch():
+    """
+    Test function that applies random changes to a FingerprintNocaseList in
+    batches, and to a NocaseList without batches, and compares them.
+    """
+    rand = random.Random(46)
+    lst = FingerprintNocaseList(['Dog', 'cat'])
+    exp_lst = NocaseList(['Dog', 'cat'])
+
+    for _ in range(200):
+        with lst.batch():
+            for _ in range(rand.randint(1, 8)):
+                value = rand.choice(['Dog', 'CAT', 'Straße', 'é']) + \
+                    rand.choice(['', '1', '22'])
+                operation = rand.randint(0, 6)
+                if operation == 0:
+                    lst.append(value)
+                    exp_lst.append(value)
+                elif operation == 1:
+                    lst.extend([value, value.upper()])
+                    exp_lst.extend([value, value.upper()])
+                elif operation == 2 and exp_lst:
+                    index = rand.randint(0, len(exp_lst) - 1)
+                    lst[index] = value
+                    exp_lst[index] = value
+                elif operation == 3:
+                    assert lst.retain(lambda v, x=value: v != x) == \
+                        exp_lst.retain(lambda v, x=value: v != x)
+                elif operation == 4:
+                    assert lst.remove_all([value]) == \
+                        exp_lst.remove_all([value])
+                elif operation == 5:
+                    assert lst.canonicalize() == exp_lst.canonicalize()
+                else:
+                    lst.discard(value)
+                    exp_lst.discard(value)
+
+        assert list(lst) == list(exp_lst)
+        # pylint: disable=protected-access
+        assert len(lst._casefolded_list) == len(exp_lst)
+        for value in exp_lst:
+            assert lst.index(value) == exp_lst.index(value)
@@ -0,0 +1,254 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+Test the casefold strategy classes (folders) and their use in NocaseList.
+"""
+
+
+import pickle
+import unicodedata
+import pytest
+
+from ..utils.simplified_test_function import simplified_test_function
+
+# pylint: disable=wrong-import-position, wrong-import-order, invalid-name
+from ..utils.import_installed import import_installed
+nocaselist = import_installed('nocaselist')
+from nocaselist import NocaseList, NocaseBlockList, NocaseDeque, \
+    ConcurrentNocaseList, Folder, CasefoldFolder, LowerFolder, AsciiLowerFolder, \
+    NFKDCasefoldFolder  # noqa: E402
+# pylint: enable=wrong-import-position, wrong-import-order, invalid-name
+
+# pylint: disable=use-dict-literal
+
+
+TESTCASES_FOLDER_FOLD = [
+
+    # Testcases for Folder.fold() and Folder.fold_many()
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * folder: Folder object to be tested.
+    #   * values: List of input values.
+    #   * exp_values: List of expected casefolded values.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "CasefoldFolder with unicode strings",
+        dict(
+            folder=CasefoldFolder(),
+            values=['Dog', 'Straße', 'ΑΣ', ''],
+            exp_values=['dog', 'strasse', 'ασ', ''],
+        ),
+        None, None, True
+    ),
+    (
+        "CasefoldFolder with mixed unicode and byte strings",
+        dict(
+            folder=CasefoldFolder(),
+            values=['Dog', b'Cat'],
+            exp_values=['dog', b'cat'],
+        ),
+        None, None, True
+    ),
+    (
+        "CasefoldFolder with string containing the separator character",
+        dict(
+            folder=CasefoldFolder(),
+            values=['Dog\0Cat', 'Budgie'],
+            exp_values=['dog\0cat', 'budgie'],
+        ),
+        None, None, True
+    ),
+    (
+        "LowerFolder with unicode strings, including final sigma",
+        dict(
+            folder=LowerFolder(),
+            values=['Dog', 'Straße', 'ΑΣ', 'Σ'],
+            exp_values=['dog', 'straße', 'ας', 'σ'],
+        ),
+        None, None, True
+    ),
+    (
+        "AsciiLowerFolder with ASCII and non-ASCII strings",
+        dict(
+            folder=AsciiLowerFolder(),
+            values=['Dog', 'ÄPFEL', b'Cat'],
+            exp_values=['dog', 'Äpfel', b'cat'],
+        ),
+        None, None, True
+    ),
+    (
+        "NFKDCasefoldFolder with composed and decomposed strings",
+        dict(
+            folder=NFKDCasefoldFolder(),
+            values=['Café', 'CAFÉ', 'ﬁle', b'Cat'],
+            exp_values=['café', 'café', 'file', b'cat'],
+        ),
+        None, None, True
+    ),
+    (
+        "CasefoldFolder with value that has no casefold method",
+        dict(
+            folder=CasefoldFolder(),
+            values=['Dog', 42],
+            exp_values=None,
+        ),
+        AttributeError, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_FOLDER_FOLD)
+@simplified_test_function
+def test_Folder_fold(testcase, folder, values, exp_values):
+    """
+    Test function for Folder.fold() and Folder.fold_many()
+    """
+
+    # The code to be tested
+    values_many = folder.fold_many(values)
+    values_single = [folder.fold(value) for value in values]
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    assert values_many == exp_values
+    assert values_single == exp_values
+
+
+def test_Folder_eq():
+    """
+    Test function for comparing folders.
+    """
+    assert CasefoldFolder() == CasefoldFolder()
+    assert CasefoldFolder() != LowerFolder()
+    assert len({CasefoldFolder(), CasefoldFolder(), LowerFolder()}) == 2
+
+
+def test_Folder_abstract():
+    """
+    Test function for creating folders that do not implement fold().
+    """
+
+    class NoFoldFolder(Folder):
+        """Folder that does not implement fold()"""
+        bulk = True
+
+    with pytest.raises(TypeError):
+        Folder()
+    with pytest.raises(TypeError):
+        NoFoldFolder()
+
+
+def test_NFKDCasefoldFolder_cache():
+    """
+    Test function for the result cache of NFKDCasefoldFolder.
+    """
+    folder = NFKDCasefoldFolder(cache_size=2)
+    # pylint: disable=protected-access
+
+    assert folder.fold('DOG') == 'dog'
+    assert folder._cache == {}  # ASCII strings are not cached
+
+    assert folder.fold('Ça') == 'c\u0327a'
+    assert folder.fold('Ça') == 'c\u0327a'
+    assert folder.fold('ÇB') == 'c\u0327b'
+    assert len(folder._cache) == 2
+    assert folder.fold('ÇC') == 'c\u0327c'
+    assert len(folder._cache) <= 2
+
+    assert folder == NFKDCasefoldFolder(cache_size=100)
+    assert pickle.loads(pickle.dumps(folder))._cache == {}
+
+    folder = NFKDCasefoldFolder(cache_size=0)
+    assert folder.fold('Ça') == 'c\u0327a'
+    assert folder._cache == {}
+
+
+def test_NocaseList_folder():
+    """
+    Test function for NocaseList with a folder.
+    """
+    ncl = NocaseList(['Dog', 'ÄPFEL', None, ['Cat']],
+                     folder=AsciiLowerFolder())
+
+    assert ncl.folder == AsciiLowerFolder()
+    assert 'DOG' in ncl
+    assert 'äpfel' not in ncl
+    assert ncl.index('Äpfel') == 1
+    assert ncl.index(['CAT']) == 3
+    assert ncl == ['dog', 'ÄPFEL', None, ['cat']]
+    assert ncl != ['dog', 'äpfel', None, ['cat']]
+
+    ncl.extend(['Budgie'])
+    ncl[0] = 'Kitten'
+    assert ncl.count('KITTEN') == 1
+    # pylint: disable=protected-access
+    assert ncl._casefolded_list == ['kitten', 'Äpfel', None, ['cat'], 'budgie']
+
+    for lst in (ncl.copy(), ncl * 2, reversed(ncl), NocaseList(ncl),
+                pickle.loads(pickle.dumps(ncl))):
+        assert lst.folder == AsciiLowerFolder()
+        assert 'äpfel' not in lst
+
+    assert NocaseList().folder is None
+    assert NocaseList(ncl, folder=CasefoldFolder()).count('äpfel') == 1
+
+
+def test_NocaseList_folder_compare():
+    """
+    Test function for comparing NocaseList objects with different folders.
+    """
+    ncl1 = NocaseList(['Straße'], folder=LowerFolder())
+    ncl2 = NocaseList(['STRASSE'], folder=CasefoldFolder())
+
+    assert ncl1 != ncl2
+    assert ncl2 == ncl1
+    assert ncl2 == NocaseList(['Strasse'])
+
+
+def test_siblings_folder():
+    """
+    Test function for NocaseBlockList and NocaseDeque with a folder.
+    """
+    folder = AsciiLowerFolder()
+    bllist = NocaseBlockList(['Dog', 'ÄPFEL'], folder=folder)
+    ncdeque = NocaseDeque(['Dog', 'ÄPFEL'], 5, folder=folder)
+
+    for obj in (bllist, bllist.copy(), pickle.loads(pickle.dumps(bllist)),
+                NocaseBlockList(NocaseList(['Dog', 'ÄPFEL'], folder=folder)),
+                ncdeque, ncdeque.copy(), pickle.loads(pickle.dumps(ncdeque))):
+        assert obj.folder == folder
+        assert 'DOG' in obj
+        assert 'äpfel' not in obj
+
+
+class NFKDNocaseList(NocaseList):
+    """NocaseList with a normalizing __casefold__() method"""
+
+    @staticmethod
+    def __casefold__(value):
+        return unicodedata.normalize('NFKD', value).casefold()
+
+
+def test_siblings_casefold_method():
+    """
+    Test function for creating lists and deques from a NocaseList whose
+    __casefold__() method is overridden, which must not use its casefolded
+    items.
+    """
+    nfkd_list = NFKDNocaseList(['Ç', 'Dog'])
+    for obj in (NocaseList(nfkd_list), NocaseBlockList(nfkd_list),
+                ConcurrentNocaseList(nfkd_list), NocaseDeque(nfkd_list)):
+        assert 'Ç' in obj
+        assert 'DOG' in obj
+        assert 'C\u0327' not in obj
+    assert 'C\u0327' in NFKDNocaseList(nfkd_list)
+    assert NocaseList(['ç', 'dog']) == nfkd_list
+    assert NocaseBlockList(['ç', 'dog']) == nfkd_list
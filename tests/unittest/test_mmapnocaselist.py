@@ -0,0 +1,322 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+Test the MmapNocaseList class.
+"""
+
+
+import os
+import pickle
+import random
+import tempfile
+import pytest
+
+from ..utils.simplified_test_function import simplified_test_function
+
+# pylint: disable=wrong-import-position, wrong-import-order, invalid-name
+from ..utils.import_installed import import_installed
+nocaselist = import_installed('nocaselist')
+from nocaselist import NocaseList, NocaseArray, MmapNocaseList, Folder, \
+    CasefoldFolder, LowerFolder, NFKDCasefoldFolder  # noqa: E402
+# pylint: enable=wrong-import-position, wrong-import-order, invalid-name
+
+# pylint: disable=use-dict-literal
+
+
+TESTCASES_MMAPNOCASELIST_LOOKUP = [
+
+    # Testcases for MmapNocaseList lookup methods
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * items: Items of the MmapNocaseList object to be used for the test.
+    #   * value: Value to be looked up.
+    #   * index_args: Additional positional arguments for index().
+    #   * exp_contains: Expected result of the 'in' operator.
+    #   * exp_count: Expected result of count().
+    #   * exp_index: Expected result of index(), or None for ValueError.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty list",
+        dict(
+            items=[],
+            value='Dog',
+            index_args=(),
+            exp_contains=False,
+            exp_count=0,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Value with different lexical case",
+        dict(
+            items=['Cat', 'Dog', 'Budgie', 'dog'],
+            value='DOG',
+            index_args=(),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=1,
+        ),
+        None, None, True
+    ),
+    (
+        "Value that is part of other items",
+        dict(
+            items=['Doge', 'Do', 'gDog', 'Dogdog'],
+            value='dog',
+            index_args=(),
+            exp_contains=False,
+            exp_count=0,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Value that is casefolded to multiple characters",
+        dict(
+            items=['Café', 'Straße'],
+            value='STRASSE',
+            index_args=(),
+            exp_contains=True,
+            exp_count=1,
+            exp_index=1,
+        ),
+        None, None, True
+    ),
+    (
+        "Empty value and empty items",
+        dict(
+            items=['', 'Dog', '', '', 'Cat'],
+            value='',
+            index_args=(1,),
+            exp_contains=True,
+            exp_count=3,
+            exp_index=2,
+        ),
+        None, None, True
+    ),
+    (
+        "Value after empty items",
+        dict(
+            items=['', '', 'Dog', '', 'dog'],
+            value='DOG',
+            index_args=(3,),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=4,
+        ),
+        None, None, True
+    ),
+    (
+        "Items with NUL characters and lone surrogates",
+        dict(
+            items=['Dog\0', '\0', 'C\0at', '\ud800Eel'],
+            value='\ud800eel',
+            index_args=(),
+            exp_contains=True,
+            exp_count=1,
+            exp_index=3,
+        ),
+        None, None, True
+    ),
+    (
+        "Index with negative start and stop range excluding matches",
+        dict(
+            items=['Cat', 'Dog', 'Budgie', 'dog'],
+            value='DOG',
+            index_args=(-2, -1),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Value that has no casefold method",
+        dict(
+            items=['Cat', 'Dog'],
+            value=None,
+            index_args=(),
+            exp_contains=None,
+            exp_count=None,
+            exp_index=None,
+        ),
+        AttributeError, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_MMAPNOCASELIST_LOOKUP)
+@simplified_test_function
+def test_MmapNocaseList_lookup(testcase, items, value, index_args,
+                               exp_contains, exp_count, exp_index):
+    """
+    Test function for MmapNocaseList.__contains__(), count(), index(), with
+    and without hash index.
+    """
+    for hash_index in (True, False):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'list.ncl')
+            MmapNocaseList.write(path, items, hash_index=hash_index)
+            with MmapNocaseList(path) as mncl:
+                assert mncl.has_hash_index == hash_index
+
+                # The code to be tested
+                contains = value in mncl
+                count = mncl.count(value)
+                if exp_index is None:
+                    with pytest.raises(ValueError):
+                        mncl.index(value, *index_args)
+                else:
+                    assert mncl.index(value, *index_args) == exp_index
+
+        # Ensure that exceptions raised in the remainder of this function
+        # are not mistaken as expected exceptions
+        assert testcase.exp_exc_types is None
+
+        assert contains == exp_contains
+        assert count == exp_count
+
+
+def test_MmapNocaseList_access(tmp_path):
+    """
+    Test function for accessing MmapNocaseList items and converting them.
+    """
+    items = ['Dog', 'cat', 'Straße', 'DOG']
+    path = tmp_path / 'list.ncl'
+    MmapNocaseList.write(path, NocaseList(items))
+
+    mncl = MmapNocaseList(path)
+    assert mncl.folder == CasefoldFolder()
+    assert mncl.path == str(path)
+    assert len(mncl) == 4
+    assert list(mncl) == items
+    assert mncl[0] == 'Dog'
+    assert mncl[-1] == 'DOG'
+    assert mncl[1:3] == ['cat', 'Straße']
+    assert repr(mncl) == f"MmapNocaseList({items!r})"
+    with pytest.raises(IndexError):
+        _ = mncl[4]
+
+    ncl = mncl.to_list()
+    assert isinstance(ncl, NocaseList)
+    assert ncl == items
+    assert ncl.folder == CasefoldFolder()
+    assert ncl.count('dog') == 2
+    assert 'STRASSE' in ncl
+
+    mncl2 = pickle.loads(pickle.dumps(mncl))
+    assert list(mncl2) == items
+    assert mncl2.count('dog') == 2
+    mncl2.close()
+    mncl.close()
+
+
+def test_MmapNocaseList_compare(tmp_path):
+    """
+    Test function for comparing MmapNocaseList objects with other lists.
+    """
+    items = ['Dog', 'cat', 'Straße']
+    path = tmp_path / 'list.ncl'
+    MmapNocaseList.write(path, NocaseList(items))
+
+    with MmapNocaseList(path) as mncl:
+        assert mncl == ['DOG', 'Cat', 'STRASSE']
+        assert ['DOG', 'Cat', 'STRASSE'] == mncl
+        assert mncl == NocaseList(['dog', 'CAT', 'strasse'])
+        assert NocaseList(['dog', 'CAT', 'strasse']) == mncl
+        assert mncl == NocaseArray(items)
+        assert mncl != ['Dog', 'cat']
+        assert ['Dog', 'cat'] != mncl
+        assert mncl < ['EEL']
+        assert mncl <= ['DOG', 'CAT', 'STRASSE']
+        assert mncl > ['DOG']
+        assert mncl >= ['DOG', 'CAT', 'STRASSE']
+        assert not mncl == 42
+        with pytest.raises(TypeError):
+            _ = mncl < 42
+
+        MmapNocaseList.write(tmp_path / 'copy.ncl', items[::-1])
+        with MmapNocaseList(tmp_path / 'copy.ncl') as mncl2:
+            assert mncl != mncl2
+            assert mncl < mncl2
+            assert mncl == mncl2[::-1]
+
+
+def test_MmapNocaseList_write(tmp_path):
+    """
+    Test function for writing MmapNocaseList files from other objects, and
+    for the folder of the files.
+    """
+    path = tmp_path / 'list.ncl'
+
+    MmapNocaseList.write(path, NocaseList(['Straße'], folder=LowerFolder()))
+    with MmapNocaseList(path) as mncl:
+        assert mncl.folder == LowerFolder()
+        assert 'STRAßE' in mncl
+        assert 'STRASSE' not in mncl
+        MmapNocaseList.write(tmp_path / 'copy.ncl', mncl)
+    with MmapNocaseList(tmp_path / 'copy.ncl') as mncl:
+        assert mncl.folder == LowerFolder()
+        assert 'STRASSE' not in mncl
+
+    MmapNocaseList.write(path, NocaseArray(['Straße']),
+                         folder=NFKDCasefoldFolder())
+    with MmapNocaseList(path, folder=NFKDCasefoldFolder(100)) as mncl:
+        assert 'STRASSE' in mncl
+    with pytest.raises(ValueError):
+        MmapNocaseList(path, folder=CasefoldFolder())
+
+    class UpperFolder(Folder):
+        """Folder that is not defined in the nocaselist package"""
+
+        def fold(self, value):
+            return value.upper()
+
+    MmapNocaseList.write(path, ['Straße'], folder=UpperFolder())
+    with pytest.raises(ValueError):
+        MmapNocaseList(path)
+    with MmapNocaseList(path, folder=UpperFolder()) as mncl:
+        assert 'strasse' in mncl
+
+    with pytest.raises(TypeError):
+        MmapNocaseList.write(path, ['Dog', None])
+
+    path.write_bytes(b'Some other file' * 10)
+    with pytest.raises(ValueError):
+        MmapNocaseList(path)
+
+
+def test_MmapNocaseList_random(tmp_path):
+    """
+    Test function that looks up random values in a MmapNocaseList and a
+    NocaseList and compares the results.
+    """
+    rand = random.Random(42)
+    items = [rand.choice(['Dog', 'CAT', '', 'Straße', 'é']) +
+             rand.choice(['', '1', '22']) for _ in range(300)]
+    exp_ncl = NocaseList(items)
+    path = tmp_path / 'list.ncl'
+    MmapNocaseList.write(path, exp_ncl)
+
+    with MmapNocaseList(path) as mncl:
+        for _ in range(300):
+            value = rand.choice(items).swapcase()
+            start = rand.randint(-3, len(items))
+            assert (value in mncl) == (value in exp_ncl)
+            assert mncl.count(value) == exp_ncl.count(value)
+            try:
+                exp_index = exp_ncl.index(value, start)
+            except ValueError:
+                exp_index = None
+            try:
+                index = mncl.index(value, start)
+            except ValueError:
+                index = None
+            assert index == exp_index
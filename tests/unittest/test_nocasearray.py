@@ -0,0 +1,219 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+Test the NocaseArray class.
+"""
+
+
+import pickle
+import pytest
+
+from ..utils.simplified_test_function import simplified_test_function
+
+# pylint: disable=wrong-import-position, wrong-import-order, invalid-name
+from ..utils.import_installed import import_installed
+nocaselist = import_installed('nocaselist')
+from nocaselist import NocaseList, NocaseArray, CasefoldFolder, \
+    LowerFolder  # noqa: E402
+# pylint: enable=wrong-import-position, wrong-import-order, invalid-name
+
+try:
+    import numpy  # noqa: F401 pylint: disable=unused-import
+    HAVE_NUMPY = True
+except ImportError:
+    HAVE_NUMPY = False
+
+# pylint: disable=use-dict-literal
+
+# The storage modes to be tested
+USE_NUMPY_MODES = [False, True] if HAVE_NUMPY else [False]
+
+
+TESTCASES_NOCASEARRAY_LOOKUP = [
+
+    # Testcases for NocaseArray lookup methods
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * items: Items of the NocaseArray object to be used for the test.
+    #   * value: Value to be looked up.
+    #   * index_args: Additional positional arguments for index().
+    #   * exp_contains: Expected result of the 'in' operator.
+    #   * exp_count: Expected result of count().
+    #   * exp_index: Expected result of index(), or None for ValueError.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty array",
+        dict(
+            items=[],
+            value='Dog',
+            index_args=(),
+            exp_contains=False,
+            exp_count=0,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Value with different lexical case",
+        dict(
+            items=['Cat', 'Dog', 'Budgie', 'dog'],
+            value='DOG',
+            index_args=(),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=1,
+        ),
+        None, None, True
+    ),
+    (
+        "Value that is casefolded to multiple characters",
+        dict(
+            items=['Cat', 'Straße'],
+            value='STRASSE',
+            index_args=(),
+            exp_contains=True,
+            exp_count=1,
+            exp_index=1,
+        ),
+        None, None, True
+    ),
+    (
+        "Index with start range beyond first match",
+        dict(
+            items=['Cat', 'Dog', 'Budgie', 'dog'],
+            value='DOG',
+            index_args=(2,),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=3,
+        ),
+        None, None, True
+    ),
+    (
+        "Index with negative start and stop range excluding matches",
+        dict(
+            items=['Cat', 'Dog', 'Budgie', 'dog'],
+            value='DOG',
+            index_args=(-2, -1),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Non-existing value",
+        dict(
+            items=['Cat', 'Dog'],
+            value='Eel',
+            index_args=(),
+            exp_contains=False,
+            exp_count=0,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Value that has no casefold method",
+        dict(
+            items=['Cat', 'Dog'],
+            value=42,
+            index_args=(),
+            exp_contains=None,
+            exp_count=None,
+            exp_index=None,
+        ),
+        AttributeError, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_NOCASEARRAY_LOOKUP)
+@simplified_test_function
+def test_NocaseArray_lookup(testcase, items, value, index_args,
+                            exp_contains, exp_count, exp_index):
+    """
+    Test function for NocaseArray.__contains__(), count(), index()
+    """
+    for use_numpy in USE_NUMPY_MODES:
+        nca = NocaseArray(items, use_numpy=use_numpy)
+
+        # The code to be tested
+        contains = value in nca
+        count = nca.count(value)
+        if exp_index is None:
+            with pytest.raises(ValueError):
+                nca.index(value, *index_args)
+        else:
+            assert nca.index(value, *index_args) == exp_index
+
+        # Ensure that exceptions raised in the remainder of this function
+        # are not mistaken as expected exceptions
+        assert testcase.exp_exc_types is None
+
+        assert contains == exp_contains
+        assert count == exp_count
+
+
+@pytest.mark.parametrize("use_numpy", USE_NUMPY_MODES)
+def test_NocaseArray_access(use_numpy):
+    """
+    Test function for accessing NocaseArray items and converting them.
+    """
+    items = ['Dog', 'cat', 'Budgie', 'DOG']
+    nca = NocaseArray(items, use_numpy=use_numpy)
+
+    assert nca.uses_numpy == use_numpy
+    assert nca.folder == CasefoldFolder()
+    assert len(nca) == 4
+    assert list(nca) == items
+    assert nca[0] == 'Dog'
+    assert nca[-1] == 'DOG'
+    assert isinstance(nca[0], str)
+    assert list(nca[1:3]) == ['cat', 'Budgie']
+    assert nca[1:3].count('CAT') == 1
+    assert repr(nca) == f"NocaseArray({items!r})"
+    with pytest.raises(IndexError):
+        _ = nca[4]
+
+    assert list(nca.isin(['dog', 'Eel', 'BUDGIE'])) == [True, False, True]
+    assert list(NocaseArray(use_numpy=use_numpy).isin(['dog'])) == [False]
+
+    ncl = nca.to_list()
+    assert isinstance(ncl, NocaseList)
+    assert ncl == items
+    assert ncl.folder == CasefoldFolder()
+    assert ncl.count('dog') == 2
+
+    nca2 = pickle.loads(pickle.dumps(nca))
+    assert list(nca2) == items
+    assert nca2.count('dog') == 2
+
+
+@pytest.mark.parametrize("use_numpy", USE_NUMPY_MODES)
+def test_NocaseArray_init(use_numpy):
+    """
+    Test function for creating NocaseArray objects from other objects.
+    """
+    ncl = NocaseList(['Dog', 'Straße'])
+    nca = NocaseArray(ncl, use_numpy=use_numpy)
+    assert 'strasse' in nca
+    assert nca.folder == CasefoldFolder()
+
+    nca = NocaseArray(NocaseList(['Straße'], folder=LowerFolder()),
+                      use_numpy=use_numpy)
+    assert 'strasse' not in nca
+    assert 'STRASSE' not in NocaseArray(nca, use_numpy=use_numpy)
+    assert 'STRASSE' in NocaseArray(nca, folder=CasefoldFolder(),
+                                    use_numpy=use_numpy)
+
+    with pytest.raises(TypeError):
+        NocaseArray(['Dog', None], use_numpy=use_numpy)
+    with pytest.raises(TypeError):
+        NocaseArray(['Dog', b'Cat'], use_numpy=use_numpy)
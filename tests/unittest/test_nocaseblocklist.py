@@ -0,0 +1,332 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+Test the NocaseBlockList class.
+"""
+
+
+import pickle
+import random
+import pytest
+
+from ..utils.simplified_test_function import simplified_test_function
+
+# pylint: disable=wrong-import-position, wrong-import-order, invalid-name
+from ..utils.import_installed import import_installed
+nocaselist = import_installed('nocaselist')
+from nocaselist import NocaseList, NocaseBlockList  # noqa: E402
+# pylint: enable=wrong-import-position, wrong-import-order, invalid-name
+
+# pylint: disable=use-dict-literal
+
+
+class SmallBlockList(NocaseBlockList):
+    """NocaseBlockList with a small block size, to exercise block handling"""
+    block_size = 4
+
+
+def assert_consistent(bllist, exp_list):
+    """
+    Assert that the NocaseBlockList bllist has the items in exp_list, and
+    that its internal blocks are consistent.
+    """
+    assert list(bllist) == list(exp_list)
+    assert len(bllist) == len(exp_list)
+    # pylint: disable=protected-access
+    assert [len(b) for b in bllist._blocks] == \
+        [len(b) for b in bllist._casefolded_blocks]
+    assert all(bllist._blocks)
+    assert all(len(b) <= bllist.block_size for b in bllist._blocks)
+    for value, value_cf in zip(bllist, bllist._items()[1]):
+        assert bllist.__casefold__(value) == value_cf
+
+
+TESTCASES_NOCASEBLOCKLIST_INIT = [
+
+    # Testcases for NocaseBlockList.__init__()
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * init_args: Tuple of positional arguments to NocaseBlockList().
+    #   * exp_list: Expected resulting list.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty list from no args",
+        dict(
+            init_args=(),
+            exp_list=[],
+        ),
+        None, None, True
+    ),
+    (
+        "List from list spanning multiple blocks",
+        dict(
+            init_args=(['Dog', 'Cat', 'Budgie', 'Kitten', 'Bird', 'Fish'],),
+            exp_list=['Dog', 'Cat', 'Budgie', 'Kitten', 'Bird', 'Fish'],
+        ),
+        None, None, True
+    ),
+    (
+        "List from NocaseList",
+        dict(
+            init_args=(NocaseList(['Dog', 'Cat']),),
+            exp_list=['Dog', 'Cat'],
+        ),
+        None, None, True
+    ),
+    (
+        "List from NocaseBlockList",
+        dict(
+            init_args=(SmallBlockList(['Dog', 'Cat']),),
+            exp_list=['Dog', 'Cat'],
+        ),
+        None, None, True
+    ),
+    (
+        "List from list with item that has no casefold method",
+        dict(
+            init_args=(['Dog', 42],),
+            exp_list=None,
+        ),
+        AttributeError, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_NOCASEBLOCKLIST_INIT)
+@simplified_test_function
+def test_NocaseBlockList_init(testcase, init_args, exp_list):
+    """
+    Test function for NocaseBlockList.__init__()
+    """
+
+    # The code to be tested
+    bllist = SmallBlockList(*init_args)
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    assert_consistent(bllist, exp_list)
+
+
+TESTCASES_NOCASEBLOCKLIST_LOOKUP = [
+
+    # Testcases for NocaseBlockList lookup methods
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * items: Items of the NocaseBlockList object to be used for the test.
+    #   * value: Value to be looked up.
+    #   * index_args: Additional positional arguments for index().
+    #   * exp_contains: Expected result of the 'in' operator.
+    #   * exp_count: Expected result of count().
+    #   * exp_index: Expected result of index(), or None for ValueError.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty list",
+        dict(
+            items=[],
+            value='Dog',
+            index_args=(),
+            exp_contains=False,
+            exp_count=0,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Value in a later block, with different lexical case",
+        dict(
+            items=['a', 'b', 'c', 'd', 'e', 'Dog', 'f', 'dog'],
+            value='DOG',
+            index_args=(),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=5,
+        ),
+        None, None, True
+    ),
+    (
+        "Index with start range beyond first match",
+        dict(
+            items=['a', 'b', 'c', 'd', 'e', 'Dog', 'f', 'dog'],
+            value='DOG',
+            index_args=(6,),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=7,
+        ),
+        None, None, True
+    ),
+    (
+        "Index with negative start and stop range excluding matches",
+        dict(
+            items=['a', 'b', 'c', 'd', 'e', 'Dog', 'f', 'dog'],
+            value='DOG',
+            index_args=(-8, -3),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_NOCASEBLOCKLIST_LOOKUP)
+@simplified_test_function
+def test_NocaseBlockList_lookup(testcase, items, value, index_args,
+                                exp_contains, exp_count, exp_index):
+    """
+    Test function for NocaseBlockList.__contains__(), count(), index()
+    """
+    bllist = SmallBlockList(items)
+
+    # The code to be tested
+    contains = value in bllist
+    count = bllist.count(value)
+    if exp_index is None:
+        with pytest.raises(ValueError):
+            bllist.index(value, *index_args)
+    else:
+        assert bllist.index(value, *index_args) == exp_index
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    assert contains == exp_contains
+    assert count == exp_count
+
+
+def test_NocaseBlockList_front_operations():
+    """
+    Test function for insertions and deletions at the front of a
+    NocaseBlockList that spans many blocks.
+    """
+    bllist = SmallBlockList()
+    exp_list = []
+    for i in range(50):
+        bllist.insert(0, f"Item{i}")
+        exp_list.insert(0, f"Item{i}")
+    assert_consistent(bllist, exp_list)
+
+    for _ in range(20):
+        assert bllist.pop(0) == exp_list.pop(0)
+        del bllist[0]
+        del exp_list[0]
+    assert_consistent(bllist, exp_list)
+
+    bllist.remove('ITEM0')
+    exp_list.remove('Item0')
+    assert_consistent(bllist, exp_list)
+
+
+def test_NocaseBlockList_random_operations():
+    """
+    Test function for a random sequence of operations on a NocaseBlockList,
+    compared against a NocaseList.
+    """
+    rand = random.Random(42)
+    bllist = SmallBlockList()
+    ncl = NocaseList()
+    for _ in range(2000):
+        value = rand.choice(['Dog', 'CAT', 'budgie']) + str(rand.randint(0, 3))
+        op = rand.randint(0, 5)
+        if op == 0:
+            index = rand.randint(-len(ncl) - 2, len(ncl) + 2)
+            bllist.insert(index, value)
+            ncl.insert(index, value)
+        elif op == 1:
+            bllist.append(value)
+            ncl.append(value)
+        elif op == 2 and ncl:
+            index = rand.randint(-len(ncl), len(ncl) - 1)
+            assert bllist.pop(index) == ncl.pop(index)
+        elif op == 3 and ncl:
+            index = rand.randint(0, len(ncl) - 1)
+            bllist[index] = value
+            ncl[index] = value
+        elif op == 4:
+            bllist.extend([value, value.upper()])
+            ncl.extend([value, value.upper()])
+        else:
+            value = value.swapcase()
+            assert (value in bllist) == (value in ncl)
+            assert bllist.count(value) == ncl.count(value)
+            if value in ncl:
+                assert bllist.index(value) == ncl.index(value)
+        assert_consistent(bllist, ncl)
+    assert bllist == ncl
+
+
+def test_NocaseBlockList_bulk_operations():
+    """
+    Test function for NocaseBlockList methods that operate on all items.
+    """
+    items = ['Dog', 'cat', 'Budgie', 'DOG', 'Cat', 'kitten']
+    bllist = SmallBlockList(items)
+
+    assert bllist == NocaseList(items)
+    assert bllist == [item.upper() for item in items]
+    assert bllist != items[1:]
+    assert bllist < ['eel']
+    assert bllist > ['cat']
+    assert bllist[1:3] == ['cat', 'Budgie']
+    assert repr(bllist) == repr(items)
+
+    assert_consistent(bllist + ['Eel'], items + ['Eel'])
+    assert_consistent(bllist * 2, items * 2)
+    assert_consistent(reversed(bllist), list(reversed(items)))
+
+    sorted_list = bllist.copy()
+    sorted_list.sort()
+    assert_consistent(
+        sorted_list, ['Budgie', 'cat', 'Cat', 'Dog', 'DOG', 'kitten'])
+
+    groups = bllist.case_variants()
+    assert groups['dog'].positions == [0, 3]
+
+    canon = bllist.copy()
+    assert canon.canonicalize() == 2
+    assert_consistent(canon, ['Dog', 'cat', 'Budgie', 'Dog', 'cat', 'kitten'])
+
+    pruned = bllist.copy()
+    assert pruned.remove_all(['DOG', 'Eel']) == 2
+    assert_consistent(pruned, ['cat', 'Budgie', 'Cat', 'kitten'])
+    assert pruned.retain(lambda v: v[0].islower()) == 2
+    assert_consistent(pruned, ['cat', 'kitten'])
+
+    del bllist[1:4]
+    assert_consistent(bllist, ['Dog', 'Cat', 'kitten'])
+    bllist[0:1] = ['Eel', 'Fish']
+    assert_consistent(bllist, ['Eel', 'Fish', 'Cat', 'kitten'])
+    bllist[1:3] = (value for value in ['Gnu', 'HEN'])
+    assert_consistent(bllist, ['Eel', 'Gnu', 'HEN', 'kitten'])
+    assert 'hen' in bllist
+    bllist.clear()
+    assert_consistent(bllist, [])
+
+
+def test_NocaseBlockList_pickle():
+    """
+    Test function for pickling and unpickling NocaseBlockList objects.
+    """
+    bllist = SmallBlockList(['Dog', 'cat', 'Budgie', 'Kitten', 'Bird'])
+
+    bllist2 = pickle.loads(pickle.dumps(bllist))
+
+    assert isinstance(bllist2, SmallBlockList)
+    assert_consistent(bllist2, bllist)
@@ -0,0 +1,414 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+Test the NocaseDeque class.
+"""
+
+
+import pickle
+from collections import deque
+import pytest
+
+from ..utils.simplified_test_function import simplified_test_function
+
+# pylint: disable=wrong-import-position, wrong-import-order, invalid-name
+from ..utils.import_installed import import_installed
+nocaselist = import_installed('nocaselist')
+from nocaselist import NocaseList, NocaseDeque  # noqa: E402
+# pylint: enable=wrong-import-position, wrong-import-order, invalid-name
+
+# pylint: disable=use-dict-literal
+
+
+def assert_consistent(ncdeque, exp_items, exp_maxlen=None):
+    """
+    Assert that the NocaseDeque ncdeque has the items in exp_items, and that
+    its internal casefolded deque is consistent.
+    """
+    assert list(ncdeque) == list(exp_items)
+    assert ncdeque.maxlen == exp_maxlen
+    # pylint: disable=protected-access
+    ncdeque_cf = ncdeque._casefolded_deque
+    assert ncdeque_cf.maxlen == exp_maxlen
+    assert len(ncdeque_cf) == len(ncdeque)
+    for value, value_cf in zip(ncdeque, ncdeque_cf):
+        assert ncdeque.__casefold__(value) == value_cf
+
+
+TESTCASES_NOCASEDEQUE_INIT = [
+
+    # Testcases for NocaseDeque.__init__()
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * init_args: Tuple of positional arguments to NocaseDeque().
+    #   * exp_items: Expected resulting items.
+    #   * exp_maxlen: Expected maxlen.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty deque from no args",
+        dict(
+            init_args=(),
+            exp_items=[],
+            exp_maxlen=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Deque from list",
+        dict(
+            init_args=(['Dog', b'Cat'],),
+            exp_items=['Dog', b'Cat'],
+            exp_maxlen=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Bounded deque from longer list keeps the last items",
+        dict(
+            init_args=(['Dog', 'Cat', 'Budgie'], 2),
+            exp_items=['Cat', 'Budgie'],
+            exp_maxlen=2,
+        ),
+        None, None, True
+    ),
+    (
+        "Bounded deque from NocaseList",
+        dict(
+            init_args=(NocaseList(['Dog', 'Cat', 'Budgie']), 2),
+            exp_items=['Cat', 'Budgie'],
+            exp_maxlen=2,
+        ),
+        None, None, True
+    ),
+    (
+        "Bounded deque from NocaseDeque",
+        dict(
+            init_args=(NocaseDeque(['Dog', 'Cat', 'Budgie']), 2),
+            exp_items=['Cat', 'Budgie'],
+            exp_maxlen=2,
+        ),
+        None, None, True
+    ),
+    (
+        "Deque from list with item that has no casefold method",
+        dict(
+            init_args=(['Dog', 42],),
+            exp_items=None,
+            exp_maxlen=None,
+        ),
+        AttributeError, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_NOCASEDEQUE_INIT)
+@simplified_test_function
+def test_NocaseDeque_init(testcase, init_args, exp_items, exp_maxlen):
+    """
+    Test function for NocaseDeque.__init__()
+    """
+
+    # The code to be tested
+    ncdeque = NocaseDeque(*init_args)
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    assert_consistent(ncdeque, exp_items, exp_maxlen)
+
+
+TESTCASES_NOCASEDEQUE_MUTATE = [
+
+    # Testcases for mutating NocaseDeque methods
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * init_args: Tuple of positional arguments to NocaseDeque().
+    #   * method: Name of the method to be called.
+    #   * args: Positional arguments for the method.
+    #   * exp_result: Expected return value of the method.
+    #   * exp_items: Expected items after the method call.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "append to unbounded deque",
+        dict(
+            init_args=(['Dog'],),
+            method='append',
+            args=('Cat',),
+            exp_result=None,
+            exp_items=['Dog', 'Cat'],
+        ),
+        None, None, True
+    ),
+    (
+        "append to full bounded deque discards leftmost item",
+        dict(
+            init_args=(['Dog', 'Cat'], 2),
+            method='append',
+            args=('Budgie',),
+            exp_result=None,
+            exp_items=['Cat', 'Budgie'],
+        ),
+        None, None, True
+    ),
+    (
+        "appendleft to full bounded deque discards rightmost item",
+        dict(
+            init_args=(['Dog', 'Cat'], 2),
+            method='appendleft',
+            args=('Budgie',),
+            exp_result=None,
+            exp_items=['Budgie', 'Dog'],
+        ),
+        None, None, True
+    ),
+    (
+        "extend full bounded deque",
+        dict(
+            init_args=(['Dog', 'Cat'], 3),
+            method='extend',
+            args=(['Budgie', 'Kitten'],),
+            exp_result=None,
+            exp_items=['Cat', 'Budgie', 'Kitten'],
+        ),
+        None, None, True
+    ),
+    (
+        "extendleft",
+        dict(
+            init_args=(['Dog'],),
+            method='extendleft',
+            args=(['Cat', 'Budgie'],),
+            exp_result=None,
+            exp_items=['Budgie', 'Cat', 'Dog'],
+        ),
+        None, None, True
+    ),
+    (
+        "pop",
+        dict(
+            init_args=(['Dog', 'Cat'],),
+            method='pop',
+            args=(),
+            exp_result='Cat',
+            exp_items=['Dog'],
+        ),
+        None, None, True
+    ),
+    (
+        "popleft",
+        dict(
+            init_args=(['Dog', 'Cat'],),
+            method='popleft',
+            args=(),
+            exp_result='Dog',
+            exp_items=['Cat'],
+        ),
+        None, None, True
+    ),
+    (
+        "popleft from empty deque",
+        dict(
+            init_args=(),
+            method='popleft',
+            args=(),
+            exp_result=None,
+            exp_items=None,
+        ),
+        IndexError, None, True
+    ),
+    (
+        "rotate right",
+        dict(
+            init_args=(['Dog', 'Cat', 'Budgie'],),
+            method='rotate',
+            args=(1,),
+            exp_result=None,
+            exp_items=['Budgie', 'Dog', 'Cat'],
+        ),
+        None, None, True
+    ),
+    (
+        "rotate left",
+        dict(
+            init_args=(['Dog', 'Cat', 'Budgie'],),
+            method='rotate',
+            args=(-1,),
+            exp_result=None,
+            exp_items=['Cat', 'Budgie', 'Dog'],
+        ),
+        None, None, True
+    ),
+    (
+        "remove with different lexical case",
+        dict(
+            init_args=(['Dog', 'Cat', 'cat'],),
+            method='remove',
+            args=('CAT',),
+            exp_result=None,
+            exp_items=['Dog', 'cat'],
+        ),
+        None, None, True
+    ),
+    (
+        "remove non-existing value",
+        dict(
+            init_args=(['Dog'],),
+            method='remove',
+            args=('Cat',),
+            exp_result=None,
+            exp_items=None,
+        ),
+        ValueError, None, True
+    ),
+    (
+        "insert into full bounded deque",
+        dict(
+            init_args=(['Dog'], 1),
+            method='insert',
+            args=(0, 'Cat'),
+            exp_result=None,
+            exp_items=None,
+        ),
+        IndexError, None, True
+    ),
+    (
+        "insert",
+        dict(
+            init_args=(['Dog', 'Cat'],),
+            method='insert',
+            args=(1, 'Budgie'),
+            exp_result=None,
+            exp_items=['Dog', 'Budgie', 'Cat'],
+        ),
+        None, None, True
+    ),
+    (
+        "reverse",
+        dict(
+            init_args=(['Dog', 'Cat'],),
+            method='reverse',
+            args=(),
+            exp_result=None,
+            exp_items=['Cat', 'Dog'],
+        ),
+        None, None, True
+    ),
+    (
+        "clear",
+        dict(
+            init_args=(['Dog', 'Cat'],),
+            method='clear',
+            args=(),
+            exp_result=None,
+            exp_items=[],
+        ),
+        None, None, True
+    ),
+    (
+        "__setitem__",
+        dict(
+            init_args=(['Dog', 'Cat'],),
+            method='__setitem__',
+            args=(1, 'BUDGIE'),
+            exp_result=None,
+            exp_items=['Dog', 'BUDGIE'],
+        ),
+        None, None, True
+    ),
+    (
+        "__delitem__",
+        dict(
+            init_args=(['Dog', 'Cat'],),
+            method='__delitem__',
+            args=(0,),
+            exp_result=None,
+            exp_items=['Cat'],
+        ),
+        None, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_NOCASEDEQUE_MUTATE)
+@simplified_test_function
+def test_NocaseDeque_mutate(testcase, init_args, method, args, exp_result,
+                            exp_items):
+    """
+    Test function for mutating NocaseDeque methods
+    """
+    ncdeque = NocaseDeque(*init_args)
+
+    # The code to be tested
+    result = getattr(ncdeque, method)(*args)
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    assert result == exp_result
+    assert_consistent(ncdeque, exp_items, ncdeque.maxlen)
+
+
+def test_NocaseDeque_lookup():
+    """
+    Test function for case-insensitive lookups in NocaseDeque.
+    """
+    ncdeque = NocaseDeque(['Dog', 'Cat', 'DOG'])
+
+    assert 'dog' in ncdeque
+    assert 'Budgie' not in ncdeque
+    assert ncdeque.count('dOg') == 2
+    assert ncdeque.index('DOG') == 0
+    assert ncdeque.index('DOG', 1) == 2
+    with pytest.raises(ValueError):
+        ncdeque.index('Budgie')
+
+
+def test_NocaseDeque_operators():
+    """
+    Test function for NocaseDeque operators.
+    """
+    ncdeque = NocaseDeque(['Dog', 'Cat'], 3)
+
+    assert ncdeque == ['DOG', 'cat']
+    assert ncdeque == NocaseList(['dog', 'CAT'])
+    assert ncdeque != deque(['Dog', 'Cat'], 3) + deque(['Budgie'])
+    assert ncdeque < ['eel']
+    assert ncdeque > ['cat']
+
+    assert_consistent(ncdeque + deque(['Budgie', 'Kitten']),
+                      ['Cat', 'Budgie', 'Kitten'], 3)
+    assert_consistent(ncdeque * 2, ['Cat', 'Dog', 'Cat'], 3)
+    assert_consistent(ncdeque.copy(), ['Dog', 'Cat'], 3)
+
+    ncdeque += ['Budgie', 'Kitten']
+    assert_consistent(ncdeque, ['Cat', 'Budgie', 'Kitten'], 3)
+
+    with pytest.raises(TypeError):
+        _ = ncdeque + ['Budgie']
+
+
+def test_NocaseDeque_pickle():
+    """
+    Test function for pickling and unpickling NocaseDeque objects.
+    """
+    ncdeque = NocaseDeque(['Dog', 'cat', 'Budgie'], 5)
+
+    ncdeque2 = pickle.loads(pickle.dumps(ncdeque))
+
+    assert isinstance(ncdeque2, NocaseDeque)
+    assert_consistent(ncdeque2, ncdeque, 5)
@@ -5,9 +5,12 @@ Test the NocaseList class.
 
 
 import os
+import asyncio
+import io
 import re
 import unicodedata
 import pickle
+import tempfile
 import pytest
 
 from ..utils.simplified_test_function import simplified_test_function
@@ -2773,6 +2776,24 @@ TESTCASES_NOCASELIST_REMOVE = [
         ),
         ValueError, None, True
     ),
+    (
+        "List with two items, remove second with different lexical case",
+        dict(
+            nclist=NocaseList(['Dog', 'Cat']),
+            args=('CAT',),
+            exp_nclist=NocaseList(['Dog']),
+        ),
+        None, None, not TEST_AGAINST_LIST
+    ),
+    (
+        "List with case variants, remove first occurrence near the end",
+        dict(
+            nclist=NocaseList(['Dog', 'Budgie', 'Kitten', 'cat', 'CAT']),
+            args=('Cat',),
+            exp_nclist=NocaseList(['Dog', 'Budgie', 'Kitten', 'CAT']),
+        ),
+        None, None, not TEST_AGAINST_LIST
+    ),
 ]
 
 
@@ -2800,6 +2821,238 @@ def test_NocaseList_remove(testcase, nclist, args, exp_nclist):
     assert_equal(nclist_copy, exp_nclist)
 
 
+TESTCASES_NOCASELIST_REMOVE_ALL = [
+
+    # Testcases for NocaseList.remove_all()
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * nclist: NocaseList object to be used for the test.
+    #   * values: Iterable of values to be removed.
+    #   * exp_result: Expected number of removed items.
+    #   * exp_nclist: Expected NocaseList after being updated.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty list, remove some values (do not exist)",
+        dict(
+            nclist=NocaseList(),
+            values=['Cat'],
+            exp_result=0,
+            exp_nclist=[],
+        ),
+        None, None, not TEST_AGAINST_LIST
+    ),
+    (
+        "List with items, remove no values",
+        dict(
+            nclist=NocaseList(['Dog', 'Cat']),
+            values=[],
+            exp_result=0,
+            exp_nclist=['Dog', 'Cat'],
+        ),
+        None, None, not TEST_AGAINST_LIST
+    ),
+    (
+        "List with duplicates, remove all occurrences of two values",
+        dict(
+            nclist=NocaseList(['Dog', 'Cat', 'dog', 'Budgie', 'CAT']),
+            values=('DOG', 'cat', 'Kitten'),
+            exp_result=4,
+            exp_nclist=['Budgie'],
+        ),
+        None, None, not TEST_AGAINST_LIST
+    ),
+    (
+        "List with list items, remove list value",
+        dict(
+            nclist=NocaseList([['Dog', 'Cat'], 'Dog']),
+            values=[('dog', 'cat')],
+            exp_result=1,
+            exp_nclist=['Dog'],
+        ),
+        None, None, not TEST_AGAINST_LIST
+    ),
+    (
+        "Remove value that has no casefold method",
+        dict(
+            nclist=NocaseList(['Dog']),
+            values=[42],
+            exp_result=None,
+            exp_nclist=None,
+        ),
+        AttributeError, None, not TEST_AGAINST_LIST
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_NOCASELIST_REMOVE_ALL)
+@simplified_test_function
+def test_NocaseList_remove_all(testcase, nclist, values, exp_result,
+                               exp_nclist):
+    """
+    Test function for NocaseList.remove_all()
+    """
+
+    # Don't change the testcase data, but a copy
+    nclist_copy = NocaseList(nclist)
+
+    # The code to be tested
+    result = nclist_copy.remove_all(values)
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    assert result == exp_result
+    assert_equal(nclist_copy, exp_nclist)
+
+
+TESTCASES_NOCASELIST_DISCARD = [
+
+    # Testcases for NocaseList.discard()
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * nclist: NocaseList object to be used for the test.
+    #   * value: Value to be discarded.
+    #   * exp_nclist: Expected NocaseList after being updated.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty list, discard some value (does not exist)",
+        dict(
+            nclist=NocaseList(),
+            value='Cat',
+            exp_nclist=[],
+        ),
+        None, None, not TEST_AGAINST_LIST
+    ),
+    (
+        "List with duplicates, discard first occurrence",
+        dict(
+            nclist=NocaseList(['Dog', 'Cat', 'dog']),
+            value='DOG',
+            exp_nclist=['Cat', 'dog'],
+        ),
+        None, None, not TEST_AGAINST_LIST
+    ),
+    (
+        "List with two items, discard non-existing",
+        dict(
+            nclist=NocaseList(['Dog', 'Cat']),
+            value='Kitten',
+            exp_nclist=['Dog', 'Cat'],
+        ),
+        None, None, not TEST_AGAINST_LIST
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_NOCASELIST_DISCARD)
+@simplified_test_function
+def test_NocaseList_discard(testcase, nclist, value, exp_nclist):
+    """
+    Test function for NocaseList.discard()
+    """
+
+    # Don't change the testcase data, but a copy
+    nclist_copy = NocaseList(nclist)
+
+    # The code to be tested
+    # pylint: disable=assignment-from-no-return
+    result = nclist_copy.discard(value)
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    assert result is None
+    assert_equal(nclist_copy, exp_nclist)
+
+
+TESTCASES_NOCASELIST_RETAIN = [
+
+    # Testcases for NocaseList.retain()
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * nclist: NocaseList object to be used for the test.
+    #   * predicate: Predicate function.
+    #   * exp_result: Expected number of removed items.
+    #   * exp_nclist: Expected NocaseList after being updated.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty list",
+        dict(
+            nclist=NocaseList(),
+            predicate=lambda v: False,
+            exp_result=0,
+            exp_nclist=[],
+        ),
+        None, None, not TEST_AGAINST_LIST
+    ),
+    (
+        "List with items, retain all",
+        dict(
+            nclist=NocaseList(['Dog', 'Cat']),
+            predicate=lambda v: True,
+            exp_result=0,
+            exp_nclist=['Dog', 'Cat'],
+        ),
+        None, None, not TEST_AGAINST_LIST
+    ),
+    (
+        "List with items, retain items with upper case first character",
+        dict(
+            nclist=NocaseList(['Dog', 'cat', 'Budgie', 'kitten']),
+            predicate=lambda v: v[0].isupper(),
+            exp_result=2,
+            exp_nclist=['Dog', 'Budgie'],
+        ),
+        None, None, not TEST_AGAINST_LIST
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_NOCASELIST_RETAIN)
+@simplified_test_function
+def test_NocaseList_retain(testcase, nclist, predicate, exp_result,
+                           exp_nclist):
+    """
+    Test function for NocaseList.retain()
+    """
+
+    # Don't change the testcase data, but a copy
+    nclist_copy = NocaseList(nclist)
+
+    # The code to be tested
+    result = nclist_copy.retain(predicate)
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    assert result == exp_result
+    assert_equal(nclist_copy, exp_nclist)
+
+
 TESTCASES_NOCASELIST_SORT = [
 
     # Testcases for NocaseList.sort()
@@ -2902,14 +3155,16 @@ def test_NocaseList_sort(testcase, nclist, kwargs, exp_nclist):
     assert_equal(nclist_copy, exp_nclist)
 
 
-TESTCASES_NOCASELIST_PICKLE = [
+TESTCASES_NOCASELIST_CASE_VARIANTS = [
 
-    # Testcases for pickling and unpickling NocaseList objects
+    # Testcases for NocaseList.case_variants()
 
     # Each list item is a testcase tuple with these items:
     # * desc: Short testcase description.
     # * kwargs: Keyword arguments for the test function:
     #   * nclist: NocaseList object to be used for the test.
+    #   * exp_result: Expected result, as a dict of casefolded value to tuple
+    #     of positions and spellings.
     # * exp_exc_types: Expected exception type(s), or None.
     # * exp_warn_types: Expected warning type(s), or None.
     # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
@@ -2918,65 +3173,1486 @@ TESTCASES_NOCASELIST_PICKLE = [
         "Empty list",
         dict(
             nclist=NocaseList(),
+            exp_result={},
         ),
-        None, None, True
+        None, None, not TEST_AGAINST_LIST
     ),
     (
-        "List with two items",
+        "List with case variants of one value",
         dict(
-            nclist=NocaseList(['Dog', 'cat']),
+            nclist=NocaseList(['CIM_System', 'cim_system', 'CIM_SYSTEM',
+                               'cim_system']),
+            exp_result={
+                'cim_system': (
+                    [0, 1, 2, 3], ['CIM_System', 'cim_system', 'CIM_SYSTEM']),
+            },
         ),
-        None, None, True
+        None, None, not TEST_AGAINST_LIST
+    ),
+    (
+        "List with case variants of two values and None",
+        dict(
+            nclist=NocaseList(['Dog', 'Cat', None, 'DOG', b'cat']),
+            exp_result={
+                'dog': ([0, 3], ['Dog', 'DOG']),
+                'cat': ([1], ['Cat']),
+                None: ([2], [None]),
+                b'cat': ([4], [b'cat']),
+            },
+        ),
+        None, None, not TEST_AGAINST_LIST
+    ),
+    (
+        "List with list and tuple items",
+        dict(
+            nclist=NocaseList([['Dog', 'Cat'], ('dog', 'CAT')]),
+            exp_result={
+                ('dog', 'cat'): ([0, 1], [['Dog', 'Cat'], ('dog', 'CAT')]),
+            },
+        ),
+        None, None, not TEST_AGAINST_LIST
     ),
 ]
 
 
 @pytest.mark.parametrize(
     "desc, kwargs, exp_exc_types, exp_warn_types, condition",
-    TESTCASES_NOCASELIST_PICKLE)
+    TESTCASES_NOCASELIST_CASE_VARIANTS)
 @simplified_test_function
-def test_NocaseList_pickle(testcase, nclist):
+def test_NocaseList_case_variants(testcase, nclist, exp_result):
     """
-    Test function for pickling and unpickling NocaseList objects
+    Test function for NocaseList.case_variants()
     """
 
-    # Don't change the testcase data, but a copy
-    nclist_copy = NocaseList(nclist)
-
-    # Pickle the object
-    pkl = pickle.dumps(nclist_copy)
-
-    del nclist_copy
-
-    # Unpickle the object
-    nclist2 = pickle.loads(pkl)
+    # The code to be tested
+    result = nclist.case_variants()
 
     # Ensure that exceptions raised in the remainder of this function
     # are not mistaken as expected exceptions
     assert testcase.exp_exc_types is None
 
-    assert_equal(nclist2, nclist)
-
+    assert list(result.keys()) == list(exp_result.keys())
+    for key, group in result.items():
+        exp_positions, exp_spellings = exp_result[key]
+        assert group.positions == exp_positions
+        assert group.spellings == exp_spellings
 
-def test_casefold_override():
-    """
-    Test function for overriding the casefold method.
-    """
 
-    if TEST_AGAINST_LIST:
-        pytest.skip("The override test does not support testing with list")
+TESTCASES_NOCASELIST_CANONICALIZE = [
 
-    class MyNocaseList(NocaseList):
-        "Test class that overrides the casefold method"
+    # Testcases for NocaseList.canonicalize()
 
-        @staticmethod
-        def __casefold__(value):
-            return unicodedata.normalize('NFKD', value).casefold()
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * nclist: NocaseList object to be used for the test.
+    #   * args: Positional arguments for the test function.
+    #   * exp_result: Expected number of changed items.
+    #   * exp_nclist: Expected NocaseList after being updated.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
 
-    nclist = MyNocaseList()
+    (
+        "Empty list, default",
+        dict(
+            nclist=NocaseList(),
+            args=(),
+            exp_result=0,
+            exp_nclist=[],
+        ),
+        None, None, not TEST_AGAINST_LIST
+    ),
+    (
+        "List with case variants, default (first)",
+        dict(
+            nclist=NocaseList(['Dog', 'cat', 'dog', 'CAT', 'DOG']),
+            args=(),
+            exp_result=3,
+            exp_nclist=['Dog', 'cat', 'Dog', 'cat', 'Dog'],
+        ),
+        None, None, not TEST_AGAINST_LIST
+    ),
+    (
+        "List with case variants, most frequent",
+        dict(
+            nclist=NocaseList(['Dog', 'cat', 'dog', 'CAT', 'dog', 'Cat']),
+            args=('most_frequent',),
+            exp_result=3,
+            exp_nclist=['dog', 'cat', 'dog', 'cat', 'dog', 'cat'],
+        ),
+        None, None, not TEST_AGAINST_LIST
+    ),
+    (
+        "List without case variants, most frequent",
+        dict(
+            nclist=NocaseList(['Dog', b'dog', 'Cat']),
+            args=('most_frequent',),
+            exp_result=0,
+            exp_nclist=['Dog', b'dog', 'Cat'],
+        ),
+        None, None, not TEST_AGAINST_LIST
+    ),
+    (
+        "Invalid prefer value",
+        dict(
+            nclist=NocaseList(['Dog']),
+            args=('last',),
+            exp_result=None,
+            exp_nclist=None,
+        ),
+        ValueError, None, not TEST_AGAINST_LIST
+    ),
+]
 
-    # Add item with combined Unicode character
-    nclist.append("\u00C7")
 
-    # Look up item with combination sequence
-    assert "c\u0327" in nclist
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_NOCASELIST_CANONICALIZE)
+@simplified_test_function
+def test_NocaseList_canonicalize(testcase, nclist, args, exp_result,
+                                 exp_nclist):
+    """
+    Test function for NocaseList.canonicalize()
+    """
+
+    # Don't change the testcase data, but a copy
+    nclist_copy = NocaseList(nclist)
+
+    # The code to be tested
+    result = nclist_copy.canonicalize(*args)
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    assert result == exp_result
+    assert_equal(nclist_copy, exp_nclist)
+
+
+TESTCASES_NOCASELIST_PICKLE = [
+
+    # Testcases for pickling and unpickling NocaseList objects
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * nclist: NocaseList object to be used for the test.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty list",
+        dict(
+            nclist=NocaseList(),
+        ),
+        None, None, True
+    ),
+    (
+        "List with two items",
+        dict(
+            nclist=NocaseList(['Dog', 'cat']),
+        ),
+        None, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_NOCASELIST_PICKLE)
+@simplified_test_function
+def test_NocaseList_pickle(testcase, nclist):
+    """
+    Test function for pickling and unpickling NocaseList objects
+    """
+
+    # Don't change the testcase data, but a copy
+    nclist_copy = NocaseList(nclist)
+
+    # Pickle the object
+    pkl = pickle.dumps(nclist_copy)
+
+    del nclist_copy
+
+    # Unpickle the object
+    nclist2 = pickle.loads(pkl)
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    assert_equal(nclist2, nclist)
+
+
+def test_casefold_override():
+    """
+    Test function for overriding the casefold method.
+    """
+
+    if TEST_AGAINST_LIST:
+        pytest.skip("The override test does not support testing with list")
+
+    class MyNocaseList(NocaseList):
+        "Test class that overrides the casefold method"
+
+        @staticmethod
+        def __casefold__(value):
+            return unicodedata.normalize('NFKD', value).casefold()
+
+    nclist = MyNocaseList()
+
+    # Add item with combined Unicode character
+    nclist.append("\u00C7")
+
+    # Look up item with combination sequence
+    assert "c\u0327" in nclist
+
+
+def test_casefold_nested_as_tuple():
+    """
+    Test function for casefolding list and tuple items into tuples.
+    """
+
+    if TEST_AGAINST_LIST:
+        pytest.skip("The nested casefold test does not support testing with "
+                    "list")
+
+    class PairNocaseList(NocaseList):
+        "Test class that casefolds list and tuple items into tuples"
+        casefold_nested_as_tuple = True
+
+    nclist = PairNocaseList([('Root/CIMV2', 'CIM_System'), None])
+    nclist.append(['root/cimv2', ['CIM_Foo', 'CIM_Bar']])
+
+    # pylint: disable=protected-access
+    assert nclist._casefolded_list == [
+        ('root/cimv2', 'cim_system'),
+        None,
+        ('root/cimv2', ('cim_foo', 'cim_bar')),
+    ]
+
+    # The casefolded items are hashable
+    assert len(set(nclist._casefolded_list)) == 3
+
+    # Lookups and comparisons are independent of the casefolded type
+    assert ['ROOT/cimv2', 'cim_system'] in nclist
+    assert nclist.index(('root/CIMV2', ('cim_FOO', 'CIM_bar'))) == 2
+    default_list = NocaseList(nclist)
+    assert default_list._casefolded_list[0] == ['root/cimv2', 'cim_system']
+    assert nclist == default_list
+    assert default_list == nclist
+    assert not nclist < default_list
+    assert PairNocaseList(default_list) == nclist
+
+    assert list(nclist.case_variants().keys()) == nclist._casefolded_list
+    assert nclist.remove_all([('root/cimv2', 'CIM_SYSTEM')]) == 1
+
+
+class CountingNocaseList(_NocaseList):
+    """
+    Test class that counts the calls of its casefold method and includes
+    the casefolded items when pickled.
+    """
+    pickle_casefolded = True
+    casefold_calls = 0
+
+    @staticmethod
+    def __casefold__(value):
+        CountingNocaseList.casefold_calls += 1
+        return unicodedata.normalize('NFKD', value).casefold()
+
+
+def test_pickle_casefolded():
+    """
+    Test function for pickling NocaseList objects with their casefolded
+    items.
+    """
+
+    if TEST_AGAINST_LIST:
+        pytest.skip("The pickle_casefolded test does not support testing with "
+                    "list")
+
+    items = ['Dog', 'cat', None, ['Budgie'], 'Ça']
+    nclist = CountingNocaseList(items)
+
+    # pylint: disable=protected-access
+    assert nclist.__getstate__()['_casefolded_diff'] == \
+        [None if i in (1, 2) else value_cf
+         for i, value_cf in enumerate(nclist._casefolded_list)]
+
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        pkl = pickle.dumps(nclist, protocol=protocol)
+        CountingNocaseList.casefold_calls = 0
+        nclist2 = pickle.loads(pkl)
+        assert CountingNocaseList.casefold_calls == 0
+        assert type(nclist2) is CountingNocaseList
+        assert list(nclist2) == items
+        assert nclist2._casefolded_list == nclist._casefolded_list
+        assert "ça" in nclist2
+
+    # The setting on a list object is pickled with the object
+    nclist = NocaseList(items)
+    assert '_casefolded_diff' not in nclist.__getstate__()
+    nclist.pickle_casefolded = True
+    nclist2 = pickle.loads(pickle.dumps(nclist))
+    assert nclist2.pickle_casefolded
+    assert nclist2._casefolded_list == nclist._casefolded_list
+    assert nclist2 == items
+
+    # A nested list that is equal to its casefolded list is casefolded again,
+    # instead of sharing the list object
+    nclist = NocaseList(['dog', ['cat', 'eel']])
+    nclist.pickle_casefolded = True
+    assert nclist.__getstate__()['_casefolded_diff'] == [None, None]
+    nclist2 = pickle.loads(pickle.dumps(nclist))
+    assert nclist2 == ['DOG', ['Cat', 'Eel']]
+    assert nclist2._casefolded_list == ['dog', ['cat', 'eel']]
+    assert nclist2._casefolded_list[1] is not nclist2[1]
+
+
+TESTCASES_PICKLE_BUFFERS = [
+
+    # Testcases for pickling NocaseList objects with pickle protocol 5
+    # out-of-band buffers
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * items: Items of the NocaseList object to be pickled.
+    #   * pickle_casefolded: Value for the pickle_casefolded attribute.
+    #   * exp_buffers: Expected number of out-of-band buffers.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty list",
+        dict(
+            items=[],
+            pickle_casefolded=False,
+            exp_buffers=0,
+        ),
+        None, None, True
+    ),
+    (
+        "List with unicode strings",
+        dict(
+            items=['Dog', 'Straße', '', 'Ça', 'x\U0001F600'],
+            pickle_casefolded=False,
+            exp_buffers=1,
+        ),
+        None, None, True
+    ),
+    (
+        "List with unicode strings including lone surrogates",
+        dict(
+            items=['Dog\ud83d', '\ude00', '\udcff'],
+            pickle_casefolded=False,
+            exp_buffers=1,
+        ),
+        None, None, True
+    ),
+    (
+        "List with unicode strings including NUL characters",
+        dict(
+            items=['Dog\0', '\0', '', 'C\0a\0t'],
+            pickle_casefolded=False,
+            exp_buffers=2,
+        ),
+        None, None, True
+    ),
+    (
+        "List with unicode strings, with casefolded items",
+        dict(
+            items=['Dog', 'Straße', '', 'Ça'],
+            pickle_casefolded=True,
+            exp_buffers=2,
+        ),
+        None, None, True
+    ),
+    (
+        "List with other items",
+        dict(
+            items=['Dog', None, b'Cat', ['Budgie']],
+            pickle_casefolded=False,
+            exp_buffers=0,
+        ),
+        None, None, True
+    ),
+    (
+        "List with other items, with casefolded items",
+        dict(
+            items=['Dog', None, b'Cat', ['Budgie']],
+            pickle_casefolded=True,
+            exp_buffers=0,
+        ),
+        None, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_PICKLE_BUFFERS)
+@simplified_test_function
+def test_pickle_buffers(testcase, items, pickle_casefolded, exp_buffers):
+    """
+    Test function for pickling NocaseList objects with pickle protocol 5
+    out-of-band buffers.
+    """
+
+    if TEST_AGAINST_LIST:
+        pytest.skip("The pickle buffers test does not support testing with "
+                    "list")
+
+    nclist = NocaseList(items)
+    nclist.pickle_casefolded = pickle_casefolded
+    buffers = []
+
+    # The code to be tested
+    pkl = pickle.dumps(nclist, protocol=5, buffer_callback=buffers.append)
+    nclist2 = pickle.loads(pkl, buffers=buffers)
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    assert len(buffers) == exp_buffers
+    assert type(nclist2) is NocaseList
+    assert list(nclist2) == items
+    # pylint: disable=protected-access
+    assert nclist2._casefolded_list == nclist._casefolded_list
+    assert nclist2.pickle_casefolded == pickle_casefolded
+
+    # The buffers can also be passed in-band, and with lower protocols the
+    # items are pickled individually
+    for protocol in (4, 5):
+        nclist2 = pickle.loads(pickle.dumps(nclist, protocol=protocol))
+        assert list(nclist2) == items
+        assert nclist2._casefolded_list == nclist._casefolded_list
+    assert b'_restore_from_buffers' not in pickle.dumps(nclist, protocol=4)
+
+
+class LegacyPickler(pickle.Pickler):
+    """
+    Pickler that pickles NocaseList objects with the inherited
+    object.__reduce_ex__() method, as earlier versions of the package did.
+    """
+
+    def __init__(self, file, protocol):
+        super().__init__(file, protocol=protocol)
+        self.protocol = protocol
+
+    def reducer_override(self, obj):
+        if isinstance(obj, _NocaseList):
+            return object.__reduce_ex__(obj, self.protocol)
+        return NotImplemented
+
+
+def test_pickle_fold_once():
+    """
+    Test function for unpickling NocaseList objects, that verifies that the
+    items are casefolded only once.
+    """
+
+    if TEST_AGAINST_LIST:
+        pytest.skip("The pickle fold once test does not support testing with "
+                    "list")
+
+    items = ['Dog', 'cat', None, ['Budgie'], 'Ça']
+    CountingNocaseList.casefold_calls = 0
+    nclist = CountingNocaseList(items)
+    exp_casefold_calls = CountingNocaseList.casefold_calls
+    nclist.pickle_casefolded = False
+
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        pkl = pickle.dumps(nclist, protocol=protocol)
+        file = io.BytesIO()
+        LegacyPickler(file, protocol=protocol).dump(nclist)
+        legacy_pkl = file.getvalue()
+        assert legacy_pkl != pkl
+
+        for data in (pkl, legacy_pkl):
+            CountingNocaseList.casefold_calls = 0
+            nclist2 = pickle.loads(data)
+            assert CountingNocaseList.casefold_calls == exp_casefold_calls
+            assert type(nclist2) is CountingNocaseList
+            assert list(nclist2) == items
+            # pylint: disable=protected-access
+            assert nclist2._casefolded_list == nclist._casefolded_list
+            assert "ça" in nclist2
+
+
+TESTCASES_FROM_FILE = [
+
+    # Testcases for NocaseList.from_file()
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * data: Content of the file, as a byte string.
+    #   * kwargs: Keyword arguments for from_file(), other than chunk_size.
+    #   * exp_items: Expected items of the resulting list.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty file",
+        dict(
+            data=b'',
+            kwargs=dict(),
+            exp_items=[],
+        ),
+        None, None, True
+    ),
+    (
+        "Lines with Unix and Windows line endings",
+        dict(
+            data=b'Dog\ncat\r\n\nStra\xc3\x9fe\n',
+            kwargs=dict(),
+            exp_items=['Dog', 'cat', '', 'Straße'],
+        ),
+        None, None, True
+    ),
+    (
+        "Last line without line ending",
+        dict(
+            data=b'Dog\ncat',
+            kwargs=dict(),
+            exp_items=['Dog', 'cat'],
+        ),
+        None, None, True
+    ),
+    (
+        "Lines without stripping",
+        dict(
+            data=b'Dog \r\ncat\t\n',
+            kwargs=dict(strip=None),
+            exp_items=['Dog \r', 'cat\t'],
+        ),
+        None, None, True
+    ),
+    (
+        "Lines with stripping of additional characters",
+        dict(
+            data=b'Dog \r\ncat\t\n',
+            kwargs=dict(strip=' \t\r'),
+            exp_items=['Dog', 'cat'],
+        ),
+        None, None, True
+    ),
+    (
+        "Items with other delimiter",
+        dict(
+            data=b'Dog\0cat\nBudgie\0\0',
+            kwargs=dict(delimiter='\0'),
+            exp_items=['Dog', 'cat\nBudgie', ''],
+        ),
+        None, None, True
+    ),
+    (
+        "Items with delimiter of multiple characters",
+        dict(
+            data=b'Dog, cat, , Budgie',
+            kwargs=dict(delimiter=', '),
+            exp_items=['Dog', 'cat', '', 'Budgie'],
+        ),
+        None, None, True
+    ),
+    (
+        "Lines in UTF-16 encoding",
+        dict(
+            data='Dog\nStraße\n'.encode('utf-16'),
+            kwargs=dict(encoding='utf-16'),
+            exp_items=['Dog', 'Straße'],
+        ),
+        None, None, True
+    ),
+    (
+        "Unique lines",
+        dict(
+            data=b'Dog\ncat\nDOG\nStra\xc3\x9fe\nSTRASSE\ndog\n',
+            kwargs=dict(unique=True),
+            exp_items=['Dog', 'cat', 'Straße'],
+        ),
+        None, None, True
+    ),
+    (
+        "Lines that cannot be decoded",
+        dict(
+            data=b'Dog\n\xff\n',
+            kwargs=dict(),
+            exp_items=None,
+        ),
+        UnicodeDecodeError, None, True
+    ),
+    (
+        "Lines that cannot be decoded, with error handling scheme",
+        dict(
+            data=b'Dog\n\xff\n',
+            kwargs=dict(errors='replace'),
+            exp_items=['Dog', '�'],
+        ),
+        None, None, True
+    ),
+    (
+        "Empty delimiter",
+        dict(
+            data=b'Dog\n',
+            kwargs=dict(delimiter=''),
+            exp_items=None,
+        ),
+        ValueError, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_FROM_FILE)
+@simplified_test_function
+def test_NocaseList_from_file(testcase, data, kwargs, exp_items):
+    """
+    Test function for NocaseList.from_file(), with different chunk sizes.
+    """
+
+    if TEST_AGAINST_LIST:
+        pytest.skip("The from_file test does not support testing with list")
+
+    for chunk_size in (1, 3, 1 << 20):
+        progress = []
+
+        # The code to be tested
+        nclist = NocaseList.from_file(
+            io.BytesIO(data), chunk_size=chunk_size,
+            progress=progress.append, **kwargs)
+
+        # Ensure that exceptions raised in the remainder of this function
+        # are not mistaken as expected exceptions
+        assert testcase.exp_exc_types is None
+
+        assert type(nclist) is NocaseList
+        assert list(nclist) == exp_items
+        # pylint: disable=protected-access
+        assert nclist._casefolded_list == \
+            NocaseList(exp_items)._casefolded_list
+        exp_progress = list(range(chunk_size, len(data), chunk_size))
+        if data:
+            exp_progress.append(len(data))
+        assert progress == exp_progress
+
+
+def test_NocaseList_from_lines():
+    """
+    Test function for NocaseList.from_lines(), and for NocaseList.from_file()
+    with a path name.
+    """
+
+    if TEST_AGAINST_LIST:
+        pytest.skip("The from_lines test does not support testing with list")
+
+    lines = ['Dog\n', 'cat\r\n', 'DOG', 'Straße\n', '\n', 'STRASSE\n']
+    items = ['Dog', 'cat', 'DOG', 'Straße', '', 'STRASSE']
+    progress = []
+
+    nclist = NocaseList.from_lines(iter(lines), chunk_size=4,
+                                   progress=progress.append)
+    assert list(nclist) == items
+    assert nclist.count('dog') == 2
+    assert progress == [4, 6]
+
+    nclist = NocaseList.from_lines(lines, unique=True, chunk_size=1)
+    assert list(nclist) == ['Dog', 'cat', 'Straße', '']
+
+    nclist = NocaseList.from_lines(lines, strip=None,
+                                   folder=nocaselist.LowerFolder())
+    assert list(nclist) == lines
+    assert nclist.folder == nocaselist.LowerFolder()
+    assert 'straße\n' in nclist
+
+    nclist = NocaseList.from_lines([b'Dog\n', b'DOG'], strip=b'\n',
+                                   unique=True)
+    assert list(nclist) == [b'Dog']
+
+    with pytest.raises(AttributeError):
+        NocaseList.from_lines(['Dog', 42], strip=None)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'lines.txt')
+        with open(path, 'w', encoding='utf-8', newline='') as fp:
+            fp.write('\r\n'.join(items))
+        nclist = NocaseList.from_file(path, unique=True)
+    assert list(nclist) == ['Dog', 'cat', 'Straße', '']
+
+
+TESTCASES_FROM_ITERABLE = [
+
+    # Testcases for NocaseList.from_iterable()
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * items: Iterable with the items for the list.
+    #   * kwargs: Keyword arguments for from_iterable().
+    #   * exp_items: Expected items of the resulting list.
+    #   * exp_parallel: Boolean indicating whether the items are expected to
+    #     be casefolded in worker processes.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty iterable",
+        dict(
+            items=[],
+            kwargs=dict(threshold=0),
+            exp_items=[],
+            exp_parallel=False,
+        ),
+        None, None, True
+    ),
+    (
+        "Fewer items than the threshold",
+        dict(
+            items=['Dog', 'Ça', 'ﬁsh'],
+            kwargs=dict(threshold=4),
+            exp_items=['Dog', 'Ça', 'ﬁsh'],
+            exp_parallel=False,
+        ),
+        None, None, True
+    ),
+    (
+        "Only one worker",
+        dict(
+            items=['Dog', 'Ça', 'ﬁsh'],
+            kwargs=dict(threshold=0, workers=1),
+            exp_items=['Dog', 'Ça', 'ﬁsh'],
+            exp_parallel=False,
+        ),
+        None, None, True
+    ),
+    (
+        "Items in multiple chunks",
+        dict(
+            items=iter(['Dog', 'Ça', 'ﬁsh', 'DOG', 'Straße']),
+            kwargs=dict(threshold=0, workers=2, chunk_size=2),
+            exp_items=['Dog', 'Ça', 'ﬁsh', 'DOG', 'Straße'],
+            exp_parallel=True,
+        ),
+        None, None, True
+    ),
+    (
+        "Items that are None and lists",
+        dict(
+            items=['Dog', None, 'Cat', ['Ça', 'Budgie']],
+            kwargs=dict(threshold=0, workers=2, chunk_size=3),
+            exp_items=['Dog', None, 'Cat', ['Ça', 'Budgie']],
+            exp_parallel=True,
+        ),
+        None, None, True
+    ),
+    (
+        "Item that is not a unicode string, raised by the casefold method",
+        dict(
+            items=['Dog', 42],
+            kwargs=dict(threshold=0, workers=2, chunk_size=1),
+            exp_items=None,
+            exp_parallel=True,
+        ),
+        TypeError, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_FROM_ITERABLE)
+@simplified_test_function
+def test_NocaseList_from_iterable(testcase, items, kwargs, exp_items,
+                                  exp_parallel):
+    """
+    Test function for NocaseList.from_iterable(), with a subclass that
+    overrides the casefold method.
+    """
+
+    if TEST_AGAINST_LIST:
+        pytest.skip("The from_iterable test does not support testing with "
+                    "list")
+
+    CountingNocaseList.casefold_calls = 0
+
+    # The code to be tested
+    nclist = CountingNocaseList.from_iterable(items, **kwargs)
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    casefold_calls = CountingNocaseList.casefold_calls
+    exp_nclist = CountingNocaseList(exp_items)
+    assert type(nclist) is CountingNocaseList
+    assert list(nclist) == exp_items
+    # pylint: disable=protected-access
+    assert nclist._casefolded_list == exp_nclist._casefolded_list
+    if exp_parallel:
+        assert casefold_calls == 0
+    else:
+        assert casefold_calls == CountingNocaseList.casefold_calls // 2
+
+
+def test_NocaseList_extend_parallel():
+    """
+    Test function for NocaseList.extend_parallel() on a list with a folder
+    and a Bloom filter.
+    """
+
+    if TEST_AGAINST_LIST:
+        pytest.skip("The extend_parallel test does not support testing with "
+                    "list")
+
+    nclist = NocaseList(['Dog'], folder=nocaselist.LowerFolder())
+    nclist.enable_bloom_filter()
+
+    nclist.extend_parallel(['Straße', 'CAT', 'dog'], threshold=0, workers=2,
+                           chunk_size=2)
+
+    assert list(nclist) == ['Dog', 'Straße', 'CAT', 'dog']
+    assert nclist.folder == nocaselist.LowerFolder()
+    # pylint: disable=protected-access
+    assert nclist._casefolded_list == ['dog', 'straße', 'cat', 'dog']
+    assert 'STRAßE' in nclist
+    assert 'STRASSE' not in nclist
+    assert nclist.count('DOG') == 2
+
+    for workers in (0, -1):
+        with pytest.raises(ValueError, match='workers'):
+            nclist.extend_parallel(['Eel'], workers=workers)
+        with pytest.raises(ValueError, match='workers'):
+            NocaseList.from_iterable(['Eel'], workers=workers)
+    assert list(nclist) == ['Dog', 'Straße', 'CAT', 'dog']
+
+
+async def async_items(items):
+    """
+    Asynchronous generator for the items, that returns control to the event
+    loop before each item.
+    """
+    for item in items:
+        await asyncio.sleep(0)
+        yield item
+
+
+TESTCASES_AEXTEND = [
+
+    # Testcases for NocaseList.aextend() and NocaseList.afrom_iterable()
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * init_items: Initial items of the list.
+    #   * items: Items to be added.
+    #   * async_source: Boolean indicating that the items are added from an
+    #     asynchronous generator.
+    #   * kwargs: Keyword arguments for aextend().
+    #   * exp_items: Expected items of the list, or None if an exception
+    #     is expected.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty iterable",
+        dict(
+            init_items=['Dog'],
+            items=[],
+            async_source=False,
+            kwargs=dict(),
+            exp_items=['Dog'],
+        ),
+        None, None, True
+    ),
+    (
+        "Iterator in multiple chunks",
+        dict(
+            init_items=['Dog'],
+            items=iter(['Cat', 'Straße', None, 'DOG', 'Ça']),
+            async_source=False,
+            kwargs=dict(chunk_size=2, max_stall=0),
+            exp_items=['Dog', 'Cat', 'Straße', None, 'DOG', 'Ça'],
+        ),
+        None, None, True
+    ),
+    (
+        "Asynchronous generator in multiple chunks",
+        dict(
+            init_items=[],
+            items=['Cat', 'Straße', ['Ça', 'Dog'], 'DOG', 'Ça'],
+            async_source=True,
+            kwargs=dict(chunk_size=2, max_stall=0),
+            exp_items=['Cat', 'Straße', ['Ça', 'Dog'], 'DOG', 'Ça'],
+        ),
+        None, None, True
+    ),
+    (
+        "Asynchronous generator in one chunk",
+        dict(
+            init_items=['Dog'],
+            items=['Cat', 'Straße'],
+            async_source=True,
+            kwargs=dict(),
+            exp_items=['Dog', 'Cat', 'Straße'],
+        ),
+        None, None, True
+    ),
+    (
+        "Item that is not a string, in a later chunk",
+        dict(
+            init_items=['Dog'],
+            items=['Cat', 'Straße', 42],
+            async_source=False,
+            kwargs=dict(chunk_size=2),
+            exp_items=None,
+        ),
+        AttributeError, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_AEXTEND)
+@simplified_test_function
+def test_NocaseList_aextend(testcase, init_items, items, async_source,
+                            kwargs, exp_items):
+    """
+    Test function for NocaseList.aextend() on a list with a Bloom filter.
+    """
+
+    if TEST_AGAINST_LIST:
+        pytest.skip("The aextend test does not support testing with list")
+
+    nclist = NocaseList(init_items)
+    nclist.enable_bloom_filter()
+    if async_source:
+        items = async_items(items)
+
+    # The code to be tested
+    asyncio.run(nclist.aextend(items, **kwargs))
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    exp_nclist = NocaseList(exp_items)
+    assert list(nclist) == exp_items
+    # pylint: disable=protected-access
+    assert nclist._casefolded_list == exp_nclist._casefolded_list
+    for item in exp_items:
+        assert item in nclist
+
+
+def test_NocaseList_afrom_iterable():
+    """
+    Test function for NocaseList.afrom_iterable() and for returning control
+    to the event loop in NocaseList.aextend().
+    """
+
+    if TEST_AGAINST_LIST:
+        pytest.skip("The afrom_iterable test does not support testing with "
+                    "list")
+
+    items = [f"Item{i}" for i in range(100)]
+
+    async def build(max_stall):
+        ticks = []
+        done = asyncio.Event()
+
+        async def ticker():
+            while not done.is_set():
+                ticks.append(len(ticks))
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        nclist = await CountingNocaseList.afrom_iterable(
+            items, folder=nocaselist.LowerFolder(), chunk_size=10,
+            max_stall=max_stall)
+        done.set()
+        await task
+        return nclist, len(ticks)
+
+    nclist, num_ticks = asyncio.run(build(0))
+    assert type(nclist) is CountingNocaseList
+    assert nclist.folder == nocaselist.LowerFolder()
+    assert nclist == [item.upper() for item in items]
+    assert num_ticks >= 10
+
+    nclist, num_ticks = asyncio.run(build(60))
+    assert list(nclist) == items
+    assert num_ticks == 1
+
+
+TESTCASES_ASORT = [
+
+    # Testcases for NocaseList.asort()
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * items: Items of the list.
+    #   * kwargs: Keyword arguments for asort(), that are also used for
+    #     sort() for determining the expected result.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty list",
+        dict(
+            items=[],
+            kwargs=dict(),
+        ),
+        None, None, True
+    ),
+    (
+        "One chunk",
+        dict(
+            items=['Dog', 'cat', 'Budgie', 'DOG', 'Cat'],
+            kwargs=dict(),
+        ),
+        None, None, True
+    ),
+    (
+        "Multiple chunks with case-insensitively equal items",
+        dict(
+            items=['Dog', 'cat', 'Budgie', 'DOG', 'Cat', 'dog', 'BUDGIE',
+                   'Eel', 'cAt', 'budgie', 'eel'],
+            kwargs=dict(chunk_size=3, max_stall=0),
+        ),
+        None, None, True
+    ),
+    (
+        "Multiple chunks in reverse order",
+        dict(
+            items=['Dog', 'cat', 'Budgie', 'DOG', 'Cat', 'dog', 'BUDGIE',
+                   'Eel', 'cAt', 'budgie', 'eel'],
+            kwargs=dict(chunk_size=2, reverse=True, max_stall=0),
+        ),
+        None, None, True
+    ),
+    (
+        "Multiple chunks with key function",
+        dict(
+            items=['Dog', 'cat', 'Budgie', 'DOG', 'Cat', 'dog', 'BUDGIE',
+                   'Eel', 'cAt', 'budgie', 'eel'],
+            kwargs=dict(chunk_size=4, key=len),
+        ),
+        None, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_ASORT)
+@simplified_test_function
+def test_NocaseList_asort(testcase, items, kwargs):
+    """
+    Test function for NocaseList.asort(), compared against NocaseList.sort().
+    """
+
+    if TEST_AGAINST_LIST:
+        pytest.skip("The asort test does not support testing with list")
+
+    nclist = NocaseList(items)
+    exp_nclist = NocaseList(items)
+    sort_kwargs = {k: v for k, v in kwargs.items()
+                   if k in ('key', 'reverse')}
+    exp_nclist.sort(**sort_kwargs)
+
+    # The code to be tested
+    asyncio.run(nclist.asort(**kwargs))
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    assert list(nclist) == list(exp_nclist)
+    # pylint: disable=protected-access
+    assert nclist._casefolded_list == exp_nclist._casefolded_list
+
+
+def test_NocaseList_asort_modified():
+    """
+    Test function for NocaseList.asort() on a list that is changed by
+    another task while it is sorted.
+    """
+
+    if TEST_AGAINST_LIST:
+        pytest.skip("The asort test does not support testing with list")
+
+    items = [f"Item{i}" for i in range(20, 0, -1)]
+    nclist = NocaseList(items)
+
+    async def sort_and_change():
+        task = asyncio.create_task(nclist.asort(chunk_size=5, max_stall=0))
+        await asyncio.sleep(0)
+        nclist.append('Item0')
+        await task
+
+    with pytest.raises(ValueError):
+        asyncio.run(sort_and_change())
+    assert list(nclist) == items + ['Item0']
+
+
+TESTCASES_BATCH = [
+
+    # Testcases for NocaseList.batch()
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * items: Initial items of the list.
+    #   * operations: List of tuples (method name, args) of the operations
+    #     that are performed in the batch.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "No operations",
+        dict(
+            items=['Dog', 'Cat'],
+            operations=[],
+        ),
+        None, None, True
+    ),
+    (
+        "Appends and extends",
+        dict(
+            items=['Dog', 'Cat'],
+            operations=[
+                ('append', ('Straße',)),
+                ('extend', (['BUDGIE', None, ['Ça', 'Eel']],)),
+                ('append', ('ﬁsh',)),
+            ],
+        ),
+        None, None, True
+    ),
+    (
+        "Inserts at various positions, including out of range",
+        dict(
+            items=['Dog', 'Cat', 'Budgie'],
+            operations=[
+                ('insert', (2, 'Eel')),
+                ('insert', (-1, 'Fish')),
+                ('insert', (100, 'Rat')),
+                ('insert', (-100, 'Bat')),
+            ],
+        ),
+        None, None, True
+    ),
+    (
+        "Item and slice assignments and deletions",
+        dict(
+            items=['Dog', 'Cat', 'Budgie', 'Eel', 'Fish', 'Rat'],
+            operations=[
+                ('__setitem__', (-2, 'FISH')),
+                ('__delitem__', (-1,)),
+                ('__setitem__', (slice(1, 3), ['CAT', 'Ça', 'Bat'])),
+                ('__delitem__', (slice(None, None, -2),)),
+                ('__setitem__', (slice(5, 5), ['Ant'])),
+                ('pop', ()),
+                ('pop', (0,)),
+            ],
+        ),
+        None, None, True
+    ),
+    (
+        "Changes mixed with methods that need the casefolded items",
+        dict(
+            items=['Dog', 'Cat', 'Budgie'],
+            operations=[
+                ('append', ('DOG',)),
+                ('remove', ('dog',)),
+                ('insert', (0, 'EEL')),
+                ('sort', ()),
+                ('append', ('cat',)),
+                ('retain', (lambda v: v != 'Budgie',)),
+                ('append', ('Fish',)),
+                ('reverse', ()),
+                ('extend', (['Rat'],)),
+                ('remove_all', (['RAT'],)),
+            ],
+        ),
+        None, None, True
+    ),
+    (
+        "Invalid index",
+        dict(
+            items=['Dog', 'Cat'],
+            operations=[
+                ('append', ('Eel',)),
+                ('pop', (5,)),
+            ],
+        ),
+        IndexError, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_BATCH)
+@simplified_test_function
+def test_NocaseList_batch(testcase, items, operations):
+    """
+    Test function for NocaseList.batch() on a list with a Bloom filter,
+    compared against the same operations outside of a batch.
+    """
+
+    if TEST_AGAINST_LIST:
+        pytest.skip("The batch test does not support testing with list")
+
+    nclist = NocaseList(items)
+    nclist.enable_bloom_filter()
+    exp_nclist = NocaseList(items)
+    results = []
+
+    # The code to be tested
+    with nclist.batch() as lst:
+        assert lst is nclist
+        for name, args in operations:
+            results.append(getattr(nclist, name)(*args))
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    exp_results = [getattr(exp_nclist, name)(*args)
+                   for name, args in operations]
+    assert results == exp_results
+    assert list(nclist) == list(exp_nclist)
+    # pylint: disable=protected-access
+    assert nclist._casefolded_list == exp_nclist._casefolded_list
+    assert nclist._dirty_from is None
+    for value in exp_nclist:
+        assert value in nclist
+
+
+def test_NocaseList_batch_deferred():
+    """
+    Test function for deferring the casefolding in NocaseList.batch(), for
+    nested batches, pickling within a batch, and values that cannot be
+    casefolded.
+    """
+
+    if TEST_AGAINST_LIST:
+        pytest.skip("The batch test does not support testing with list")
+
+    CountingNocaseList.casefold_calls = 0
+    nclist = CountingNocaseList(['Dog', 'Cat'])
+    with nclist.batch():
+        with nclist.batch():
+            nclist.append('Eel')
+            nclist.insert(1, 'Fish')
+        nclist.append('Rat')
+        assert CountingNocaseList.casefold_calls == 2
+        # pylint: disable=protected-access
+        assert nclist._dirty_from == 1
+        copy = pickle.loads(pickle.dumps(nclist))
+        assert nclist._dirty_from is None
+        assert CountingNocaseList.casefold_calls == 6
+        nclist[0] = 'Bat'
+    assert CountingNocaseList.casefold_calls == 11
+    assert copy == ['DOG', 'FISH', 'CAT', 'EEL', 'RAT']
+    copy.append('Ant')
+    assert copy._casefolded_list[-1] == 'ant'
+
+    nclist = NocaseList(['Dog', 'Cat'])
+    with pytest.raises(AttributeError):
+        with nclist.batch():
+            nclist.append(42)
+            nclist.insert(0, 'Eel')
+            nclist.extend(['Fish', 43])
+    assert list(nclist) == ['Eel', 'Dog', 'Cat', 'Fish']
+    assert nclist._casefolded_list == ['eel', 'dog', 'cat', 'fish']
+
+    nclist = NocaseList(['Dog', 'Cat'])
+    nclist.enable_bloom_filter()
+    with nclist.batch():
+        nclist.append('Eel')
+        assert 'EEL' in nclist
+        nclist.insert(0, 'Fish')
+        assert nclist.count('fish') == 1
+        nclist[-1] = 'Rat'
+        assert nclist.index('rat') == 3
+        assert 'eel' not in nclist
+
+
+TESTCASES_VERSION = [
+
+    # Testcases for NocaseList.version
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * name: Name of the method that is called.
+    #   * args: Positional arguments for the method.
+    #   * exp_changed: Boolean indicating whether the version is expected to
+    #     be increased.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    ("__setitem__", dict(name='__setitem__', args=(0, 'Eel'),
+                         exp_changed=True), None, None, True),
+    ("__delitem__", dict(name='__delitem__', args=(slice(1),),
+                         exp_changed=True), None, None, True),
+    ("__iadd__", dict(name='__iadd__', args=(['Eel'],),
+                      exp_changed=True), None, None, True),
+    ("__imul__", dict(name='__imul__', args=(2,),
+                      exp_changed=True), None, None, True),
+    ("append", dict(name='append', args=('Eel',),
+                    exp_changed=True), None, None, True),
+    ("extend", dict(name='extend', args=(['Eel'],),
+                    exp_changed=True), None, None, True),
+    ("insert", dict(name='insert', args=(0, 'Eel'),
+                    exp_changed=True), None, None, True),
+    ("pop", dict(name='pop', args=(),
+                 exp_changed=True), None, None, True),
+    ("remove", dict(name='remove', args=('DOG',),
+                    exp_changed=True), None, None, True),
+    ("remove_all", dict(name='remove_all', args=(['DOG'],),
+                        exp_changed=True), None, None, True),
+    ("discard", dict(name='discard', args=('CAT',),
+                     exp_changed=True), None, None, True),
+    ("retain", dict(name='retain', args=(lambda v: v == 'Dog',),
+                    exp_changed=True), None, None, True),
+    ("clear", dict(name='clear', args=(),
+                   exp_changed=True), None, None, True),
+    ("canonicalize", dict(name='canonicalize', args=(),
+                          exp_changed=True), None, None, True),
+    ("reverse", dict(name='reverse', args=(),
+                     exp_changed=True), None, None, True),
+    ("sort", dict(name='sort', args=(),
+                  exp_changed=True), None, None, True),
+    ("Lookup", dict(name='__contains__', args=('dog',),
+                    exp_changed=False), None, None, True),
+    ("Comparison", dict(name='__eq__', args=(['dog'],),
+                        exp_changed=False), None, None, True),
+    ("Derived result", dict(name='sorted_copy', args=(),
+                            exp_changed=False), None, None, True),
+    ("Copy", dict(name='copy', args=(),
+                  exp_changed=False), None, None, True),
+    ("Removing nothing", dict(name='remove_all', args=(['Eel'],),
+                              exp_changed=False), None, None, True),
+    ("Discarding nothing", dict(name='discard', args=('Eel',),
+                                exp_changed=False), None, None, True),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_VERSION)
+@simplified_test_function
+def test_NocaseList_version(testcase, name, args, exp_changed):
+    """
+    Test function for NocaseList.version, outside and within a batch.
+    """
+
+    if TEST_AGAINST_LIST:
+        pytest.skip("The version test does not support testing with list")
+
+    for in_batch in (False, True):
+        nclist = NocaseList(['Dog', 'cat', 'DOG'])
+        version = nclist.version
+
+        # The code to be tested
+        if in_batch:
+            with nclist.batch():
+                getattr(nclist, name)(*args)
+        else:
+            getattr(nclist, name)(*args)
+
+        # Ensure that exceptions raised in the remainder of this function
+        # are not mistaken as expected exceptions
+        assert testcase.exp_exc_types is None
+
+        assert (nclist.version > version) == exp_changed
+        assert nclist.version >= version
+
+
+def test_NocaseList_cached():
+    """
+    Test function for the results of NocaseList that are cached until the
+    list is changed, and for the memoized equality of lists.
+    """
+
+    if TEST_AGAINST_LIST:
+        pytest.skip("The cache test does not support testing with list")
+
+    CountingNocaseList.casefold_calls = 0
+    nclist = CountingNocaseList(['Dog', 'cat', 'DOG', 'Budgie', 'CAT'])
+    assert CountingNocaseList.casefold_calls == 5
+
+    sorted_copy = nclist.sorted_copy()
+    assert type(sorted_copy) is NocaseList
+    assert list(sorted_copy) == ['Budgie', 'cat', 'CAT', 'Dog', 'DOG']
+    assert list(nclist.sorted_copy(reverse=True)) == \
+        ['Dog', 'DOG', 'cat', 'CAT', 'Budgie']
+    assert list(nclist.sorted_copy(key=len)) == \
+        ['Dog', 'cat', 'DOG', 'CAT', 'Budgie']
+    unique = nclist.unique()
+    assert list(unique) == ['Dog', 'cat', 'Budgie']
+    assert nclist.casefolded_set() == {'dog', 'cat', 'budgie'}
+    frozen = nclist.frozen()
+    assert list(frozen) == list(nclist)
+    assert 'BUDGIE' in frozen
+    calls = CountingNocaseList.casefold_calls
+
+    # The results are taken from the cache, and can be changed by the caller
+    sorted_copy.append('Eel')
+    unique.clear()
+    assert list(nclist.sorted_copy()) == \
+        ['Budgie', 'cat', 'CAT', 'Dog', 'DOG']
+    assert list(nclist.unique()) == ['Dog', 'cat', 'Budgie']
+    assert nclist.casefolded_set() is nclist.casefolded_set()
+    assert nclist.frozen() is frozen
+    assert CountingNocaseList.casefold_calls == calls
+
+    # Changing the list invalidates the cached results
+    nclist[0] = 'Eel'
+    assert list(nclist.sorted_copy()) == \
+        ['Budgie', 'cat', 'CAT', 'DOG', 'Eel']
+    assert list(nclist.unique()) == ['Eel', 'cat', 'DOG', 'Budgie']
+    assert nclist.casefolded_set() == {'eel', 'dog', 'cat', 'budgie'}
+    assert nclist.frozen() is not frozen
+    assert list(frozen) == ['Dog', 'cat', 'DOG', 'Budgie', 'CAT']
+    with nclist.batch():
+        nclist.append('Fish')
+        assert 'fish' in nclist.casefolded_set()
+
+    # The equality with another list is memoized until either list changes
+    nclist = NocaseList(['Dog', 'cat'])
+    other = NocaseList(['DOG', 'CAT'])
+    assert nclist == other
+    # pylint: disable=protected-access
+    memo = nclist._cache['_equals']
+    assert memo[id(other)][2] is True
+    assert nclist == other
+    other.append('Eel')
+    assert nclist != other
+    assert memo[id(other)][2] is False
+    nclist.append('EEL')
+    assert nclist == other
+    assert nclist._cache['_equals'] is not memo
+
+    # Derived results are not pickled
+    nclist = pickle.loads(pickle.dumps(nclist))
+    assert nclist._cache is None
+    assert nclist.version == 0
+    assert nclist == other
@@ -0,0 +1,302 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+Test the NocaseSnapshot class.
+"""
+
+
+import random
+import threading
+import pytest
+
+from ..utils.simplified_test_function import simplified_test_function
+
+# pylint: disable=wrong-import-position, wrong-import-order, invalid-name
+from ..utils.import_installed import import_installed
+nocaselist = import_installed('nocaselist')
+from nocaselist import NocaseList, NocaseBlockList, ConcurrentNocaseList, \
+    NocaseSnapshot, LowerFolder  # noqa: E402
+# pylint: enable=wrong-import-position, wrong-import-order, invalid-name
+
+# pylint: disable=use-dict-literal
+
+
+class SmallBlockList(NocaseBlockList):
+    """NocaseBlockList with a small block size, to exercise block handling"""
+    block_size = 4
+
+
+def assert_snapshot(snap, exp_list):
+    """
+    Assert that the NocaseSnapshot snap has the items in exp_list, and that
+    its casefolded items are consistent with them.
+    """
+    assert isinstance(snap, NocaseSnapshot)
+    assert list(snap) == list(exp_list)
+    assert len(snap) == len(exp_list)
+    assert [snap[i] for i in range(len(snap))] == list(exp_list)
+    assert list(reversed(snap)) == list(reversed(exp_list))
+    # pylint: disable=protected-access
+    assert [list(b) for b in snap._casefolded_blocks] == \
+        [[snap._list._casefolded_value(v) for v in b] for b in snap._blocks]
+
+
+TESTCASES_NOCASESNAPSHOT_LOOKUP = [
+
+    # Testcases for NocaseSnapshot lookup methods
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * list_class: List class whose snapshot is tested.
+    #   * items: Items of the list to be used for the test.
+    #   * value: Value to be looked up.
+    #   * index_args: Additional positional arguments for index().
+    #   * exp_contains: Expected result of the 'in' operator.
+    #   * exp_count: Expected result of count().
+    #   * exp_index: Expected result of index(), or None for ValueError.
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "Empty block list",
+        dict(
+            list_class=SmallBlockList,
+            items=[],
+            value='Dog',
+            index_args=(),
+            exp_contains=False,
+            exp_count=0,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Empty concurrent list",
+        dict(
+            list_class=ConcurrentNocaseList,
+            items=[],
+            value='Dog',
+            index_args=(),
+            exp_contains=False,
+            exp_count=0,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Block list, value in a later block, with different lexical case",
+        dict(
+            list_class=SmallBlockList,
+            items=['a', 'b', 'c', 'd', 'e', 'Dog', 'f', 'dog'],
+            value='DOG',
+            index_args=(),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=5,
+        ),
+        None, None, True
+    ),
+    (
+        "Block list, index with start range beyond first match",
+        dict(
+            list_class=SmallBlockList,
+            items=['a', 'b', 'c', 'd', 'e', 'Dog', 'f', 'dog'],
+            value='DOG',
+            index_args=(6,),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=7,
+        ),
+        None, None, True
+    ),
+    (
+        "Concurrent list, index with negative start and stop range "
+        "excluding matches",
+        dict(
+            list_class=ConcurrentNocaseList,
+            items=['a', 'b', 'c', 'd', 'e', 'Dog', 'f', 'dog'],
+            value='DOG',
+            index_args=(-8, -3),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=None,
+        ),
+        None, None, True
+    ),
+    (
+        "Concurrent list, value with different lexical case",
+        dict(
+            list_class=ConcurrentNocaseList,
+            items=['Dog', 'Cat', 'DOG'],
+            value='dog',
+            index_args=(1,),
+            exp_contains=True,
+            exp_count=2,
+            exp_index=2,
+        ),
+        None, None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_NOCASESNAPSHOT_LOOKUP)
+@simplified_test_function
+def test_NocaseSnapshot_lookup(testcase, list_class, items, value,
+                               index_args, exp_contains, exp_count,
+                               exp_index):
+    """
+    Test function for NocaseSnapshot.__contains__(), count(), index()
+    """
+    lst = list_class(items)
+    snap = lst.snapshot()
+    lst.clear()
+
+    # The code to be tested
+    contains = value in snap
+    count = snap.count(value)
+    if exp_index is None:
+        with pytest.raises(ValueError):
+            snap.index(value, *index_args)
+    else:
+        assert snap.index(value, *index_args) == exp_index
+
+    # Ensure that exceptions raised in the remainder of this function
+    # are not mistaken as expected exceptions
+    assert testcase.exp_exc_types is None
+
+    assert contains == exp_contains
+    assert count == exp_count
+    assert_snapshot(snap, items)
+
+
+def test_NocaseSnapshot_methods():
+    """
+    Test function for NocaseSnapshot indexing, comparisons and other reading
+    methods.
+    """
+    items = ['Dog', 'cat', 'Straße', 'DOG', 'Eel']
+    for lst in (SmallBlockList(items, folder=LowerFolder()),
+                ConcurrentNocaseList(items, folder=LowerFolder())):
+        snap = lst.snapshot()
+        assert_snapshot(snap, items)
+        assert snap[-1] == 'Eel'
+        assert snap[1:4] == ['cat', 'Straße', 'DOG']
+        with pytest.raises(IndexError):
+            _ = snap[5]
+        with pytest.raises(IndexError):
+            _ = snap[-6]
+        assert repr(snap) == repr(items)
+        assert 'STRASSE' not in snap
+        assert 'STRAẞE' in snap
+        assert snap.case_variants()['dog'].spellings == ['Dog', 'DOG']
+
+        assert snap == ['DOG', 'CAT', 'STRAẞE', 'dog', 'EEL']
+        assert snap == NocaseList(items)
+        assert NocaseList(items) == snap
+        assert snap == lst.snapshot()
+        assert snap != items[:-1]
+        assert snap < ['dog', 'DOG']
+        assert snap >= ['DOG', 'CAT']
+        assert snap.__eq__(42) is NotImplemented
+
+        lst.append('Fish')
+        lst[0] = 'Rat'
+        assert_snapshot(snap, items)
+        assert snap != lst.snapshot()
+
+
+def test_NocaseSnapshot_isolation():
+    """
+    Test function for snapshots of a NocaseBlockList that is changed by a
+    random sequence of operations after the snapshots have been taken.
+    """
+    rand = random.Random(42)
+    bllist = SmallBlockList([f"Item{i}" for i in range(20)])
+    ncl = NocaseList(bllist)
+    snapshots = []
+    for _ in range(1000):
+        value = rand.choice(['Dog', 'CAT', 'budgie']) + str(rand.randint(0, 3))
+        op = rand.randint(0, 8)
+        if op == 0:
+            index = rand.randint(-len(ncl) - 2, len(ncl) + 2)
+            bllist.insert(index, value)
+            ncl.insert(index, value)
+        elif op == 1:
+            bllist.append(value)
+            ncl.append(value)
+        elif op == 2 and ncl:
+            index = rand.randint(-len(ncl), len(ncl) - 1)
+            assert bllist.pop(index) == ncl.pop(index)
+        elif op == 3 and ncl:
+            index = rand.randint(0, len(ncl) - 1)
+            bllist[index] = value
+            ncl[index] = value
+        elif op == 4:
+            values = [value] * rand.randint(0, 6)
+            bllist.extend(values)
+            ncl.extend(values)
+        elif op == 5:
+            assert bllist.canonicalize() == ncl.canonicalize()
+        elif op == 6 and rand.randint(0, 9) == 0:
+            bllist.remove_all([value])
+            ncl.remove_all([value])
+        else:
+            snapshots.append((bllist.snapshot(), list(ncl)))
+        assert list(bllist) == list(ncl)
+
+    assert len(snapshots) > 50
+    for snap, exp_list in snapshots:
+        assert_snapshot(snap, exp_list)
+
+
+def test_NocaseSnapshot_threads():
+    """
+    Test function for reading snapshots in multiple threads, while a writer
+    changes a NocaseBlockList and a ConcurrentNocaseList and publishes
+    snapshots of the NocaseBlockList.
+    """
+    items = ['Anchor'] + [f"Item{i}" for i in range(50)]
+    bllist = SmallBlockList(items)
+    cclist = ConcurrentNocaseList(items)
+    published = [bllist.snapshot()]
+    errors = []
+    done = threading.Event()
+
+    def writer():
+        try:
+            for i in range(300):
+                for lst in (bllist, cclist):
+                    lst.insert(1, f"Writer{i}")
+                    lst.append(f"Kept{i}")
+                    lst.remove(f"WRITER{i}")
+                    del lst[-1]
+                published[0] = bllist.snapshot()
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+
+    def reader():
+        try:
+            while not done.is_set():
+                for snap in (published[0], cclist.snapshot()):
+                    assert snap.index('ANCHOR') == 0
+                    assert 'item49' in snap
+                    assert len(snap) == len(list(snap))
+                    assert len(snap) in (51, 52, 53)
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    writer_thread = threading.Thread(target=writer)
+    for thread in readers + [writer_thread]:
+        thread.start()
+    writer_thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert_snapshot(published[0], items)
+    assert_snapshot(cclist.snapshot(), items)
@@ -0,0 +1,148 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+Test the SharedNocaseList class.
+"""
+
+
+import pickle
+import multiprocessing
+import pytest
+
+# pylint: disable=wrong-import-position, wrong-import-order, invalid-name
+from ..utils.import_installed import import_installed
+nocaselist = import_installed('nocaselist')
+from nocaselist import NocaseList, SharedNocaseList, CasefoldFolder, \
+    LowerFolder  # noqa: E402
+# pylint: enable=wrong-import-position, wrong-import-order, invalid-name
+
+
+@pytest.fixture
+def published():
+    """
+    Fixture that publishes a SharedNocaseList and destroys it afterwards.
+    """
+    sncl = SharedNocaseList.publish(
+        NocaseList(['Dog', 'cat', 'Straße', 'DOG', '']))
+    yield sncl
+    sncl.close()
+    sncl.unlink()
+
+
+def lookup_worker(sncl, value):
+    """
+    Worker function that looks up a value in a SharedNocaseList that was
+    passed to another process.
+    """
+    return value in sncl, sncl.count(value), list(sncl)
+
+
+def test_SharedNocaseList_access(published):
+    # pylint: disable=redefined-outer-name
+    """
+    Test function for accessing and looking up SharedNocaseList items.
+    """
+    items = ['Dog', 'cat', 'Straße', 'DOG', '']
+    sncl = published
+
+    assert sncl.folder == CasefoldFolder()
+    assert sncl.has_hash_index
+    assert len(sncl) == 5
+    assert list(sncl) == items
+    assert sncl[-3] == 'Straße'
+    assert sncl[1:3] == ['cat', 'Straße']
+    assert repr(sncl) == f"SharedNocaseList({items!r})"
+    with pytest.raises(IndexError):
+        _ = sncl[5]
+
+    assert 'dog' in sncl
+    assert 'STRASSE' in sncl
+    assert 'Eel' not in sncl
+    assert sncl.count('dog') == 2
+    assert sncl.count('') == 1
+    assert sncl.index('dog', 1) == 3
+    with pytest.raises(ValueError):
+        sncl.index('dog', 1, 3)
+    with pytest.raises(AttributeError):
+        _ = None in sncl
+
+    ncl = sncl.to_list()
+    assert isinstance(ncl, NocaseList)
+    assert ncl == items
+    assert ncl.count('dog') == 2
+
+
+def test_SharedNocaseList_compare(published):
+    # pylint: disable=redefined-outer-name
+    """
+    Test function for comparing SharedNocaseList objects with other lists.
+    """
+    items = ['DOG', 'Cat', 'STRASSE', 'dog', '']
+    sncl = published
+
+    assert sncl == items
+    assert items == sncl
+    assert sncl == NocaseList(items)
+    assert NocaseList(items) == sncl
+    assert sncl != items[:-1]
+    assert items[:-1] != sncl
+    assert sncl < ['EEL']
+    assert sncl <= items
+    assert sncl > items[:-1]
+    assert sncl >= items
+
+    with SharedNocaseList(sncl.name) as sncl2:
+        assert sncl == sncl2
+        assert not sncl != sncl2
+
+
+def test_SharedNocaseList_attach(published):
+    # pylint: disable=redefined-outer-name
+    """
+    Test function for attaching to a SharedNocaseList, in the same process
+    and in other processes.
+    """
+    sncl = published
+
+    with SharedNocaseList(sncl.name) as sncl2:
+        assert list(sncl2) == list(sncl)
+        assert sncl2.count('DOG') == 2
+    with pytest.raises(ValueError):
+        SharedNocaseList(sncl.name, folder=LowerFolder())
+
+    sncl2 = pickle.loads(pickle.dumps(sncl))
+    assert sncl2.name == sncl.name
+    assert 'STRASSE' in sncl2
+    sncl2.close()
+
+    with multiprocessing.Pool(2) as pool:
+        results = pool.starmap(lookup_worker,
+                               [(sncl, 'DOG'), (sncl, 'Eel')])
+    assert results == [(True, 2, list(sncl)), (False, 0, list(sncl))]
+
+
+def test_SharedNocaseList_publish():
+    """
+    Test function for publishing SharedNocaseList objects with folders and
+    names, and for destroying them.
+    """
+    sncl = SharedNocaseList.publish(
+        NocaseList(['Straße'], folder=LowerFolder()))
+    try:
+        assert sncl.folder == LowerFolder()
+        assert 'STRASSE' not in sncl
+        assert 'STRAßE' in sncl
+
+        sncl2 = SharedNocaseList.publish(sncl, folder=CasefoldFolder())
+        assert 'STRASSE' in sncl2
+        with pytest.raises(FileExistsError):
+            SharedNocaseList.publish(['Dog'], name=sncl2.name)
+        sncl2.close()
+        sncl2.unlink()
+        with pytest.raises(FileNotFoundError):
+            SharedNocaseList(sncl2.name)
+    finally:
+        sncl.close()
+        sncl.unlink()
+
+    with pytest.raises(TypeError):
+        SharedNocaseList.publish(['Dog', None])
@@ -0,0 +1,227 @@
+# Copyright (C) 2020 Andreas Maier
+"""
+Test the ThreadSafeNocaseList class.
+"""
+
+
+import asyncio
+import pickle
+import random
+import threading
+import time
+import pytest
+
+# pylint: disable=wrong-import-position, wrong-import-order, invalid-name
+from ..utils.import_installed import import_installed
+nocaselist = import_installed('nocaselist')
+from nocaselist import NocaseList, ThreadSafeNocaseList, LockStatistics, \
+    LowerFolder  # noqa: E402
+from nocaselist._rwlock import _RWLock  # noqa: E402
+# pylint: enable=wrong-import-position, wrong-import-order, invalid-name
+
+
+def assert_consistent(tslist, exp_list):
+    """
+    Assert that the ThreadSafeNocaseList tslist has the items in exp_list,
+    and that its casefolded items are consistent with them.
+    """
+    assert list(tslist) == list(exp_list)
+    assert len(tslist) == len(exp_list)
+    # pylint: disable=protected-access
+    assert tslist._casefolded_list == \
+        [tslist._casefolded_value(v) for v in tslist]
+
+
+def test_ThreadSafeNocaseList_random_operations():
+    """
+    Test function for a random sequence of operations on a
+    ThreadSafeNocaseList, compared against a NocaseList.
+    """
+    rand = random.Random(42)
+    tslist = ThreadSafeNocaseList()
+    ncl = NocaseList()
+    for _ in range(1000):
+        value = rand.choice(['Dog', 'CAT', 'budgie']) + str(rand.randint(0, 3))
+        op = rand.randint(0, 6)
+        if op == 0:
+            index = rand.randint(-len(ncl) - 2, len(ncl) + 2)
+            tslist.insert(index, value)
+            ncl.insert(index, value)
+        elif op == 1:
+            tslist.append(value)
+            ncl.append(value)
+        elif op == 2 and ncl:
+            index = rand.randint(-len(ncl), len(ncl) - 1)
+            assert tslist.pop(index) == ncl.pop(index)
+        elif op == 3 and ncl:
+            index = rand.randint(0, len(ncl) - 1)
+            tslist[index] = value
+            ncl[index] = value
+        elif op == 4:
+            with tslist.batch():
+                tslist.extend([value, value.upper()])
+                tslist.discard(value.swapcase())
+            ncl.extend([value, value.upper()])
+            ncl.discard(value.swapcase())
+        elif op == 5:
+            tslist.remove_all([value])
+            ncl.remove_all([value])
+        else:
+            value = value.swapcase()
+            assert (value in tslist) == (value in ncl)
+            assert tslist.count(value) == ncl.count(value)
+            if value in ncl:
+                assert tslist.index(value) == ncl.index(value)
+        assert_consistent(tslist, ncl)
+    assert tslist == ncl
+
+
+def test_ThreadSafeNocaseList_methods():
+    """
+    Test function for ThreadSafeNocaseList methods that create new lists,
+    for pickling, for the asynchronous methods, and for the cached derived
+    results.
+    """
+    items = ['Dog', 'cat', 'Straße', 'DOG']
+    tslist = ThreadSafeNocaseList(items, folder=LowerFolder())
+
+    for lst in (tslist.copy(), tslist + [], pickle.loads(pickle.dumps(tslist)),
+                pickle.loads(pickle.dumps(tslist, protocol=5))):
+        assert type(lst) is ThreadSafeNocaseList
+        assert lst.folder == LowerFolder()
+        assert_consistent(lst, items)
+        # pylint: disable=protected-access
+        assert lst._lock is not tslist._lock
+        lst.append('Eel')
+        assert len(tslist) == 4
+
+    assert tslist[1:3] == ['cat', 'Straße']
+    assert repr(tslist) == repr(items)
+    assert tslist.case_variants()['dog'].spellings == ['Dog', 'DOG']
+    assert tslist.canonicalize() == 1
+    tslist.sort(reverse=True)
+    assert_consistent(tslist, ['Straße', 'Dog', 'Dog', 'cat'])
+    assert tslist.retain(lambda v: 'DOG' in tslist and v != 'cat') == 1
+    tslist *= 2
+    assert len(tslist) == 6
+
+    asyncio.run(tslist.aextend(['eel', 'Budgie'], chunk_size=1))
+    asyncio.run(tslist.asort(chunk_size=3, max_stall=0))
+    assert_consistent(tslist, ['Budgie', 'Dog', 'Dog', 'Dog', 'Dog', 'eel',
+                               'Straße', 'Straße'])
+
+    sorted_copy = tslist.sorted_copy(reverse=True)
+    assert type(sorted_copy) is ThreadSafeNocaseList
+    assert_consistent(sorted_copy, ['Straße', 'Straße', 'eel', 'Dog', 'Dog',
+                                    'Dog', 'Dog', 'Budgie'])
+    assert_consistent(tslist.unique(), ['Budgie', 'Dog', 'eel', 'Straße'])
+    assert tslist.frozen() is tslist.frozen()
+    assert 'straße' in tslist.casefolded_set()
+
+
+def test_ThreadSafeNocaseList_lock_statistics():
+    """
+    Test function for ThreadSafeNocaseList.lock_statistics() and
+    ThreadSafeNocaseList.batch(), with a reader that waits for a batch.
+    """
+    tslist = ThreadSafeNocaseList(['Dog', 'cat'])
+    assert tslist.lock_statistics() == LockStatistics(0, 0, 0, 0, 0.0)
+
+    _ = 'dog' in tslist
+    tslist.append('Budgie')
+    stats = tslist.lock_statistics()
+    assert (stats.reads, stats.writes) == (1, 1)
+
+    results = []
+    reader = threading.Thread(
+        target=lambda: results.append(tslist.index('EEL')))
+    with tslist.batch() as lst:
+        assert lst is tslist
+        reader.start()
+        time.sleep(0.1)
+        tslist.append('Dog')
+        tslist.remove('DOG')
+        tslist.insert(0, 'Eel')
+        assert tslist.index('eel') == 0
+    reader.join()
+
+    assert results == [0]
+    stats = tslist.lock_statistics()
+    assert (stats.reads, stats.writes) == (2, 2)
+    assert (stats.read_waits, stats.write_waits) == (1, 0)
+    assert stats.wait_time > 0
+
+
+def test_RWLock():
+    """
+    Test function for the reentrancy of the reader-writer lock.
+    """
+    lock = _RWLock()
+    lock.acquire_write()
+    lock.acquire_write()
+    lock.acquire_read()
+    lock.release_read()
+    lock.release_write()
+    lock.release_write()
+
+    lock.acquire_read()
+    lock.acquire_read()
+    with pytest.raises(RuntimeError):
+        lock.acquire_write()
+    lock.release_read()
+    lock.release_read()
+
+    lock.acquire_write()
+    lock.release_write()
+    stats = lock.statistics()
+    assert (stats.reads, stats.writes) == (1, 2)
+
+
+def test_ThreadSafeNocaseList_threads():
+    """
+    Test function for reading and changing a ThreadSafeNocaseList in
+    multiple threads concurrently, where the readers must not observe the
+    intermediate states of the batches of the writers.
+    """
+    tslist = ThreadSafeNocaseList(['Anchor'] + [f"Item{i}" for i in range(50)])
+    num_writers = 4
+    num_changes = 200
+    errors = []
+    done = threading.Event()
+
+    def writer(writer_id):
+        try:
+            for i in range(num_changes):
+                with tslist.batch():
+                    tslist.insert(0, f"Writer{writer_id}_{i}")
+                    del tslist[0]
+                tslist.append(f"Kept{writer_id}_{i}")
+                tslist.remove(f"KEPT{writer_id}_{i}")
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+
+    def reader():
+        try:
+            while not done.is_set():
+                assert tslist.index('ANCHOR') == 0
+                assert tslist[0] == 'Anchor'
+                assert 'item49' in tslist
+                assert len(tslist) in (51, 52, 53, 54, 55)
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    writers = [threading.Thread(target=writer, args=(i,))
+               for i in range(num_writers)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert_consistent(tslist, ['Anchor'] + [f"Item{i}" for i in range(50)])
+    stats = tslist.lock_statistics()
+    assert stats.writes >= num_writers * num_changes * 3